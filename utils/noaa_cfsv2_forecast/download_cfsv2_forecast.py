@@ -22,111 +22,290 @@ if sys.version_info.major < 3:
     sys.exit(1)
 
 import argparse
+import concurrent.futures
 import datetime
 import os
+import threading
 import time
+from urllib.error import HTTPError
 from urllib.request import urlopen
 
+HINDCAST_URL_PATTERNS = [
+    'https://www.ncei.noaa.gov/data/climate-forecast-system/access/reforecast/high-priority-subset/'
+    'monthly-means-9-month/{YEAR:04d}/{YEAR:04d}{MONTH:02d}/{YEAR:04d}{MONTH:02d}{DAY:02d}/{GRIBFILE}'
+]
+
+ARCHIVE_URL_PATTERNS = [
+    'https://ncei.noaa.gov/data/climate-forecast-system/access/operational-9-month-forecast/monthly-means/{YEAR:04d}/{YEAR:04d}{MONTH:02d}/{YEAR:04d}{MONTH:02d}{DAY:02d}/{TIMESTAMP}/{GRIBFILE}',
+    'https://noaa-cfs-pds.s3.amazonaws.com/cfs.{YEAR:04d}{MONTH:02d}{DAY:02d}/{HOUR:02d}/monthly_grib_01/{GRIBFILE}',
+    'https://wsim-datasets.s3.us-east-2.amazonaws.com/CFSv2/cfs.{YEAR:04d}{MONTH:02d}{DAY:02d}/{GRIBFILE}'
+]
+
+ROLLING_URL_PATTERN = 'https://nomads.ncep.noaa.gov/pub/data/nccf/com/cfs/prod/cfs.{YEAR:04d}{MONTH:02d}{DAY:02d}/{HOUR:02d}/monthly_grib_01/{GRIBFILE}'
+
+# Suffix of the file written alongside each file downloaded in batch mode,
+# once it is complete
+MARKER_SUFFIX = '.done'
+
+# Seconds to wait after a mirror fails for a reason other than a missing file
+RETRY_DELAY = 2
+
 
 def parse_args(args):
-    parser = argparse.ArgumentParser('Download a CFSv2 forecast GRIB file')
+    parser = argparse.ArgumentParser('Download CFSv2 forecast GRIB files')
 
-    parser.add_argument('--timestamp',
-                        help='Forecast timestamp in YYYYMMHH format',
-                        required=True)
+    forecasts = parser.add_mutually_exclusive_group(required=True)
+    forecasts.add_argument('--timestamp',
+                           help='Forecast timestamp in YYYYMMDDHH format')
+    forecasts.add_argument('--manifest',
+                           help='File listing forecasts to download, one per line, as a timestamp '
+                                'in YYYYMMDDHH format and target in YYYYMM format separated by whitespace')
+    forecasts.add_argument('--forecast',
+                           help='One or more forecasts to download, as TIMESTAMP:TARGET',
+                           nargs='+')
     parser.add_argument('--target',
-                        help='Target year and month of forecast in YYYYMM format',
-                        required=True)
+                        help='Target year and month of forecast in YYYYMM format')
     parser.add_argument('--output_dir',
-                        help='Directory to which forecast should be written',
-                        required=True)
+                        help='Directory to which forecast should be written')
+    parser.add_argument('--output_root',
+                        help='Directory under which forecasts from --manifest or --forecast should be written, '
+                             'in a cfs.YYYYMMDD subdirectory for each forecast date')
+    parser.add_argument('--workers',
+                        help='Number of files to download concurrently from --manifest or --forecast',
+                        type=int,
+                        default=4)
+    parser.add_argument('--mirrors',
+                        help='URL patterns to try instead of the NOAA archives',
+                        nargs='+')
 
     parsed = parser.parse_args(args)
 
+    if parsed.timestamp:
+        if not parsed.target or not parsed.output_dir:
+            parser.error('--target and --output_dir are required with --timestamp')
+    elif not parsed.output_root:
+        parser.error('--output_root is required with --manifest or --forecast')
+
     return parsed
 
 
-def download(url, output_dir):
-    fname = url.rsplit('/', 1)[-1]
+def parse_timestamp(timestamp):
+    return datetime.datetime(int(timestamp[0:4]),
+                             int(timestamp[4:6]),
+                             int(timestamp[6:8]),
+                             int(timestamp[8:10]))
+
+
+def is_hindcast(timestamp):
+    return timestamp[:6] <= '201103'
+
+
+def get_gribfile(timestamp, target):
+    if is_hindcast(timestamp):
+        grib_pattern = "flxf{TIMESTAMP}.01.{TARGET}.avrg.grb2"
+    else:
+        grib_pattern = "flxf.01.{TIMESTAMP}.{TARGET}.avrg.grib.grb2"
+
+    return grib_pattern.format(TIMESTAMP=timestamp, TARGET=target)
+
+
+def get_url_patterns(timestamp):
+    """
+    Return the URL patterns of the archives from which a forecast may be
+    downloaded, in the order they should be tried.
+    """
+    if is_hindcast(timestamp):
+        return list(HINDCAST_URL_PATTERNS)
+
+    start_of_rolling_archive = datetime.datetime.now() - datetime.timedelta(days=8) # should have 7 days but could have more or less
+
+    if parse_timestamp(timestamp) > start_of_rolling_archive:
+        return [ROLLING_URL_PATTERN] + ARCHIVE_URL_PATTERNS
+    else:
+        return ARCHIVE_URL_PATTERNS + [ROLLING_URL_PATTERN]
+
+
+def get_url(url_pattern, timestamp, target):
+    timestamp_datetime = parse_timestamp(timestamp)
+
+    return url_pattern.format(YEAR=timestamp_datetime.year,
+                              MONTH=timestamp_datetime.month,
+                              DAY=timestamp_datetime.day,
+                              HOUR=timestamp_datetime.hour,
+                              TIMESTAMP=timestamp,
+                              GRIBFILE=get_gribfile(timestamp, target))
+
+
+def download(url, output_file, progress=True):
+    # Download to a temporary file so that an interrupted download
+    # does not leave a partial file under the output name
+    partial_file = output_file + '.part'
 
     try:
-        with open(os.path.join(output_dir, fname), 'wb') as outfile:
-            sys.stdout.write(url)
+        with open(partial_file, 'wb') as outfile:
+            if progress:
+                sys.stdout.write(url)
             res = urlopen(url)
             for chunk in iter(lambda : res.read(1024 * 256), b''):
-                sys.stdout.write('.')
-                sys.stdout.flush()
+                if progress:
+                    sys.stdout.write('.')
+                    sys.stdout.flush()
                 outfile.write(chunk)
+        os.replace(partial_file, output_file)
     except:
-        os.remove(os.path.join(output_dir, fname))
+        if os.path.exists(partial_file):
+            os.remove(partial_file)
         raise
     finally:
-        sys.stdout.write('\n')
+        if progress:
+            sys.stdout.write('\n')
 
 
-def main(raw_args):
-    args = parse_args(raw_args)
+class MirrorPreference:
+    """
+    Remembers which URL pattern most recently served a file from each list
+    of URL patterns, so that the next file is first requested from the same
+    mirror instead of walking the list from the beginning.
+    """
 
-    year = int(args.timestamp[0:4])
-    month = int(args.timestamp[4:6])
-    day = int(args.timestamp[6:8])
-    hour = int(args.timestamp[8:10])
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.preferred = {}
 
-    yearmon = args.timestamp[:6]
-    hindcast = yearmon <= '201103'
-
-    if hindcast:
-        grib_pattern = "flxf{TIMESTAMP}.01.{TARGET}.avrg.grb2"
-    else:
-        grib_pattern = "flxf.01.{TIMESTAMP}.{TARGET}.avrg.grib.grb2"
+    def order(self, url_patterns):
+        with self.lock:
+            preferred = self.preferred.get(tuple(url_patterns))
 
-    gribfile = grib_pattern.format(TIMESTAMP=args.timestamp, TARGET=args.target)
+        if preferred is None:
+            return list(url_patterns)
 
-    if hindcast:
-        url_patterns = [
-            'https://www.ncei.noaa.gov/data/climate-forecast-system/access/reforecast/high-priority-subset/'
-            'monthly-means-9-month/{YEAR:04d}/{YEAR:04d}{MONTH:02d}/{YEAR:04d}{MONTH:02d}{DAY:02d}/{GRIBFILE}'
-        ]
-    else:
-        start_of_rolling_archive = datetime.datetime.now() - datetime.timedelta(days=8) # should have 7 days but could have more or less
-        timestamp_datetime = datetime.datetime(year, month, day, hour)
+        return [preferred] + [p for p in url_patterns if p != preferred]
 
-        if timestamp_datetime > datetime.datetime.utcnow():
-            print("Can't download forecast with timestamp in the future.", file=sys.stderr)
-            sys.exit(1)
+    def succeeded(self, url_patterns, url_pattern):
+        with self.lock:
+            self.preferred[tuple(url_patterns)] = url_pattern
 
-        url_patterns = [
-            'https://ncei.noaa.gov/data/climate-forecast-system/access/operational-9-month-forecast/monthly-means/{YEAR:04d}/{YEAR:04d}{MONTH:02d}/{YEAR:04d}{MONTH:02d}{DAY:02d}/{TIMESTAMP}/{GRIBFILE}',
-            'https://noaa-cfs-pds.s3.amazonaws.com/cfs.{YEAR:04d}{MONTH:02d}{DAY:02d}/{HOUR:02d}/monthly_grib_01/{GRIBFILE}',
-            'https://wsim-datasets.s3.us-east-2.amazonaws.com/CFSv2/cfs.{YEAR:04d}{MONTH:02d}{DAY:02d}/{GRIBFILE}'
-        ]
 
-        rolling_url_pattern = 'https://nomads.ncep.noaa.gov/pub/data/nccf/com/cfs/prod/cfs.{YEAR:04d}{MONTH:02d}{DAY:02d}/{HOUR:02d}/monthly_grib_01/{GRIBFILE}'
+def download_forecast(timestamp, target, output_file, *, url_patterns, mirrors=None, progress=True):
+    """
+    Download a forecast from the first mirror that can provide it
 
-        if timestamp_datetime > start_of_rolling_archive:
-            print("Attempting rolling archive URL first")
-            url_patterns.insert(0, rolling_url_pattern)
-        else:
-            print("Attempting long-term archive URL first")
-            url_patterns.append(rolling_url_pattern)
+    :return: True if the forecast was downloaded
+    """
+    ordered = mirrors.order(url_patterns) if mirrors else url_patterns
 
-    for url_pattern in url_patterns:
-        url = url_pattern.format(YEAR=year,
-                                 MONTH=month,
-                                 DAY=day,
-                                 HOUR=hour,
-                                 TIMESTAMP=args.timestamp,
-                                 GRIBFILE=gribfile)
+    for url_pattern in ordered:
+        url = get_url(url_pattern, timestamp, target)
 
         try:
-            download(url, args.output_dir)
-            sys.exit(0)
+            download(url, output_file, progress)
+            if mirrors:
+                mirrors.succeeded(url_patterns, url_pattern)
+            return True
         except Exception as e:
             print("Failed to download from " + url + " with error: ", file=sys.stderr)
             print(e, file=sys.stderr)
-            time.sleep(2)
-    sys.exit(1)
+
+            # Don't wait before asking the next mirror for a file that this one doesn't have
+            if not (isinstance(e, HTTPError) and e.code == 404):
+                time.sleep(RETRY_DELAY)
+
+    return False
+
+
+def read_manifest(filename):
+    forecasts = []
+    with open(filename) as manifest:
+        for line in manifest:
+            fields = line.split()
+            if fields:
+                timestamp, target = fields
+                forecasts.append((timestamp, target))
+    return forecasts
+
+
+def download_batch(forecasts, output_root, *, workers, url_patterns=None):
+    """
+    Download several forecasts concurrently. A completion marker is written
+    alongside each forecast once it has been downloaded, so that forecasts
+    downloaded by an earlier, partially failed, run are not downloaded again.
+
+    :return: the number of forecasts that could not be downloaded
+    """
+    mirrors = MirrorPreference()
+    now = datetime.datetime.utcnow()
+
+    def download_one(timestamp, target):
+        output_file = os.path.join(output_root,
+                                   'cfs.{}'.format(timestamp[:-2]),
+                                   get_gribfile(timestamp, target))
+
+        if os.path.exists(output_file):
+            print('Skipping', output_file, '(already exists)')
+        elif parse_timestamp(timestamp) > now:
+            print("Can't download forecast with timestamp {} in the future.".format(timestamp), file=sys.stderr)
+            return False
+        else:
+            os.makedirs(os.path.dirname(output_file), exist_ok=True)
+            if not download_forecast(timestamp, target, output_file,
+                                     url_patterns=url_patterns or get_url_patterns(timestamp),
+                                     mirrors=mirrors,
+                                     progress=False):
+                return False
+            print('Downloaded', output_file)
+
+        with open(output_file + MARKER_SUFFIX, 'w'):
+            pass
+
+        return True
+
+    failures = 0
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(workers, 1)) as pool:
+        futures = {pool.submit(download_one, timestamp, target): (timestamp, target) for timestamp, target in forecasts}
+
+        for future in concurrent.futures.as_completed(futures):
+            try:
+                succeeded = future.result()
+            except Exception as e:
+                print('Failed to download forecast {} targeting {} with error:'.format(*futures[future]), e,
+                      file=sys.stderr)
+                succeeded = False
+
+            if not succeeded:
+                failures += 1
+
+    return failures
+
+
+def main(raw_args):
+    args = parse_args(raw_args)
+
+    if args.timestamp:
+        if parse_timestamp(args.timestamp) > datetime.datetime.utcnow():
+            print("Can't download forecast with timestamp in the future.", file=sys.stderr)
+            return 1
+
+        gribfile = get_gribfile(args.timestamp, args.target)
+
+        if download_forecast(args.timestamp, args.target, os.path.join(args.output_dir, gribfile),
+                             url_patterns=args.mirrors or get_url_patterns(args.timestamp)):
+            return 0
+        return 1
+
+    if args.manifest:
+        forecasts = read_manifest(args.manifest)
+    else:
+        forecasts = [tuple(forecast.split(':')) for forecast in args.forecast]
+
+    failures = download_batch(forecasts, args.output_root, workers=args.workers, url_patterns=args.mirrors)
+
+    if failures:
+        print('Failed to download {} of {} forecasts'.format(failures, len(forecasts)), file=sys.stderr)
+        return 1
+
+    return 0
 
 
 if __name__ == "__main__":
-    main(sys.argv[1:])
+    sys.exit(main(sys.argv[1:]))
@@ -18,41 +18,81 @@ from __future__ import print_function  # Avoid bombing in Python 2 before we eve
 
 import argparse
 import calendar
+import concurrent.futures
+import datetime
+import ftplib
 import gzip
+import http.client
+import json
 import os
 import shutil
 import sys
-import tempfile
-
-from urllib.request import urlopen
+import threading
+import time
+import urllib.parse
 
 if sys.version_info.major < 3:
     print("Must use Python 3")
     sys.exit(1)
 
+DEFAULT_ROOT = "ftp://ftp.cpc.ncep.noaa.gov/precip/CPC_UNI_PRCP/GAUGE_GLB"
 
-def parse_args(args):
-    parser = argparse.ArgumentParser('Download a month of daily precipitation files')
+CHUNK_SIZE = 1024 * 256
 
-    parser.add_argument('--yearmon',
-                        help='Year and month to download in YYYYMM format',
-                        required=True)
+# Serializes messages printed by download threads
+print_lock = threading.Lock()
+
+
+def report(*args, **kwargs):
+    """
+    Print a message without interleaving it with messages from other threads
+    """
+    with print_lock:
+        print(*args, flush=True, **kwargs)
+
+
+def parse_args(args):
+    parser = argparse.ArgumentParser('Download daily precipitation files')
+
+    period = parser.add_mutually_exclusive_group(required=True)
+    period.add_argument('--yearmon',
+                        help='One or more years and months to download in YYYYMM format',
+                        nargs='+')
+    period.add_argument('--year',
+                        help='One or more years to download in their entirety (up to the current date)',
+                        nargs='+',
+                        type=int)
     parser.add_argument('--output_dir',
                         help='Directory to which forecast should be written',
                         required=True)
+    parser.add_argument('--workers',
+                        help='Number of files to download concurrently',
+                        type=int,
+                        default=1)
+    parser.add_argument('--retries',
+                        help='Number of times a failed download is retried, resuming from where it stopped',
+                        type=int,
+                        default=3)
+    parser.add_argument('--backoff',
+                        help='Seconds to wait before the first retry of a download, doubled for each further retry',
+                        type=float,
+                        default=2)
+    parser.add_argument('--root',
+                        help='Root URL of the daily precipitation archive',
+                        default=DEFAULT_ROOT)
 
     parsed = parser.parse_args(args)
 
     return parsed
 
 
-def get_folder_url(year):
+def get_folder_url(year, root=DEFAULT_ROOT):
     if year < 1979:
         raise Exception("Daily precipitation data not available before 1979")
     if year < 2006:
-        return "ftp://ftp.cpc.ncep.noaa.gov/precip/CPC_UNI_PRCP/GAUGE_GLB/V1.0"
+        return root + "/V1.0"
     else:
-        return "ftp://ftp.cpc.ncep.noaa.gov/precip/CPC_UNI_PRCP/GAUGE_GLB/RT"
+        return root + "/RT"
 
 
 def get_extension(year):
@@ -66,12 +106,12 @@ def get_extension(year):
         return ".RT"
 
 
-def get_url(year, month, day):
+def get_url(year, month, day, root=DEFAULT_ROOT):
     """
     Get the URL of a daily precipitation file
     """
     return '{ROOT}/{YEAR}/PRCP_CU_GAUGE_V1.0GLB_0.50deg.lnx.{YEAR:04d}{MONTH:02d}{DAY:02d}{EXT}'.format(
-        ROOT=get_folder_url(year),
+        ROOT=get_folder_url(year, root),
         YEAR=year,
         MONTH=month,
         DAY=day,
@@ -87,43 +127,273 @@ def get_standard_filename(year, month, day):
     return 'PRCP_CU_GAUGE_V1.0GLB_0.50deg.lnx.{YEAR:04d}{MONTH:02d}{DAY:02d}.gz'.format(YEAR=year, MONTH=month, DAY=day)
 
 
-def download(url, output_file):
+class PermanentError(Exception):
+    """
+    A download failure that retrying will not fix, such as a missing file
+    """
+    pass
+
+
+def read_validator(validator_file):
+    try:
+        with open(validator_file) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def write_validator(validator_file, validator):
+    if validator:
+        with open(validator_file, 'w') as f:
+            json.dump(validator, f)
+    elif os.path.exists(validator_file):
+        os.remove(validator_file)
+
+
+def http_validator(res):
     """
-    Downloads a file, optionally compressing it
-    :param url: URL to download
-    :param output_file: Path of downloaded file. If output_file ends in '.gz' and
-                        URL does not, the file will be compressed on the fly.
+    Return the value of an If-Range header identifying the version of the
+    file in a response, or None if the server does not identify it. Weak
+    ETags cannot be used with If-Range.
     """
+    etag = res.getheader('ETag')
+    if etag and not etag.startswith('W/'):
+        return {'if_range': etag}
 
-    needs_compression = output_file.endswith('.gz') and not url.endswith('.gz')
+    last_modified = res.getheader('Last-Modified')
+    if last_modified:
+        return {'if_range': last_modified}
 
-    opener = gzip.open if needs_compression else open
+    return None
 
-    # Write to a temp file so that we don't leave a partially
-    # completed download if we're interrupted
-    with tempfile.NamedTemporaryFile(dir='/tmp', delete=False) as tmpfile:
-        temp_file_name = tmpfile.name
 
-    with opener(temp_file_name, 'wb') as outfile:
-        sys.stdout.write(url)
-        res = urlopen(url)
-        for chunk in iter(lambda: res.read(1024 * 256), b''):
-            sys.stdout.write('.')
-            sys.stdout.flush()
-            outfile.write(chunk)
-        sys.stdout.write('\n')
+def ftp_validator(conn, path):
+    """
+    Return the size and modification time of a file on an FTP server, or
+    None if the server reports neither
+    """
+    validator = {}
+    for key, cmd in (('size', 'SIZE'), ('modified', 'MDTM')):
+        try:
+            validator[key] = conn.sendcmd('{} {}'.format(cmd, path)).split(None, 1)[1].strip()
+        except (ftplib.error_perm, IndexError):
+            validator[key] = None
+
+    if not any(validator.values()):
+        return None
+
+    return validator
+
+
+class Downloader:
+    """
+    Downloads files over FTP or HTTP, keeping one open connection to each
+    server in each thread so that consecutive files do not each require a
+    new connection (and, for FTP, a new login). Partially downloaded files
+    are resumed using FTP REST or HTTP Range requests, provided that the file
+    on the server has not changed since the part was downloaded. The version
+    of the file is recorded next to the part, and compared using MDTM and SIZE
+    over FTP, or sent in an If-Range header over HTTP.
+    """
+
+    def __init__(self, *, retries=3, backoff=2.0, timeout=60):
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.all_connections = []
+
+    def connection(self, key):
+        connections = self.local.__dict__.setdefault('connections', {})
+
+        if key not in connections:
+            scheme, host, port = key
+
+            if scheme == 'ftp':
+                conn = ftplib.FTP(timeout=self.timeout)
+                conn.connect(host, port or 21)
+                conn.login()
+                conn.voidcmd('TYPE I')
+            elif scheme == 'https':
+                conn = http.client.HTTPSConnection(host, port, timeout=self.timeout)
+            elif scheme == 'http':
+                conn = http.client.HTTPConnection(host, port, timeout=self.timeout)
+            else:
+                raise PermanentError('Unsupported URL scheme: ' + scheme)
+
+            connections[key] = conn
+            with self.lock:
+                self.all_connections.append(conn)
+
+        return connections[key]
+
+    def discard_connection(self, key):
+        conn = self.local.__dict__.get('connections', {}).pop(key, None)
+        if conn:
+            close_quietly(conn)
+
+    def close(self):
+        with self.lock:
+            for conn in self.all_connections:
+                close_quietly(conn)
+            self.all_connections = []
+
+    def fetch(self, url, partial_file):
+        """
+        Append the part of a file not yet present in partial_file, starting
+        again from the beginning if the file has changed since partial_file
+        was written
+        """
+        parsed = urllib.parse.urlsplit(url)
+        conn = self.connection((parsed.scheme, parsed.hostname, parsed.port))
+
+        validator_file = partial_file + '.validator'
+        offset = os.path.getsize(partial_file) if os.path.exists(partial_file) else 0
+        saved = read_validator(validator_file) if offset else None
+
+        if saved is None:
+            # We can't tell which version of the file the part came from
+            offset = 0
+
+        if parsed.scheme == 'ftp':
+            try:
+                current = ftp_validator(conn, parsed.path)
+                if current != saved:
+                    offset = 0
+                write_validator(validator_file, current)
+
+                if offset and current and current.get('size') == str(offset):
+                    return
+
+                with open(partial_file, 'ab' if offset else 'wb') as outfile:
+                    conn.retrbinary('RETR ' + parsed.path, outfile.write, blocksize=CHUNK_SIZE, rest=offset or None)
+            except ftplib.error_perm as e:
+                raise PermanentError(str(e))
+            return
+
+        headers = {}
+        if offset and saved.get('if_range'):
+            headers['Range'] = 'bytes={}-'.format(offset)
+            headers['If-Range'] = saved['if_range']
+        else:
+            offset = 0
+
+        conn.request('GET', parsed.path, headers=headers)
+        res = conn.getresponse()
+
+        if res.status == 416:
+            # Range starts at the end of the unchanged file, so the partial file is complete
+            res.read()
+            return
+
+        if res.status not in (200, 206):
+            res.read()
+            error = '{} returned HTTP {} {}'.format(url, res.status, res.reason)
+            if res.status < 500:
+                raise PermanentError(error)
+            raise http.client.HTTPException(error)
+
+        if res.status == 206 and not (res.getheader('Content-Range') or '').startswith('bytes {}-'.format(offset)):
+            res.read()
+            os.remove(partial_file)
+            raise http.client.HTTPException('{} returned an unexpected range {}'.format(
+                url, res.getheader('Content-Range')))
+
+        if res.status == 200:
+            # The server ignored the Range header, either because it does not
+            # support ranges or because the file has changed, and is sending
+            # the whole file
+            write_validator(validator_file, http_validator(res))
+
+        expected = res.getheader('Content-Length')
+        received = 0
+
+        with open(partial_file, 'ab' if res.status == 206 else 'wb') as outfile:
+            for chunk in iter(lambda: res.read(CHUNK_SIZE), b''):
+                outfile.write(chunk)
+                received += len(chunk)
+
+        # http.client does not report a connection closed before the end
+        # of the response, so check that we received all of it
+        if expected is not None and received < int(expected):
+            raise http.client.IncompleteRead(b'', int(expected) - received)
+
+    def download(self, url, output_file):
+        """
+        Downloads a file, optionally compressing it
+        :param url: URL to download
+        :param output_file: Path of downloaded file. If output_file ends in '.gz' and
+                            URL does not, the file will be compressed once downloaded.
+        """
+        parsed = urllib.parse.urlsplit(url)
+        key = (parsed.scheme, parsed.hostname, parsed.port)
+
+        # Download to a file next to the output, so that we don't leave a
+        # partially completed download if we're interrupted, but can
+        # resume the download when we're next run
+        partial_file = output_file + '.part'
+
+        for attempt in range(self.retries + 1):
+            try:
+                self.fetch(url, partial_file)
+                break
+            except PermanentError:
+                raise
+            except (ftplib.Error, http.client.HTTPException, OSError, EOFError) as e:
+                self.discard_connection(key)
+
+                if attempt == self.retries:
+                    raise
+
+                delay = self.backoff * 2 ** attempt
+                report('Failed to download {} ({}), retrying in {}s'.format(url, e, delay), file=sys.stderr)
+                time.sleep(delay)
+
+        write_validator(partial_file + '.validator', None)
+
+        if output_file.endswith('.gz') and not url.endswith('.gz'):
+            compressed_file = output_file + '.tmp'
+            with open(partial_file, 'rb') as infile, gzip.open(compressed_file, 'wb') as outfile:
+                shutil.copyfileobj(infile, outfile)
+            os.remove(partial_file)
+            partial_file = compressed_file
+
+        os.replace(partial_file, output_file)
+        report('Downloaded', url)
+
+
+def close_quietly(conn):
+    try:
+        conn.close()
+    except Exception:
+        pass
+
+
+def days_to_download(args):
+    """
+    Return the (year, month, day) tuples selected by command-line arguments
+    """
+    if args.year:
+        yearmons = [(year, month) for year in args.year for month in range(1, 13)]
+        last_day = datetime.date.today()
+    else:
+        yearmons = [(int(yearmon[0:4]), int(yearmon[4:6])) for yearmon in args.yearmon]
+        last_day = None
 
-    shutil.move(temp_file_name, output_file)
+    for year, month in yearmons:
+        for day in range(1, 1+calendar.monthrange(year, month)[1]):
+            if last_day is None or datetime.date(year, month, day) <= last_day:
+                yield year, month, day
 
 
 def main(raw_args):
     args = parse_args(raw_args)
 
-    year = int(args.yearmon[0:4])
-    month = int(args.yearmon[4:6])
     output_dir = args.output_dir
 
-    for day in range(1, 1+calendar.monthrange(year, month)[1]):
+    downloads = []
+    for year, month, day in days_to_download(args):
         output_file = os.path.join(output_dir,
                                    str(year),
                                    get_standard_filename(year, month, day))
@@ -131,9 +401,30 @@ def main(raw_args):
             print('Skipping', output_file, '(already exists)')
         else:
             os.makedirs(os.path.dirname(output_file), exist_ok=True)
-            download(get_url(year, month, day),
-                     output_file)
+            downloads.append((get_url(year, month, day, args.root), output_file))
+
+    downloader = Downloader(retries=args.retries, backoff=args.backoff)
+    failures = 0
+
+    try:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max(args.workers, 1)) as pool:
+            futures = {pool.submit(downloader.download, url, output_file): url for url, output_file in downloads}
+
+            for future in concurrent.futures.as_completed(futures):
+                try:
+                    future.result()
+                except Exception as e:
+                    report('Failed to download', futures[future], 'with error:', e, file=sys.stderr)
+                    failures += 1
+    finally:
+        downloader.close()
+
+    if failures:
+        print('Failed to download {} of {} files'.format(failures, len(downloads)), file=sys.stderr)
+        return 1
+
+    return 0
 
 
 if __name__ == "__main__":
-    main(sys.argv[1:])
+    sys.exit(main(sys.argv[1:]))
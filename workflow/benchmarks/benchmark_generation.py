@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+
+# Copyright (c) 2026 ISciences, LLC.
+# All rights reserved.
+#
+# WSIM is licensed under the Apache License, Version 2.0 (the "License").
+# You may not use this file except in compliance with the License. You may
+# obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Benchmarks of workflow generation.
+
+Each case generates the steps for a representative configuration with
+workflow.generate_steps and writes them with write_makefile, recording the
+time taken by each phase of generation (global_prep, spinup,
+monthly_observed, monthly_forecast, electric_power, agriculture), the time taken to write the
+Makefile, the number of steps, the size of the Makefile, and the peak
+memory use of the process. Each case is run in a separate process so that
+peak memory use is not affected by other cases.
+
+Usage:
+
+    python3 benchmarks/benchmark_generation.py --output results.json
+    python3 benchmarks/benchmark_generation.py --baseline results.json
+
+When a baseline is provided, the script exits with a nonzero status if any
+case has become slower or used more memory than the baseline by more than
+the specified tolerance.
+"""
+
+import argparse
+import collections
+import contextlib
+import functools
+import io
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from typing import Any, Callable, Dict, List
+
+WORKFLOW_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CONFIG_DIR = os.path.join(WORKFLOW_DIR, 'config')
+
+sys.path.insert(0, WORKFLOW_DIR)
+
+from wsim_workflow import agriculture, electric_power, monthly, spinup, workflow  # noqa: E402
+from wsim_workflow.output import gnu_make  # noqa: E402
+
+Case = collections.namedtuple('Case', ['config', 'start', 'stop', 'no_spinup', 'forecasts', 'stream', 'slow'])
+
+CASES = collections.OrderedDict([
+    ('cfs_spinup',
+     Case('config_cfs.py', '201901', '201901', no_spinup=False, forecasts='latest', stream=False, slow=False)),
+    ('cfs_fast',
+     Case('config_fast.py', '201901', '201901', no_spinup=False, forecasts='latest', stream=False, slow=False)),
+    ('nmme',
+     Case('config_nmme.py', '201901', '201901', no_spinup=False, forecasts='latest', stream=False, slow=False)),
+    ('era5_cfsv2',
+     Case('config_era5_cfsv2.py', '201901', '201901', no_spinup=False, forecasts='latest', stream=False, slow=False)),
+    # Ten years of model iterations, each with forecasts. The steps for this
+    # case do not fit in memory, so they are streamed to the output module
+    # (as done by makemake.py) and the output is discarded.
+    ('cfs_forecasts_all_10yr',
+     Case('config_cfs.py', '200901', '201812', no_spinup=True, forecasts='all', stream=True, slow=True)),
+])
+
+PHASES = collections.OrderedDict([
+    ('spinup', [(spinup, 'spinup')]),
+    ('monthly_observed', [(monthly, 'monthly_observed')]),
+    ('monthly_forecast', [(monthly, 'monthly_forecast')]),
+    ('electric_power', [(electric_power, 'spinup'),
+                        (electric_power, 'monthly_observed'),
+                        (electric_power, 'monthly_forecast')]),
+    ('agriculture', [(agriculture, 'spinup'),
+                     (agriculture, 'monthly_observed'),
+                     (agriculture, 'monthly_forecast')]),
+])
+
+
+def timed(fn: Callable, timings: Dict[str, float], phase: str) -> Callable:
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            timings[phase] += time.perf_counter() - start
+
+    return wrapper
+
+
+@contextlib.contextmanager
+def phase_timers(config, timings: Dict[str, float]):
+    """
+    Accumulate the time spent in the function generating each phase of
+    the workflow
+    """
+    timings['global_prep'] = 0.0
+    config.global_prep = timed(config.global_prep, timings, 'global_prep')
+
+    originals = []
+
+    for phase, functions in PHASES.items():
+        timings[phase] = 0.0
+        for module, name in functions:
+            fn = getattr(module, name)
+            originals.append((module, name, fn))
+            setattr(module, name, timed(fn, timings, phase))
+
+    try:
+        yield
+    finally:
+        for module, name, fn in originals:
+            setattr(module, name, fn)
+
+
+def peak_rss() -> int:
+    # ru_maxrss is reported in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def run_case(name: str, trace: bool) -> Dict[str, Any]:
+    case = CASES[name]
+
+    config = workflow.load_config(os.path.join(CONFIG_DIR, case.config), '/tmp/source', '/tmp/derived', {})
+
+    args = dict(start=case.start,
+                stop=case.stop,
+                no_spinup=case.no_spinup,
+                forecasts=case.forecasts,
+                run_electric_power=True,
+                run_agriculture=True)
+
+    timings = collections.OrderedDict()  # type: Dict[str, float]
+    result = collections.OrderedDict([('case', name)])  # type: Dict[str, Any]
+
+    if trace:
+        tracemalloc.start()
+
+    with tempfile.TemporaryDirectory() as workspace, \
+            contextlib.redirect_stdout(io.StringIO()), \
+            phase_timers(config, timings):
+
+        makefile = os.devnull if case.stream else os.path.join(workspace, 'Makefile')
+
+        start = time.perf_counter()
+        if case.stream:
+            n = workflow.write_makefile(gnu_make, makefile, workflow.iter_steps(config, **args), '/wsim')
+            total = time.perf_counter() - start
+            generate = sum(timings.values())
+            write = total - generate
+        else:
+            steps = workflow.generate_steps(config, **args)
+            generate = time.perf_counter() - start
+
+            start = time.perf_counter()
+            n = workflow.write_makefile(gnu_make, makefile, steps, '/wsim')
+            write = time.perf_counter() - start
+
+        result['steps'] = n
+        result['makefile_bytes'] = None if case.stream else os.path.getsize(makefile)
+
+    result['generate_seconds'] = round(generate, 3)
+    result['write_seconds'] = round(write, 3)
+    result['phase_seconds'] = collections.OrderedDict((k, round(v, 3)) for k, v in timings.items())
+    result['peak_rss_bytes'] = peak_rss()
+
+    if trace:
+        result['peak_traced_bytes'] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    return result
+
+
+def run_in_subprocess(name: str, trace: bool) -> Dict[str, Any]:
+    cmd = [sys.executable, os.path.abspath(__file__), '--worker', name]
+    if trace:
+        cmd.append('--tracemalloc')
+
+    output = subprocess.run(cmd, check=True, stdout=subprocess.PIPE, universal_newlines=True).stdout
+    return json.loads(output)
+
+
+def compare(results: List[Dict[str, Any]], baseline: List[Dict[str, Any]], tolerance: float) -> List[str]:
+    """
+    Return a description of each measurement that exceeds its value in the
+    baseline by more than the specified fraction
+    """
+    previous = {r['case']: r for r in baseline}
+    regressions = []
+
+    for result in results:
+        base = previous.get(result['case'])
+        if base is None:
+            continue
+
+        for key in ('generate_seconds', 'write_seconds', 'peak_rss_bytes', 'peak_traced_bytes'):
+            if key in result and base.get(key) and result[key] > base[key] * (1 + tolerance):
+                regressions.append('{}: {} increased from {} to {}'.format(result['case'], key, base[key], result[key]))
+
+    return regressions
+
+
+def format_result(result: Dict[str, Any]) -> str:
+    phases = ', '.join('{} {:.1f}s'.format(k, v) for k, v in result['phase_seconds'].items() if v)
+    size = '{:.0f} MB'.format(result['makefile_bytes'] / 2**20) if result['makefile_bytes'] is not None else 'discarded'
+
+    return '{:<24} {:>9} steps  generate {:>7.1f}s  write {:>7.1f}s  {:>10}  peak RSS {:>6.0f} MB  ({})'.format(
+        result['case'], result['steps'], result['generate_seconds'], result['write_seconds'], size,
+        result['peak_rss_bytes'] / 2**20, phases)
+
+
+def parse_args(args):
+    parser = argparse.ArgumentParser('Benchmark workflow generation')
+    parser.add_argument('--case', action='append', choices=list(CASES.keys()),
+                        help='Run only the specified case (may be repeated)')
+    parser.add_argument('--all', action='store_true',
+                        help='Include slow cases')
+    parser.add_argument('--tracemalloc', action='store_true',
+                        help='Also record peak memory allocated by Python objects (slows generation)')
+    parser.add_argument('--output', help='Write results to a JSON file')
+    parser.add_argument('--baseline', help='Compare results to a JSON file written with --output')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='Fractional increase relative to the baseline considered a regression')
+    parser.add_argument('--worker', help=argparse.SUPPRESS)
+
+    return parser.parse_args(args)
+
+
+def main(raw_args) -> int:
+    args = parse_args(raw_args)
+
+    if args.worker:
+        print(json.dumps(run_case(args.worker, args.tracemalloc)))
+        return 0
+
+    names = args.case or [name for name, case in CASES.items() if args.all or not case.slow]
+
+    results = []
+    for name in names:
+        result = run_in_subprocess(name, args.tracemalloc)
+        print(format_result(result))
+        results.append(result)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(regression, file=sys.stderr)
+        if regressions:
+            return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -1,6 +1,6 @@
 from typing import List, Optional
 
-from config_cfs import CFSConfig
+from .config_cfs import CFSConfig
 from wsim_workflow import dates
 
 
@@ -11,8 +11,8 @@ class CFSConfigFast(CFSConfig):
         return [3, 12]
 
     # Use only the first 3 forecast ensemble members:
-    def forecast_ensemble_members(self, yearmon, *, lag_hours: Optional[int] = None):
-        return CFSConfig.forecast_ensemble_members(self, yearmon, lag_hours=lag_hours)[:2]
+    def forecast_ensemble_members(self, model, yearmon, *, lag_hours: Optional[int] = None):
+        return CFSConfig.forecast_ensemble_members(self, model, yearmon, lag_hours=lag_hours)[:2]
 
     # Forecast out only 3 months instead of 9:
     def forecast_targets(self, yearmon):
@@ -44,7 +44,8 @@ class GLDAS20_NoahStatic(paths.Static):
             gadm.prepare_admin_boundaries(self.source, [0, 1]) + \
             ntsg_drt.global_flow_direction(self.flowdir_raw, resolution=0.25) + self.extend_flowdir() + \
             hydrobasins.basins(source_dir=self.source, filename=self.basins().file, level=7) + \
-            hydrobasins.downstream_ids(source_dir=self.source, basins_file=self.basins().file, ids_file=self.basin_downstream().file)
+            hydrobasins.downstream_ids(source_dir=self.source, basins_file=self.basins().file, ids_file=self.basin_downstream().file) + \
+            hydrobasins.flow_order(source_dir=self.source, ids_file=self.basin_downstream().file, order_file=self.basin_flow_order())
 
     def extend_flowdir(self):
         return [Step(
@@ -70,6 +71,9 @@ class GLDAS20_NoahStatic(paths.Static):
     def basin_downstream(self):
         return paths.Vardef(os.path.join(self.source, 'HydroBASINS', 'basins_lev07_downstream.nc'), 'next_down')
 
+    def basin_flow_order(self):
+        return os.path.join(self.source, 'HydroBASINS', 'basins_lev07_flow_order.nc')
+
     def countries(self) -> paths.Vardef:
         return paths.Vardef(gadm.admin_boundaries(self.source, 0), None)
 
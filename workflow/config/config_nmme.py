@@ -19,22 +19,40 @@ from wsim_workflow import dates
 from wsim_workflow import paths
 from wsim_workflow.config_base import ConfigBase
 
-from forcing.leaky_bucket import LeakyBucket
-from forcing.nmme import NMMEForecast
-from forcing.cfsv2 import CFSForecast
-from static.default_static import DefaultStatic
+from .forcing.leaky_bucket import LeakyBucket
+from .forcing.nmme import NMMEForecast
+from .forcing.cfsv2 import CFSForecast
+from .static.default_static import DefaultStatic
 
 
 class NMMEConfig(ConfigBase):
 
-    def __init__(self, source, derived):
+    def __init__(self,
+                 source,
+                 derived,
+                 *,
+                 baseline_start_year: Optional[int] = None,
+                 baseline_stop_year: Optional[int] = None,
+                 integration_windows: Optional[int] = None,
+                 distribution: Optional[str] = None,
+                 distribution_subdir: Optional[bool] = True):
+        self.set_fit_years(baseline_start_year, baseline_stop_year)
+        self.set_integration_windows(integration_windows)
+        self.set_distribution(distribution)
+
+        fit_start, *_, fit_end = self.result_fit_years()
+
         self._observed = LeakyBucket(source)
         self._forecast = {
             'CFSv2':  CFSForecast(source, derived, self._observed),
             'CanCM4i': NMMEForecast(source, derived, self._observed, 'CanCM4i', 1982, 2010)
         }
         self._static = DefaultStatic(source, self._observed.grid())
-        self._workspace = paths.DefaultWorkspace(derived)
+        self._workspace = paths.DefaultWorkspace(derived,
+                                                 distribution_subdir=distribution_subdir,
+                                                 distribution=self.distribution,
+                                                 fit_start_year=fit_start,
+                                                 fit_end_year=fit_end)
 
     def historical_years(self):
         return range(1948, 2018)  # 1948-2017
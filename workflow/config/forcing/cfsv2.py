@@ -14,7 +14,7 @@
 import datetime
 import os
 
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
 from wsim_workflow import actions, commands, dates, paths
 from wsim_workflow.step import Step
@@ -207,6 +207,25 @@ class CFSForecast(paths.ForecastForcing):
     def download_hindcasts(self, target_month: int, lead: int) -> List[Step]:
         steps = []
 
+        if self.batch_downloads:
+            hindcasts = list(self.available_hindcasts(target_month, lead))
+
+            if hindcasts:
+                download = self.download_batch(hindcasts,
+                                               [self.hindcast_grib(timestamp=timestamp, target=target)
+                                                for timestamp, target in hindcasts],
+                                               'hindcasts_{:02d}_lead_{}'.format(target_month, lead))
+                steps.append(download)
+
+            for timestamp, target in hindcasts:
+                grib_file = self.hindcast_grib(timestamp=timestamp, target=target)
+                netcdf_file = self.hindcast_raw(timestamp=timestamp, target=target)
+
+                steps.append(commands.forecast_convert(grib_file, netcdf_file, self.observed().grid())
+                             .replace_dependencies(*download.targets))
+
+            return steps
+
         for timestamp, target in self.available_hindcasts(target_month, lead):
             grib_file = self.hindcast_grib(timestamp=timestamp, target=target)
             grib_dir = os.path.dirname(grib_file)
@@ -230,6 +249,30 @@ class CFSForecast(paths.ForecastForcing):
 
         return steps
 
+    @staticmethod
+    def download_batch(forecasts: List[Tuple[str, str]], grib_files: List[str], name: str) -> Step:
+        """
+        Return a Step that downloads the GRIB files of several (timestamp, target)
+        forecasts concurrently. The only target of the step is a tag file, written
+        once all files are downloaded, so that the GRIB files are not deleted by
+        Make if one of the downloads fails. Files that are already complete are
+        not downloaded again when the step is rerun.
+        """
+        # GRIB files are stored in a cfs.YYYYMMDD subdirectory of a common root
+        output_root = os.path.dirname(os.path.dirname(grib_files[0]))
+
+        return Step(
+            targets=[],
+            dependencies=[],
+            commands=[
+                [
+                    os.path.join('{BINDIR}', 'utils', 'noaa_cfsv2_forecast', 'download_cfsv2_forecast.py'),
+                    '--output_root', output_root,
+                    '--forecast'
+                ] + ['{}:{}'.format(timestamp, target) for timestamp, target in forecasts]
+            ]
+        ).replace_targets_with_tag_file(os.path.join(output_root, 'download_{}.tag'.format(name)))
+
     def compute_fit_hindcast(self, varname: str, target_month: int, lead: int) -> List[Step]:
         assert varname in {'T', 'Pr'}
 
@@ -268,6 +311,30 @@ class CFSForecast(paths.ForecastForcing):
             commands.forecast_convert(infile, outfile, self.observed().grid())
         ]
 
+    def ensemble_prep_steps(self, *, yearmon: str, targets: List[str], members: List[str]) -> List[Step]:
+        if not self.batch_downloads:
+            return super().ensemble_prep_steps(yearmon=yearmon, targets=targets, members=members)
+
+        forecasts = [(member, target) for member in members for target in targets]
+
+        if not forecasts:
+            return []
+
+        download = self.download_batch(forecasts,
+                                       [self.forecast_grib(timestamp=member, target=target)
+                                        for member, target in forecasts],
+                                       'ensemble_{}'.format(yearmon))
+        steps = [download]
+
+        for member, target in forecasts:
+            infile = self.forecast_grib(timestamp=member, target=target)
+            outfile = self.forecast_raw(yearmon=yearmon, member=member, target=target).split('::')[0]
+
+            steps.append(commands.forecast_convert(infile, outfile, self.observed().grid())
+                         .replace_dependencies(*download.targets))
+
+        return steps
+
     @staticmethod
     def last_7_days_of_previous_month(yearmon: str, lag_hours: Optional[int] = None) -> List[str]:
         # Build an ensemble of 28 forecasts by taking the four
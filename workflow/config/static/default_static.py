@@ -76,7 +76,10 @@ class DefaultStatic(paths.Static, paths.ElectricityStatic, paths.AgricultureStat
         return hydrobasins.basins(source_dir=self.source, filename=self.basins().file, level=7) + \
                hydrobasins.downstream_ids(source_dir=self.source,
                                           basins_file=self.basins().file,
-                                          ids_file=self.basin_downstream().file)
+                                          ids_file=self.basin_downstream().file) + \
+               hydrobasins.flow_order(source_dir=self.source,
+                                      ids_file=self.basin_downstream().file,
+                                      order_file=self.basin_flow_order())
 
     def prepare_ag_calendars(self):
         return mirca2000.crop_calendars(source_dir=self.source)
@@ -111,6 +114,9 @@ class DefaultStatic(paths.Static, paths.ElectricityStatic, paths.AgricultureStat
     def basin_downstream(self) -> paths.Vardef:
         return paths.Vardef(os.path.join(self.source, 'HydroBASINS', 'basins_lev07_downstream.nc'), 'next_down')
 
+    def basin_flow_order(self) -> str:
+        return os.path.join(self.source, 'HydroBASINS', 'basins_lev07_flow_order.nc')
+
     def dam_locations(self) -> paths.Vardef:
         return paths.Vardef(grand.dam_locations(self.source), None)
 
@@ -300,6 +300,85 @@ class TestCFSConfig(unittest.TestCase):
             if timestamp == '1989021500':
                 self.fail()
 
+    def test_batch_forecast_downloads(self):
+        config = CFSConfig(self.source, self.derived)
+        config.set_batch_downloads(True)
+        data = config.forecast_data('CFSv2')
+
+        yearmon = '201901'
+        members = config.forecast_ensemble_members('CFSv2', yearmon)
+        targets = config.forecast_targets(yearmon)
+
+        steps = data.ensemble_prep_steps(yearmon=yearmon, targets=targets, members=members)
+
+        downloads = [s for s in steps if s.commands[0][0].endswith('download_cfsv2_forecast.py')]
+        self.assertEqual(1, len(downloads))
+
+        # a single tag file is written once all downloads are complete
+        tag, = downloads[0].targets
+        self.assertTrue(tag.endswith('.tag'))
+
+        for member in members:
+            for target in targets:
+                grib = data.forecast_grib(timestamp=member, target=target)
+                self.assertIn('{}:{}'.format(member, target), downloads[0].commands[0])
+
+                # conversion waits for the tag file, not the GRIB itself,
+                # which is not a target of any step
+                convert = step_for_target(steps, data.forecast_raw(yearmon=yearmon, target=target, member=member))
+                self.assertSetEqual({tag}, convert.dependencies)
+                self.assertIsNone(step_for_target(steps, grib))
+
+    def test_batch_hindcast_downloads(self):
+        config = CFSConfig(self.source, self.derived)
+        config.set_batch_downloads(True)
+        data = config.forecast_data('CFSv2')
+
+        hindcasts = list(data.available_hindcasts(target_month=3, lead=2))
+        steps = data.download_hindcasts(3, 2)
+
+        download, = [s for s in steps if s.commands[0][0].endswith('download_cfsv2_forecast.py')]
+        self.assertEqual(os.path.join(self.source, 'NCEP_CFSv2', 'hindcast_grib'),
+                         get_arg(download.commands[0], '--output_root'))
+
+        self.assertEqual(1, len(download.targets))
+        for timestamp, target in hindcasts:
+            self.assertIn('{}:{}'.format(timestamp, target), download.commands[0])
+            convert = step_for_target(steps, data.hindcast_raw(timestamp=timestamp, target=target))
+            self.assertSetEqual(download.targets, convert.dependencies)
+        self.assertEqual(len(hindcasts) + 1, len(steps))
+
+    def test_batch_downloads_runnable_by_make(self):
+        import wsim_workflow.output.gnu_make
+
+        config = CFSConfig(self.source, self.derived)
+        config.set_batch_downloads(True)
+        data = config.forecast_data('CFSv2')
+
+        yearmon = '201901'
+        steps = data.ensemble_prep_steps(yearmon=yearmon,
+                                         targets=config.forecast_targets(yearmon),
+                                         members=config.forecast_ensemble_members('CFSv2', yearmon))
+        steps += data.download_hindcasts(3, 2)
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filename = os.path.join(tmpdir, 'Makefile')
+            with open(filename, 'w') as makefile:
+                for step in steps:
+                    makefile.write(wsim_workflow.output.gnu_make.write_step(step, dict(BINDIR='/wsim')))
+                    makefile.write('\n')
+
+            for step in steps:
+                if step.commands[0][0].endswith('download_cfsv2_forecast.py'):
+                    continue
+
+                target = next(iter(step.targets))
+                dry_run = subprocess.run(['make', '-n', '-f', filename, target],
+                                         stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+
+                self.assertEqual(0, dry_run.returncode, dry_run.stderr)
+                self.assertIn('download_cfsv2_forecast.py', dry_run.stdout)
+
     @unittest.skip
     def test_makefile_readable(self):
         import wsim_workflow.output.gnu_make
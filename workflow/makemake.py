@@ -26,6 +26,12 @@ import argparse
 
 from wsim_workflow import workflow
 from wsim_workflow import dates
+from wsim_workflow.config_base import INTEGRATION_METHODS, RETURN_PERIOD_BATCHING
+from wsim_workflow.cores import limit_cores
+from wsim_workflow.resources import estimate_memory
+from wsim_workflow.graph import WorkflowGraph
+from wsim_workflow.telemetry import DEFAULT_LOG as DEFAULT_TELEMETRY_LOG, instrument_steps
+from wsim_workflow.worker_pool import use_worker_pool
 
 import importlib
 import importlib.util
@@ -95,6 +101,92 @@ def parse_args(args):
                         help='Only process the specified integration windows (comma-separated list)',
                         required=False,
                         type=str)
+    parser.add_argument('--integration-method',
+                        help='Method used to compute time-integrated values: from the monthly values in each '
+                             'window (monthly, the default), from the values of shorter windows (derived, e.g. '
+                             'a 12-month sum from two 6-month sums), or for all windows from a single pass over '
+                             'the monthly values (single_pass)',
+                        choices=INTEGRATION_METHODS,
+                        required=False,
+                        type=str)
+    parser.add_argument('--stack-members',
+                        help='Stack the time-integrated values, return periods and anomalies of forecast ensemble '
+                             'members along a "member" dimension in a single file for each model, target and window',
+                        action='store_true')
+    parser.add_argument('--batch-return-periods',
+                        help='Compute forecast return periods for all ensemble members using the same integration '
+                             'window (members), or for all members and windows (all), in a single process for '
+                             'each model and target, so that distribution fits are only read once per window',
+                        choices=RETURN_PERIOD_BATCHING,
+                        required=False,
+                        type=str)
+    parser.add_argument('--incremental-summaries',
+                        help='Write each forecast ensemble member to a single stacked file as soon as it is available, '
+                             'and compute ensemble summaries from that file',
+                        action='store_true')
+    parser.add_argument('--spinup-segment-years',
+                        help='Divide the spinup LSM runs over the historical period into segments of N years, '
+                             'so that a failed run resumes from the last completed segment',
+                        required=False,
+                        type=int)
+    parser.add_argument('--spinup-tolerance',
+                        help='Stop the spinup LSM run using monthly climate norms once no cell of the model state '
+                             'changes by more than the specified amount (mm) from one year to the next',
+                        required=False,
+                        type=float)
+    parser.add_argument('--batch-fits',
+                        help='Fit the distributions of each variable for all twelve months in a single process',
+                        action='store_true')
+    parser.add_argument('--batch-size',
+                        help='Run up to N independent invocations of the same WSIM R script in a single process',
+                        required=False,
+                        type=int)
+    parser.add_argument('--targets',
+                        help='Only write steps needed to build the specified targets (comma-separated list), '
+                             'e.g. all_adjusted_composites',
+                        required=False,
+                        type=str)
+    parser.add_argument('--validate',
+                        help='Check for unbuildable steps and dependency cycles before writing '
+                             '(requires holding the entire workflow in memory)',
+                        action='store_true')
+    parser.add_argument('--worker-socket',
+                        help='Run WSIM R tools using the worker pool listening on the specified socket '
+                             '(see wsim_worker.py)',
+                        required=False,
+                        type=str)
+    parser.add_argument('--telemetry',
+                        help='Record the resources used by each command to {} in the workspace '
+                             '(see wsim_telemetry.py)'.format(DEFAULT_TELEMETRY_LOG),
+                        action='store_true')
+    parser.add_argument('--cores-per-step',
+                        help='Number of CPU cores used by each step that can use several (e.g., distribution fits)',
+                        required=False,
+                        type=int)
+    parser.add_argument('--total-cores',
+                        help='Number of CPU cores shared by all steps, so that running steps in parallel '
+                             '(e.g., with make -j) does not use more cores than are available. Each step waits '
+                             'until the cores it uses are free (see wsim_cores.py)',
+                        required=False,
+                        type=int)
+    parser.add_argument('--cached-coverage',
+                        help='Compute the coverage of grid cells by basins, countries and provinces once, instead of '
+                             'intersecting the polygons with the grid each time results are aggregated',
+                        action='store_true')
+    parser.add_argument('--fused-composites',
+                        help='Compute composite indicators, composite anomalies and their return periods, adjusted '
+                             'composites and population summaries for each month and integration window in a '
+                             'single process',
+                        action='store_true')
+    parser.add_argument('--batch-downloads',
+                        help='Download the forecast files for each ensemble, and each set of hindcasts, concurrently '
+                             'in a single step instead of using a step for each file',
+                        action='store_true')
+    parser.add_argument('--estimate-memory',
+                        help='Record the estimated peak memory use of each step, so that the executor output '
+                             'module can run steps within a memory budget '
+                             '(see python3 -m wsim_workflow.output.executor --memory)',
+                        action='store_true')
     parser.add_argument('--forecast-lag-hours',
                         type=int,
                         help="Only attempt to download forecasts issued within the specified number of hours")
@@ -107,6 +199,9 @@ def parse_args(args):
     if parsed.only_windows:
         parsed.only_windows = [int(w) for w in parsed.only_windows.split(',')]
 
+    if parsed.targets:
+        parsed.targets = [t for t in parsed.targets.split(',') if t]
+
     if not dates.is_yearmon(parsed.start):
         sys.exit('Start date {} is not in YYYYMM format.'.format(parsed.start))
 
@@ -116,12 +211,42 @@ def parse_args(args):
     if parsed.forecasts not in ('all', 'none', 'latest'):
         sys.exit('--forecasts flag must be one of: all, none, latest')
 
+    if parsed.telemetry and parsed.worker_socket:
+        sys.exit('--telemetry cannot be combined with --worker-socket, because the resources used by jobs '
+                 'run in the worker pool cannot be attributed to individual commands')
+
+    if parsed.cores_per_step and parsed.total_cores and parsed.cores_per_step > parsed.total_cores:
+        sys.exit('--cores-per-step cannot exceed --total-cores')
+
     if (parsed.baseline_start_year is None) != (parsed.baseline_stop_year is None):
         sys.exit('Must provide both --baseline-start-year and --baseline-stop-year')
 
     return parsed
 
 
+def report_graph(graph):
+    print('Checked {} steps'.format(len(graph)))
+
+    cyclic = graph.cyclic_steps()
+    for step in cyclic[:100]:
+        print("Step is part of a dependency cycle:", ' '.join(sorted(step.targets)), file=sys.stderr)
+
+    cyclic_ids = {id(step) for step in cyclic}
+    for step in graph.unbuildable()[:100]:
+        if id(step) in cyclic_ids:
+            continue
+        missing = [d for d in step.dependencies if d not in graph.producer]
+        for target in sorted(step.targets):
+            print("Don't know how to build", target, "(depends on", ",".join(sorted(missing)) or "unbuildable step", ")",
+                  file=sys.stderr)
+
+    critical_path = graph.critical_path()
+    print('Maximum dependency tree depth:', graph.max_depth())
+    if critical_path:
+        print('Critical path of {} steps ends with:'.format(len(critical_path)),
+              ' '.join(sorted(critical_path[-1].targets)))
+
+
 def main(raw_args):
     args = parse_args(raw_args)
 
@@ -140,6 +265,18 @@ def main(raw_args):
 
     config = workflow.load_config(args.config, args.source, args.workspace, config_options)
 
+    config.set_integration_method(args.integration_method)
+    config.set_stack_members(args.stack_members)
+    config.set_return_period_batching(args.batch_return_periods)
+    config.set_incremental_summaries(args.incremental_summaries)
+    config.set_spinup_segment_years(args.spinup_segment_years)
+    config.set_spinup_tolerance(args.spinup_tolerance)
+    config.set_batch_fits(args.batch_fits)
+    config.set_cores_per_step(args.cores_per_step)
+    config.set_cached_coverage(args.cached_coverage)
+    config.set_fused_composites(args.fused_composites)
+    config.set_batch_downloads(args.batch_downloads)
+
     if args.only_windows:
         for w in args.only_windows:
             if w not in config.integration_windows():
@@ -152,24 +289,57 @@ def main(raw_args):
     if args.distribution:
         print(f"Overriding distribution with {args.distribution}")
 
-    steps = workflow.generate_steps(config,
-                                    start=args.start,
-                                    stop=args.stop,
-                                    step=args.step,
-                                    no_spinup=args.nospinup,
-                                    forecasts=args.forecasts,
-                                    run_electric_power=not args.noelectric,
-                                    run_agriculture=not args.noagriculture,
-                                    forecast_lag_hours=args.forecast_lag_hours)
-
-    duplicate_targets = workflow.find_duplicate_targets(steps)
-    if duplicate_targets:
-        for target in duplicate_targets[:100]:
-            print("Duplicate target encountered:", target, file=sys.stderr)
+    steps = workflow.iter_steps(config,
+                                start=args.start,
+                                stop=args.stop,
+                                step=args.step,
+                                no_spinup=args.nospinup,
+                                forecasts=args.forecasts,
+                                run_electric_power=not args.noelectric,
+                                run_agriculture=not args.noagriculture,
+                                forecast_lag_hours=args.forecast_lag_hours,
+                                batch_size=args.batch_size)
+
+    duplicate_targets = []
+
+    if args.targets:
+        try:
+            steps = WorkflowGraph(steps).required(args.targets)
+        except ValueError as e:
+            sys.exit(str(e))
+        print('Selected {} steps needed to build {}'.format(len(steps), ', '.join(args.targets)))
+
+    if args.validate:
+        graph = WorkflowGraph(steps)
+        steps = graph.steps
+        duplicate_targets = graph.duplicates
+
+        report_graph(graph)
+    else:
+        steps = workflow.track_duplicate_targets(steps, duplicate_targets)
+
+    if args.estimate_memory:
+        steps = estimate_memory(steps, config.observed_data().grid())
+
+    if args.worker_socket:
+        steps = use_worker_pool(steps, args.worker_socket)
+
+    if args.telemetry:
+        steps = instrument_steps(steps, os.path.join(args.workspace, DEFAULT_TELEMETRY_LOG))
+
+    if args.total_cores:
+        steps = limit_cores(steps, os.path.join(args.workspace, '.cores'), args.total_cores)
 
     workflow_file = os.path.join(args.workspace, output_filename)
-    print('Writing {} steps to {} using module: {}'.format(len(steps), workflow_file, args.module))
-    workflow.write_makefile(output_module, workflow_file, steps, args.bindir)
+    print('Writing steps to {} using module: {}'.format(workflow_file, args.module))
+    # When only some targets are written, the default meta-step may not be among them
+    n = workflow.write_makefile(output_module, workflow_file, steps, args.bindir,
+                                goal=None if args.targets else workflow.default_goal())
+    print('Wrote {} steps'.format(n))
+
+    if duplicate_targets:
+        for target in sorted(set(duplicate_targets))[:100]:
+            print("Duplicate target encountered:", target, file=sys.stderr)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,229 @@
+# Copyright (c) 2026 ISciences, LLC.
+# All rights reserved.
+#
+# WSIM is licensed under the Apache License, Version 2.0 (the "License").
+# You may not use this file except in compliance with the License. You may
+# obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import io
+import os
+import tempfile
+import unittest
+
+from wsim_workflow.step import Step
+from wsim_workflow.output.executor import Executor, Job, parse_memory, read_workflow, write_step, header
+
+
+class TestExecutor(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.dir = self.tmpdir.name
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.dir, name)
+
+    def write_workflow(self, steps):
+        filename = self.path('workflow.jsonl')
+        with open(filename, 'w') as outfile:
+            outfile.write(header() + '\n\n')
+            for step in steps:
+                outfile.write(write_step(step, {'DIR': self.dir}) + '\n')
+        return filename
+
+    def executor(self, steps, **kwargs):
+        filename = self.write_workflow(steps)
+        return Executor(read_workflow(filename), journal=filename + '.journal', log=io.StringIO(), **kwargs)
+
+    def test_multiple_targets_not_patternized(self):
+        s = Step(targets=['a.txt', 'b.txt'], dependencies='source.txt', commands=[['process', 'source.txt', 'a.txt', 'b.txt']])
+
+        jobs = read_workflow(self.write_workflow([s]))
+
+        self.assertEqual(1, len(jobs))
+        self.assertEqual(('a.txt', 'b.txt'), jobs[0].targets)
+        self.assertEqual(('source.txt',), jobs[0].dependencies)
+
+    def test_mkdir_commands_written(self):
+        s = Step(targets='{DIR}/sub/a.txt', commands=[['touch', '{DIR}/sub/a.txt']])
+
+        job = read_workflow(self.write_workflow([s]))[0]
+
+        self.assertEqual('mkdir -p {}/sub'.format(self.dir), job.commands[0])
+        self.assertEqual('touch {}/sub/a.txt'.format(self.dir), job.commands[1])
+
+    def test_builds_in_dependency_order(self):
+        steps = [
+            Step.create_meta('all', ['{DIR}/c.txt']),
+            Step(targets='{DIR}/c.txt', dependencies=['{DIR}/a.txt', '{DIR}/b.txt'],
+                 commands=[['cat', '{DIR}/a.txt', '{DIR}/b.txt', '>', '{DIR}/c.txt']]),
+            Step(targets='{DIR}/b.txt', dependencies='{DIR}/a.txt',
+                 commands=[['echo', 'b', '>', '{DIR}/b.txt']]),
+            Step(targets='{DIR}/a.txt',
+                 commands=[['echo', 'a', '>', '{DIR}/a.txt']]),
+        ]
+
+        self.assertTrue(self.executor(steps, n_jobs=4).run(['all']))
+
+        with open(self.path('c.txt')) as f:
+            self.assertEqual('a\nb\n', f.read())
+
+        self.assertFalse(os.path.exists(self.path('workflow.jsonl.journal')))
+
+    def test_only_required_steps_run(self):
+        steps = [
+            Step(targets='{DIR}/a.txt', commands=[['touch', '{DIR}/a.txt']]),
+            Step(targets='{DIR}/b.txt', commands=[['touch', '{DIR}/b.txt']]),
+        ]
+
+        self.assertTrue(self.executor(steps).run([self.path('b.txt')]))
+
+        self.assertFalse(os.path.exists(self.path('a.txt')))
+        self.assertTrue(os.path.exists(self.path('b.txt')))
+
+    def test_up_to_date_targets_not_rebuilt(self):
+        with open(self.path('a.txt'), 'w') as f:
+            f.write('existing')
+
+        steps = [
+            Step(targets='{DIR}/a.txt', commands=[['echo', 'new', '>', '{DIR}/a.txt']]),
+        ]
+
+        self.assertTrue(self.executor(steps).run())
+
+        with open(self.path('a.txt')) as f:
+            self.assertEqual('existing', f.read())
+
+    def test_newer_dependencies_trigger_rebuild(self):
+        for name in ('a.txt', 'b.txt'):
+            with open(self.path(name), 'w') as f:
+                f.write('existing')
+        os.utime(self.path('b.txt'), (0, 0))
+
+        steps = [
+            Step(targets='{DIR}/b.txt', dependencies='{DIR}/a.txt', commands=[['echo', 'new', '>', '{DIR}/b.txt']]),
+        ]
+
+        self.assertTrue(self.executor(steps, check_mtimes=False).run())
+        with open(self.path('b.txt')) as f:
+            self.assertEqual('existing', f.read())
+
+        self.assertTrue(self.executor(steps).run())
+        with open(self.path('b.txt')) as f:
+            self.assertEqual('new\n', f.read())
+
+    def test_targets_deleted_on_error(self):
+        steps = [
+            Step(targets='{DIR}/a.txt', commands=[['echo', 'partial', '>', '{DIR}/a.txt'], ['false']]),
+            Step(targets='{DIR}/b.txt', dependencies='{DIR}/a.txt', commands=[['touch', '{DIR}/b.txt']]),
+        ]
+
+        self.assertFalse(self.executor(steps).run())
+
+        self.assertFalse(os.path.exists(self.path('a.txt')))
+        self.assertFalse(os.path.exists(self.path('b.txt')))
+
+    def test_keep_going(self):
+        steps = [
+            Step(targets='{DIR}/a.txt', commands=[['false']]),
+            Step(targets='{DIR}/b.txt', dependencies='{DIR}/a.txt', commands=[['touch', '{DIR}/b.txt']]),
+            Step(targets='{DIR}/c.txt', dependencies='{DIR}/d.txt', commands=[['touch', '{DIR}/c.txt']]),
+            Step(targets='{DIR}/d.txt', commands=[['sleep', '0.1'], ['touch', '{DIR}/d.txt']]),
+        ]
+
+        self.assertFalse(self.executor(steps, keep_going=True).run())
+
+        self.assertFalse(os.path.exists(self.path('b.txt')))
+        self.assertTrue(os.path.exists(self.path('c.txt')))
+
+    def test_missing_source_file(self):
+        steps = [
+            Step(targets='{DIR}/b.txt', dependencies='{DIR}/a.txt', commands=[['touch', '{DIR}/b.txt']]),
+        ]
+
+        self.assertFalse(self.executor(steps).run())
+        self.assertFalse(os.path.exists(self.path('b.txt')))
+
+    def test_incomplete_steps_cleaned_up_on_resume(self):
+        with open(self.path('a.txt'), 'w') as f:
+            f.write('partial')
+
+        job = Job(targets=[self.path('a.txt')], dependencies=[], commands=['echo complete > ' + self.path('a.txt')])
+
+        with open(self.path('journal'), 'w') as f:
+            f.write('start {}\n'.format(job.key()))
+
+        self.assertTrue(Executor([job], journal=self.path('journal'), log=io.StringIO()).run())
+
+        with open(self.path('a.txt')) as f:
+            self.assertEqual('complete\n', f.read())
+
+    def test_cores_shared_by_running_steps(self):
+        log = self.path('log.txt')
+
+        steps = [
+            Step(targets='{{DIR}}/{}.txt'.format(name),
+                 commands=[['echo', 'start', '>>', log],
+                           ['sleep', '0.2'],
+                           ['echo', 'end', '>>', log],
+                           ['touch', '{{DIR}}/{}.txt'.format(name)]],
+                 cores=2)
+            for name in ('a', 'b', 'c')
+        ]
+
+        jobs = read_workflow(self.write_workflow(steps))
+        self.assertEqual(2, jobs[0].cores)
+
+        self.assertTrue(self.executor(steps, n_jobs=3, n_cores=4).run())
+
+        running = 0
+        max_running = 0
+        with open(log) as f:
+            for line in f:
+                running += 1 if line.strip() == 'start' else -1
+                max_running = max(running, max_running)
+
+        self.assertEqual(2, max_running)
+
+    def test_memory_shared_by_running_steps(self):
+        log = self.path('log.txt')
+
+        steps = [
+            Step(targets='{{DIR}}/{}.txt'.format(name),
+                 commands=[['echo', 'start', '>>', log],
+                           ['sleep', '0.2'],
+                           ['echo', 'end', '>>', log],
+                           ['touch', '{{DIR}}/{}.txt'.format(name)]],
+                 memory=memory)
+            for name, memory in (('a', 3 * 2**30), ('b', 3 * 2**30), ('c', 6 * 2**30))
+        ]
+
+        jobs = read_workflow(self.write_workflow(steps))
+        self.assertEqual(3 * 2**30, jobs[0].memory)
+
+        # c is larger than the budget, so it runs by itself
+        self.assertTrue(self.executor(steps, n_jobs=3, memory=4 * 2**30).run())
+
+        running = 0
+        max_running = 0
+        with open(log) as f:
+            for line in f:
+                running += 1 if line.strip() == 'start' else -1
+                max_running = max(running, max_running)
+
+        self.assertEqual(1, max_running)
+        self.assertTrue(os.path.exists(self.path('c.txt')))
+
+    def test_parse_memory(self):
+        self.assertEqual(64 * 2**30, parse_memory('64G'))
+        self.assertEqual(512 * 2**20, parse_memory('512m'))
+        self.assertEqual(1000, parse_memory('1000'))
@@ -0,0 +1,61 @@
+# Copyright (c) 2026 ISciences, LLC.
+# All rights reserved.
+#
+# WSIM is licensed under the Apache License, Version 2.0 (the "License").
+# You may not use this file except in compliance with the License. You may
+# obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+
+from wsim_workflow.step import Step
+from wsim_workflow.output.ninja import write_step
+
+
+class TestNinja(unittest.TestCase):
+
+    def test_multiple_targets(self):
+        s = Step(targets=['a.txt', 'b.txt'], dependencies='source.txt', commands=[['process', 'source.txt', 'a.txt', 'b.txt']])
+
+        build_line = write_step(s).split('\n')[0]
+
+        self.assertEqual('build a.txt b.txt: run || source.txt', build_line)
+
+    def test_normal_dependencies(self):
+        s = Step(targets='a.txt', dependencies='source.txt', commands=[['process', 'source.txt', 'a.txt']])
+
+        build_line = write_step(s, use_order_only_rules=False).split('\n')[0]
+
+        self.assertEqual('build a.txt: run source.txt', build_line)
+
+    def test_commands_joined(self):
+        s = Step(targets='/tmp/out/a.txt', commands=[['echo', '$HOME', '>', '/tmp/out/a.txt'], ['touch', 'b']])
+
+        cmd_line = [line for line in write_step(s).split('\n') if line.startswith('  cmd =')][0]
+
+        self.assertEqual('  cmd = mkdir -p /tmp/out && echo $$HOME > /tmp/out/a.txt && touch b', cmd_line)
+
+    def test_paths_escaped(self):
+        s = Step(targets='NETCDF:my file.nc', commands=[['touch', 'x']])
+
+        self.assertTrue(write_step(s).startswith('build NETCDF$:my$ file.nc: run'))
+
+    def test_variable_substitution(self):
+        s = Step(targets=['{ROOT_DIR}/fizz'],
+                 dependencies=['{SOURCE_DIR}/buzz'],
+                 commands=[['echo', '{SOURCE_DIR}/buzz', '>', '{ROOT_DIR}/fizz']])
+
+        step_text = write_step(s, dict(ROOT_DIR='/tmp/root', SOURCE_DIR='/tmp/src'))
+
+        self.assertFalse('{' in step_text)
+        self.assertTrue('build /tmp/root/fizz: run || /tmp/src/buzz' in step_text)
+
+    def test_meta_steps_are_phony(self):
+        s = Step.create_meta('all_composites', ['a.nc', 'b.nc'])
+
+        self.assertEqual('build all_composites: phony a.nc b.nc\n', write_step(s))
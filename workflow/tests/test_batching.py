@@ -0,0 +1,74 @@
+# Copyright (c) 2026 ISciences, LLC.
+# All rights reserved.
+#
+# WSIM is licensed under the Apache License, Version 2.0 (the "License").
+# You may not use this file except in compliance with the License. You may
+# obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+
+from wsim_workflow.batching import batch_steps
+from wsim_workflow.commands import wsim_anom, wsim_composite, wsim_lsm
+from wsim_workflow.graph import WorkflowGraph
+
+
+def anom(member):
+    return wsim_anom(fits='fit.nc',
+                     obs='results_{}.nc'.format(member),
+                     rp='rp_{}.nc'.format(member),
+                     sa='sa_{}.nc'.format(member))
+
+
+class TestBatching(unittest.TestCase):
+
+    def test_same_tool_batched(self):
+        steps = [anom(m) for m in range(5)]
+
+        batched = batch_steps(steps, batch_size=3)
+
+        self.assertEqual(2, len(batched))
+        self.assertSetEqual({'rp_0.nc', 'sa_0.nc', 'rp_1.nc', 'sa_1.nc', 'rp_2.nc', 'sa_2.nc'}, batched[0].targets)
+        self.assertSetEqual({'fit.nc', 'results_0.nc', 'results_1.nc', 'results_2.nc'}, batched[0].dependencies)
+
+        cmd = batched[0].commands[0]
+        self.assertEqual('{BINDIR}/wsim_batch.R', cmd[0])
+        self.assertEqual(2, cmd.count('--next'))
+        self.assertEqual(3, cmd.count('{BINDIR}/wsim_anom.R'))
+
+        self.assertEqual(batched[1].commands, [('{BINDIR}/wsim_batch.R',) + steps[3].commands[0] + ('--next',) + steps[4].commands[0]])
+
+    def test_single_step_not_batched(self):
+        steps = [anom(1)]
+
+        self.assertListEqual(steps, batch_steps(steps, batch_size=10))
+
+    def test_other_tools_not_batched(self):
+        lsm = wsim_lsm(wc='wc.nc', flowdir='flowdir.nc', elevation='elev.nc', state='state.nc', forcing='forcing.nc',
+                       results='results_0.nc', next_state='next_state.nc')
+        steps = [lsm, anom(1), anom(2)]
+
+        batched = batch_steps(steps, batch_size=10)
+
+        self.assertEqual(2, len(batched))
+        self.assertIs(lsm, batched[0])
+
+    def test_dependent_steps_not_combined(self):
+        # composite_anomalies -> anom -> adjusted composite. Combining both composite
+        # steps would create a cycle with the anom step.
+        composite_anom = wsim_composite(surplus=['sa.nc::a'], deficit=['sa.nc::b'], output='composite_anom.nc')
+        composite_rp = wsim_anom(fits='fit_composite.nc', obs='composite_anom.nc', rp='composite_anom_rp.nc')
+        adjusted = wsim_composite(surplus=['composite_anom_rp.nc::a'], deficit=['composite_anom_rp.nc::b'],
+                                  output='adjusted.nc')
+        other_composite = wsim_composite(surplus=['sa2.nc::a'], deficit=['sa2.nc::b'], output='composite_anom2.nc')
+
+        batched = batch_steps([composite_anom, composite_rp, adjusted, other_composite], batch_size=10)
+
+        self.assertEqual(3, len(batched))
+        self.assertSetEqual({'composite_anom.nc', 'composite_anom2.nc'}, batched[0].targets)
+        self.assertListEqual([], WorkflowGraph(batched).cyclic_steps())
@@ -0,0 +1,182 @@
+# Copyright (c) 2026 ISciences, LLC.
+# All rights reserved.
+#
+# WSIM is licensed under the Apache License, Version 2.0 (the "License").
+# You may not use this file except in compliance with the License. You may
+# obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import http.server
+import importlib.util
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+SCRIPT = os.path.join(os.path.dirname(__file__), os.pardir, os.pardir,
+                      'utils', 'noaa_cfsv2_forecast', 'download_cfsv2_forecast.py')
+
+spec = importlib.util.spec_from_file_location('download_cfsv2_forecast', SCRIPT)
+download_cfsv2 = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(download_cfsv2)
+
+
+def contents(path):
+    return 'contents of {}'.format(path).encode() * 1000
+
+
+class MirrorHandler(http.server.BaseHTTPRequestHandler):
+    """
+    Serves generated file contents from the /good mirror, and reports all
+    files missing from the /empty mirror and from the /good mirror for
+    timestamps in server.missing
+    """
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests.append(self.path)
+
+        if self.path.startswith('/empty/') or any(t in self.path for t in server.missing):
+            self.send_error(404)
+            return
+
+        body = contents(self.path)
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestCfsv2ForecastDownload(unittest.TestCase):
+
+    forecasts = [('2019012500', '201902'),
+                 ('2019012506', '201902'),
+                 ('2019012612', '201903'),
+                 ('2019013118', '201909')]
+
+    def setUp(self):
+        self.server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), MirrorHandler)
+        self.server.lock = threading.Lock()
+        self.server.requests = []
+        self.server.missing = set()
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+        root = 'http://127.0.0.1:{}'.format(self.server.server_address[1])
+        self.empty_mirror = root + '/empty/{TIMESTAMP}/{GRIBFILE}'
+        self.good_mirror = root + '/good/{TIMESTAMP}/{GRIBFILE}'
+
+        self.output_root = tempfile.mkdtemp()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.output_root)
+
+    def run_batch(self, *args, forecasts=None):
+        forecasts = forecasts or self.forecasts
+        return download_cfsv2.main(['--output_root', self.output_root,
+                                    '--mirrors', self.empty_mirror, self.good_mirror,
+                                    '--forecast'] + ['{}:{}'.format(*f) for f in forecasts] + list(args))
+
+    def output_file(self, timestamp, target):
+        return os.path.join(self.output_root,
+                            'cfs.' + timestamp[:8],
+                            'flxf.01.{}.{}.avrg.grib.grb2'.format(timestamp, target))
+
+    def test_batch_downloaded_with_markers(self):
+        self.assertEqual(0, self.run_batch('--workers', '4'))
+
+        for timestamp, target in self.forecasts:
+            output_file = self.output_file(timestamp, target)
+
+            with open(output_file, 'rb') as f:
+                self.assertEqual(contents('/good/{}/{}'.format(timestamp, os.path.basename(output_file))), f.read())
+
+            self.assertTrue(os.path.exists(output_file + download_cfsv2.MARKER_SUFFIX))
+            self.assertFalse(os.path.exists(output_file + '.part'))
+
+    def test_mirror_that_served_last_file_tried_first(self):
+        self.assertEqual(0, self.run_batch('--workers', '1'))
+
+        # Only the first file is requested from the empty mirror
+        empty_requests = [r for r in self.server.requests if r.startswith('/empty/')]
+        self.assertEqual(1, len(empty_requests))
+        self.assertEqual(len(self.forecasts) + 1, len(self.server.requests))
+
+    def test_manifest(self):
+        manifest = os.path.join(self.output_root, 'manifest.txt')
+        with open(manifest, 'w') as f:
+            for timestamp, target in self.forecasts:
+                f.write('{} {}\n'.format(timestamp, target))
+
+        self.assertEqual(0, download_cfsv2.main(['--output_root', self.output_root,
+                                                 '--mirrors', self.good_mirror,
+                                                 '--manifest', manifest]))
+
+        for timestamp, target in self.forecasts:
+            self.assertTrue(os.path.exists(self.output_file(timestamp, target) + download_cfsv2.MARKER_SUFFIX))
+
+    def test_existing_files_not_downloaded_again(self):
+        # A file downloaded by a run whose markers were then deleted (e.g., by
+        # Make, because another file failed) is kept and marked as complete
+        existing = self.output_file(*self.forecasts[0])
+        os.makedirs(os.path.dirname(existing))
+        with open(existing, 'wb') as f:
+            f.write(b'existing')
+
+        self.assertEqual(0, self.run_batch())
+
+        self.assertTrue(os.path.exists(existing + download_cfsv2.MARKER_SUFFIX))
+        with open(existing, 'rb') as f:
+            self.assertEqual(b'existing', f.read())
+
+        self.assertFalse(any(self.forecasts[0][0] in r for r in self.server.requests))
+
+    def test_failures_reported(self):
+        self.server.missing.add(self.forecasts[1][0])
+
+        self.assertEqual(1, self.run_batch('--workers', '2'))
+
+        for i, (timestamp, target) in enumerate(self.forecasts):
+            output_file = self.output_file(timestamp, target)
+            self.assertEqual(i != 1, os.path.exists(output_file))
+            self.assertEqual(i != 1, os.path.exists(output_file + download_cfsv2.MARKER_SUFFIX))
+            self.assertFalse(os.path.exists(output_file + '.part'))
+
+    def test_single_forecast(self):
+        timestamp, target = self.forecasts[0]
+        output_dir = os.path.join(self.output_root, 'single')
+        os.makedirs(output_dir)
+
+        self.assertEqual(0, download_cfsv2.main(['--timestamp', timestamp,
+                                                 '--target', target,
+                                                 '--output_dir', output_dir,
+                                                 '--mirrors', self.empty_mirror, self.good_mirror]))
+
+        self.assertListEqual([os.path.basename(self.output_file(timestamp, target))], os.listdir(output_dir))
+
+    def test_url_patterns(self):
+        # Hindcasts come from the reforecast archive
+        self.assertListEqual(download_cfsv2.HINDCAST_URL_PATTERNS, download_cfsv2.get_url_patterns('2009010100'))
+
+        # Older forecasts are looked for in the rolling archive last
+        self.assertEqual(download_cfsv2.ROLLING_URL_PATTERN, download_cfsv2.get_url_patterns('2019010100')[-1])
+
+        self.assertEqual('https://noaa-cfs-pds.s3.amazonaws.com/cfs.20190101/06/monthly_grib_01/'
+                         'flxf.01.2019010106.201904.avrg.grib.grb2',
+                         download_cfsv2.get_url(download_cfsv2.ARCHIVE_URL_PATTERNS[1], '2019010106', '201904'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+# Copyright (c) 2026 ISciences, LLC.
+# All rights reserved.
+#
+# WSIM is licensed under the Apache License, Version 2.0 (the "License").
+# You may not use this file except in compliance with the License. You may
+# obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+
+from wsim_workflow.actions import composite_pipeline
+from wsim_workflow.monthly import monthly_observed
+from wsim_workflow.paths import Basis
+from wsim_workflow.workflow import get_meta_steps
+
+from .test_monthly import BasicConfig
+
+
+def jobs(step):
+    """
+    Split the command of a step run by wsim_batch.R into its jobs
+    """
+    cmd = step.commands[0]
+    assert cmd[0] == '{BINDIR}/wsim_batch.R'
+
+    ret = [[]]
+    for arg in cmd[1:]:
+        if arg == '--next':
+            ret.append([])
+        else:
+            ret[-1].append(arg)
+    return ret
+
+
+class TestCompositePipeline(unittest.TestCase):
+
+    def setUp(self):
+        self.cfg = BasicConfig()
+        self.ws = self.cfg.workspace()
+
+    def test_all_outputs_produced_by_one_step(self):
+        step, = composite_pipeline(self.ws, self.cfg.static_data(), yearmon='201901', window=3, target='201903',
+                                   quantile=50)
+
+        args = dict(yearmon='201901', window=3, target='201903')
+        for output in (self.ws.composite_summary(**args),
+                       self.ws.composite_anomaly(**args),
+                       self.ws.composite_anomaly_return_period(**args),
+                       self.ws.composite_summary_adjusted(**args),
+                       self.ws.composite_summary_population(basis=Basis.COUNTRY, **args),
+                       self.ws.composite_summary_population(basis=Basis.PROVINCE, **args)):
+            self.assertIn(output, step.targets)
+            self.assertNotIn(output, step.dependencies)
+
+        self.assertIn(self.ws.return_period_summary(**args), step.dependencies)
+        self.assertIn(self.ws.standard_anomaly_summary(**args), step.dependencies)
+        self.assertIn(self.ws.fit_composite_anomalies(window=3, indicator='surplus'), step.dependencies)
+
+        pipeline, country, province = jobs(step)
+        self.assertEqual('{BINDIR}/wsim_composite_pipeline.R', pipeline[0])
+        self.assertIn('--anom_surplus', pipeline)
+        self.assertEqual('{BINDIR}/wsim_polygon_summary.R', country[0])
+        self.assertEqual('{BINDIR}/wsim_polygon_summary.R', province[0])
+
+    def test_existing_composite_anomalies_are_read(self):
+        step, = composite_pipeline(self.ws, self.cfg.static_data(), yearmon='194803', window=1,
+                                   compute_anomalies=False)
+
+        anom = self.ws.composite_anomaly(yearmon='194803', window=1)
+        self.assertIn(anom, step.dependencies)
+        self.assertNotIn(anom, step.targets)
+        self.assertNotIn('--anom_surplus', jobs(step)[0])
+
+    def test_monthly_observed(self):
+        self.cfg.set_fused_composites(True)
+        meta_steps = get_meta_steps()
+
+        steps = monthly_observed(config=self.cfg, yearmon='194803', meta_steps=meta_steps)
+
+        commands = [cmd[0] for step in steps for cmd in step.commands]
+        self.assertNotIn('{BINDIR}/wsim_composite.R', commands)
+        self.assertNotIn('{BINDIR}/wsim_anom.R', commands)
+
+        for window in (1, 3):
+            adjusted = self.ws.composite_summary_adjusted(yearmon='194803', window=window)
+            self.assertEqual(1, sum(adjusted in step.targets for step in steps))
+            self.assertIn(adjusted, meta_steps['all_adjusted_composites'].dependencies)
+
+        self.assertIn(self.ws.composite_summary(yearmon='194803', window=1),
+                      meta_steps['all_monthly_composites'].dependencies)
+        self.assertNotIn(self.ws.composite_summary(yearmon='194803', window=3),
+                         meta_steps['all_monthly_composites'].dependencies)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,164 @@
+# Copyright (c) 2026 ISciences, LLC.
+# All rights reserved.
+#
+# WSIM is licensed under the Apache License, Version 2.0 (the "License").
+# You may not use this file except in compliance with the License. You may
+# obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+from unittest import mock
+
+from wsim_workflow.commands import wsim_batch, wsim_fit
+from wsim_workflow.cores import first_in_line, limit_cores, main, release, reserve, take_ticket, try_reserve, \
+    wrapper_command
+from wsim_workflow.step import Step
+
+
+class TestCores(unittest.TestCase):
+
+    def test_fit_uses_cores(self):
+        step = wsim_fit(distribution='gev', inputs=['a.nc'], output='fit.nc', window=1, cores=4)
+
+        self.assertEqual(4, step.cores)
+        self.assertEqual('4', step.commands[0][step.commands[0].index('--cores') + 1])
+
+        step = wsim_fit(distribution='gev', inputs=['a.nc'], output='fit.nc', window=1)
+
+        self.assertEqual(1, step.cores)
+        self.assertNotIn('--cores', step.commands[0])
+
+    def test_combined_steps_use_most_cores_of_any_command(self):
+        fits = [wsim_fit(distribution='gev', inputs=['a.nc'], output='fit_{}.nc'.format(cores), window=1, cores=cores)
+                for cores in (1, 3, 2)]
+
+        self.assertEqual(3, wsim_batch(fits).cores)
+        self.assertEqual(3, fits[0].merge(fits[1], fits[2]).cores)
+
+    def test_limit_cores(self):
+        steps = [
+            Step(targets='a', commands=[['{BINDIR}/wsim_fit.R', '--cores', '4']], cores=4),
+            Step(targets='b', commands=[['{BINDIR}/wsim_anom.R']]),
+            Step(targets='all', dependencies=['a', 'b']),
+        ]
+
+        steps = list(limit_cores(steps, '/ws/.cores', 8))
+
+        self.assertEqual(('python3', '{BINDIR}/workflow/wsim_cores.py', 'run',
+                          '--lock-dir', '"/ws/.cores"', '--total', '8', '--cores', '4',
+                          '--', '{BINDIR}/wsim_fit.R', '--cores', '4'),
+                         steps[0].commands[0])
+
+        # Steps using a single core are counted too
+        self.assertEqual(('python3', '{BINDIR}/workflow/wsim_cores.py', 'run',
+                          '--lock-dir', '"/ws/.cores"', '--total', '8', '--cores', '1',
+                          '--', '{BINDIR}/wsim_anom.R'),
+                         steps[1].commands[0])
+
+        self.assertEqual([], steps[2].commands)
+
+    def test_limit_cores_of_command_waiting_for_lock(self):
+        step = Step(targets='a', commands=[wrapper_command(('{BINDIR}/wsim_merge.R',), '/ws/a_lock', 1, 1)])
+
+        step = next(limit_cores([step], '/ws/.cores', 8))
+
+        # Cores are reserved once the lock is taken
+        self.assertEqual(('python3', '{BINDIR}/workflow/wsim_cores.py', 'run',
+                          '--lock-dir', '"/ws/a_lock"', '--total', '1', '--cores', '1',
+                          '--', 'python3', '{BINDIR}/workflow/wsim_cores.py', 'run',
+                          '--lock-dir', '"/ws/.cores"', '--total', '8', '--cores', '1',
+                          '--', '{BINDIR}/wsim_merge.R'),
+                         step.commands[0])
+
+    def test_reserve(self):
+        with tempfile.TemporaryDirectory() as d:
+            held = reserve(d, 4, 3)
+            self.assertEqual(3, len(held))
+
+            # Only one core remains
+            self.assertEqual([], try_reserve(d, 4, 2))
+
+            one = try_reserve(d, 4, 1)
+            self.assertEqual(1, len(one))
+
+            release(held)
+            release(one)
+
+            # Requests larger than the budget reserve all of it
+            held = reserve(d, 4, 6)
+            self.assertEqual(4, len(held))
+            release(held)
+
+    @mock.patch('wsim_workflow.cores.RETRY_INTERVAL', 0.01)
+    def test_reserve_in_order_of_waiting(self):
+        with tempfile.TemporaryDirectory() as d:
+            held = reserve(d, 2, 1)
+            reserved = []
+
+            def wait_for(cores, name):
+                cores_held = reserve(d, 2, cores)
+                reserved.append(name)
+                time.sleep(0.1)
+                release(cores_held)
+
+            def wait_for_tickets(n):
+                while len([f for f in os.listdir(d) if f.startswith('ticket_')]) < n:
+                    time.sleep(0.01)
+
+            large = threading.Thread(target=wait_for, args=(2, 'large'))
+            large.start()
+            wait_for_tickets(1)
+
+            small = threading.Thread(target=wait_for, args=(1, 'small'))
+            small.start()
+            wait_for_tickets(2)
+
+            # A core is free, but the step needing two started waiting first
+            time.sleep(0.2)
+            self.assertEqual([], reserved)
+
+            release(held)
+            large.join()
+            small.join()
+
+            self.assertEqual(['large', 'small'], reserved)
+
+    def test_abandoned_ticket_does_not_block(self):
+        with tempfile.TemporaryDirectory() as d:
+            ticket, f = take_ticket(d)
+            self.assertFalse(first_in_line(d, ticket + 1))
+
+            # The step holding the ticket is killed
+            f.close()
+
+            self.assertTrue(first_in_line(d, ticket + 1))
+            held = reserve(d, 2, 2)
+            self.assertEqual(2, len(held))
+            release(held)
+
+    def test_run(self):
+        with tempfile.TemporaryDirectory() as d:
+            status = main(['run', '--lock-dir', d, '--total', '2', '--cores', '2', '--',
+                           sys.executable, '-c', 'import sys; sys.exit(3)'])
+
+            self.assertEqual(3, status)
+
+            # Cores are released after the command completes
+            held = try_reserve(d, 2, 2)
+            self.assertEqual(2, len(held))
+            release(held)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,144 @@
+# Copyright (c) 2026 ISciences, LLC.
+# All rights reserved.
+#
+# WSIM is licensed under the Apache License, Version 2.0 (the "License").
+# You may not use this file except in compliance with the License. You may
+# obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+
+from wsim_workflow.actions import compute_basin_results
+from wsim_workflow.commands import q
+from wsim_workflow.config_base import ConfigBase
+from wsim_workflow.coverage import compute_coverage, coverage_grid
+from wsim_workflow.grids import GLOBAL_HALF_DEGREE
+from wsim_workflow.paths import Basis, DefaultWorkspace, Vardef
+from wsim_workflow.polygon_summaries import compute_population_summary
+
+
+class FakeForcing:
+
+    def grid(self):
+        return GLOBAL_HALF_DEGREE
+
+
+class FakeStatic:
+
+    def countries(self) -> Vardef:
+        return Vardef('/source/countries.gpkg', None)
+
+    def provinces(self) -> Vardef:
+        return Vardef('/source/provinces.gpkg', None)
+
+    def population_density(self) -> Vardef:
+        return Vardef('/source/population.tif', '1')
+
+    def basins(self) -> Vardef:
+        return Vardef('/source/basins.shp', '1')
+
+    def basin_downstream(self) -> Vardef:
+        return Vardef('/source/basins_downstream.nc', 'next_down')
+
+    def basin_flow_order(self) -> str:
+        return '/source/basins_flow_order.nc'
+
+
+class CoverageConfig(ConfigBase):
+
+    def historical_years(self):
+        return range(1948, 2018)  # 1948-2017
+
+    def result_fit_years(self):
+        return range(1950, 2010)  # 1950-2009
+
+    def observed_data(self):
+        return FakeForcing()
+
+    def static_data(self):
+        return FakeStatic()
+
+    def workspace(self):
+        return DefaultWorkspace('/ws', distribution_subdir=False)
+
+
+class TestCoverage(unittest.TestCase):
+
+    def setUp(self):
+        self.cfg = CoverageConfig()
+        self.ws = self.cfg.workspace()
+
+    def test_disabled_by_default(self):
+        self.assertIsNone(coverage_grid(self.cfg))
+
+        step = compute_basin_results(self.ws, self.cfg.static_data(), yearmon='201901')[0]
+        self.assertEqual('exactextract', step.commands[0][0])
+
+    def test_coverage_computed_once_per_layer(self):
+        self.cfg.set_cached_coverage(True)
+
+        steps = compute_coverage(self.cfg, run_electric_power=True)
+
+        self.assertEqual({self.ws.coverage(basis=Basis.COUNTRY, grid=GLOBAL_HALF_DEGREE, weights='population'),
+                          self.ws.coverage(basis=Basis.PROVINCE, grid=GLOBAL_HALF_DEGREE, weights='population'),
+                          self.ws.coverage(basis=Basis.BASIN, grid=GLOBAL_HALF_DEGREE)},
+                         set.union(*(step.targets for step in steps)))
+
+        basins = steps[-1]
+        self.assertIn('/source/basins.shp', basins.dependencies)
+        cmd = basins.commands[0]
+        self.assertEqual('-180,180,-90,90', cmd[cmd.index('--extent') + 1])
+        self.assertEqual('720,360', cmd[cmd.index('--size') + 1])
+        self.assertNotIn('--weights', cmd)
+
+        countries = steps[0]
+        self.assertIn('/source/population.tif', countries.dependencies)
+        self.assertIn('--weights', countries.commands[0])
+
+        self.assertEqual(2, len(compute_coverage(self.cfg, run_electric_power=False)))
+
+    def test_basin_results_use_coverage(self):
+        self.cfg.set_cached_coverage(True)
+
+        step = compute_basin_results(self.ws, self.cfg.static_data(), yearmon='201901',
+                                     coverage_grid=coverage_grid(self.cfg))[0]
+
+        coverage = self.ws.coverage(basis=Basis.BASIN, grid=GLOBAL_HALF_DEGREE)
+
+        self.assertIn(coverage, step.dependencies)
+        self.assertNotIn('/source/basins.shp', step.dependencies)
+        self.assertEqual('{BINDIR}/wsim_coverage_extract.R', step.commands[0][0])
+        self.assertIn(q(coverage), step.commands[0])
+        self.assertEqual('{BINDIR}/wsim_flow.R', step.commands[1][0])
+
+    def test_basin_flows_use_flow_order(self):
+        step = compute_basin_results(self.ws, self.cfg.static_data(), yearmon='201901')[0]
+
+        flow = step.commands[1]
+        self.assertEqual('{BINDIR}/wsim_flow.R', flow[0])
+        self.assertEqual('/source/basins_flow_order.nc', flow[flow.index('--order') + 1])
+        self.assertNotIn('--flowdir', flow)
+        self.assertIn('/source/basins_flow_order.nc', step.dependencies)
+
+    def test_population_summary_uses_coverage(self):
+        self.cfg.set_cached_coverage(True)
+
+        steps = compute_population_summary(self.ws, self.cfg.static_data(), yearmon='201901', window=1,
+                                           coverage_grid=coverage_grid(self.cfg))
+
+        for step, basis in zip(steps, (Basis.COUNTRY, Basis.PROVINCE)):
+            coverage = self.ws.coverage(basis=basis, grid=GLOBAL_HALF_DEGREE, weights='population')
+
+            self.assertIn(coverage, step.dependencies)
+            self.assertNotIn('/source/population.tif', step.dependencies)
+            self.assertIn(q(coverage), step.commands[0])
+            self.assertNotIn('--weights', step.commands[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,350 @@
+# Copyright (c) 2026 ISciences, LLC.
+# All rights reserved.
+#
+# WSIM is licensed under the Apache License, Version 2.0 (the "License").
+# You may not use this file except in compliance with the License. You may
+# obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import contextlib
+import gzip
+import http.client
+import http.server
+import importlib.util
+import io
+import os
+import re
+import shutil
+import tempfile
+import threading
+import unittest
+import unittest.mock
+
+SCRIPT = os.path.join(os.path.dirname(__file__), os.pardir, os.pardir,
+                      'utils', 'noaa_cpc_daily_precip', 'download_noaa_cpc_daily_precip.py')
+
+spec = importlib.util.spec_from_file_location('download_noaa_cpc_daily_precip', SCRIPT)
+download_cpc = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(download_cpc)
+
+
+def contents(path, version=0):
+    return 'contents of {} version {}'.format(path, version).encode() * 1000
+
+
+class ArchiveHandler(http.server.BaseHTTPRequestHandler):
+    """
+    Serves generated file contents, honoring Range and If-Range requests,
+    and optionally failing the first request for each file partway through
+    the response.
+    """
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests.append((self.path, self.headers.get('Range')))
+            fail = server.fail_first and self.path not in server.failed
+            if fail:
+                server.failed.add(self.path)
+
+        if self.path.endswith('missing.RT') or '/1999/' in self.path:
+            self.send_error(404)
+            return
+
+        body = contents(self.path, server.version)
+        etag = '"v{}"'.format(server.version)
+        status = 200
+
+        match = re.match(r'bytes=(\d+)-$', self.headers.get('Range', ''))
+        if match and self.headers.get('If-Range', etag) == etag:
+            start = int(match.group(1))
+            body = body[start:]
+            status = 206
+
+        self.send_response(status)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', etag)
+        if status == 206:
+            self.send_header('Content-Range', 'bytes {}-{}/{}'.format(start, start + len(body) - 1, start + len(body)))
+        self.end_headers()
+
+        if fail:
+            # Send part of the body and drop the connection
+            self.wfile.write(body[:len(body) // 2])
+            self.close_connection = True
+            return
+
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class FakeFTP:
+    """
+    Stand-in for ftplib.FTP that serves generated file contents, honoring
+    the REST offset and reporting their size and modification time
+    """
+    instances = []
+    version = 0
+
+    def __init__(self, timeout=None):
+        self.commands = []
+        FakeFTP.instances.append(self)
+
+    def connect(self, host, port):
+        self.commands.append(('connect', host, port))
+
+    def login(self):
+        self.commands.append(('login',))
+
+    def voidcmd(self, cmd):
+        self.commands.append(('voidcmd', cmd))
+
+    def sendcmd(self, cmd):
+        self.commands.append(('sendcmd', cmd))
+        name, path = cmd.split(' ', 1)
+        if name == 'SIZE':
+            return '213 {}'.format(len(contents(path, FakeFTP.version)))
+        if name == 'MDTM':
+            return '213 2010010{}000000'.format(FakeFTP.version)
+
+    def retrbinary(self, cmd, callback, blocksize=8192, rest=None):
+        self.commands.append(('retrbinary', cmd, rest))
+        path = cmd.split(' ', 1)[1]
+        callback(contents(path, FakeFTP.version)[rest or 0:])
+
+    def close(self):
+        pass
+
+
+class TestCpcDailyPrecipDownload(unittest.TestCase):
+
+    def setUp(self):
+        self.server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), ArchiveHandler)
+        self.server.lock = threading.Lock()
+        self.server.requests = []
+        self.server.failed = set()
+        self.server.fail_first = False
+        self.server.version = 0
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+        self.root = 'http://127.0.0.1:{}/cpc'.format(self.server.server_address[1])
+        self.output_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.output_dir)
+
+    def run_main(self, *args):
+        return download_cpc.main(['--output_dir', self.output_dir,
+                                  '--root', self.root,
+                                  '--backoff', '0'] + list(args))
+
+    def output_file(self, year, month, day):
+        return os.path.join(self.output_dir, str(year), download_cpc.get_standard_filename(year, month, day))
+
+    def test_month_downloaded_concurrently(self):
+        self.assertEqual(0, self.run_main('--yearmon', '201002', '--workers', '4'))
+
+        for day in range(1, 29):
+            url = download_cpc.get_url(2010, 2, day, self.root)
+            path = url[url.index('/cpc'):]
+
+            # Files are compressed after downloading
+            with gzip.open(self.output_file(2010, 2, day)) as f:
+                self.assertEqual(contents(path), f.read())
+
+        self.assertEqual(28, len(self.server.requests))
+        self.assertEqual([], [f for f in os.listdir(os.path.join(self.output_dir, '2010')) if not f.endswith('.gz')])
+
+    def test_several_months(self):
+        self.assertEqual(0, self.run_main('--yearmon', '201001', '201012', '--workers', '2'))
+
+        self.assertTrue(os.path.exists(self.output_file(2010, 1, 31)))
+        self.assertTrue(os.path.exists(self.output_file(2010, 12, 31)))
+        self.assertEqual(62, len(self.server.requests))
+
+    def interrupt_download(self, url, output_file):
+        """
+        Leave part of a file downloaded, as if the downloader had been killed
+        """
+        self.server.fail_first = True
+
+        downloader = download_cpc.Downloader(retries=0, backoff=0)
+        with self.assertRaises(http.client.IncompleteRead):
+            downloader.download(url, output_file)
+        downloader.close()
+
+        self.server.fail_first = False
+
+    def test_partial_file_resumed(self):
+        url = download_cpc.get_url(2010, 3, 1, self.root)
+        path = url[url.index('/cpc'):]
+
+        output_file = self.output_file(2010, 3, 1)
+        os.makedirs(os.path.dirname(output_file))
+        self.interrupt_download(url, output_file)
+
+        downloader = download_cpc.Downloader(backoff=0)
+        downloader.download(url, output_file)
+        downloader.close()
+
+        self.assertEqual((path, 'bytes={}-'.format(len(contents(path)) // 2)), self.server.requests[1])
+        with gzip.open(output_file) as f:
+            self.assertEqual(contents(path), f.read())
+        self.assertEqual([os.path.basename(output_file)], os.listdir(os.path.dirname(output_file)))
+
+    def test_partial_file_of_changed_file_restarted(self):
+        url = download_cpc.get_url(2010, 3, 1, self.root)
+        path = url[url.index('/cpc'):]
+
+        output_file = self.output_file(2010, 3, 1)
+        os.makedirs(os.path.dirname(output_file))
+        self.interrupt_download(url, output_file)
+
+        # The file is replaced on the server, e.g. with a corrected version
+        self.server.version = 1
+
+        downloader = download_cpc.Downloader(backoff=0)
+        downloader.download(url, output_file)
+        downloader.close()
+
+        with gzip.open(output_file) as f:
+            self.assertEqual(contents(path, 1), f.read())
+
+    def test_partial_file_of_unknown_version_restarted(self):
+        url = download_cpc.get_url(2010, 3, 1, self.root)
+        path = url[url.index('/cpc'):]
+
+        output_file = self.output_file(2010, 3, 1)
+        os.makedirs(os.path.dirname(output_file))
+        with open(output_file + '.part', 'wb') as f:
+            f.write(contents(path, 1)[:1000])
+
+        downloader = download_cpc.Downloader(backoff=0)
+        downloader.download(url, output_file)
+        downloader.close()
+
+        self.assertEqual([(path, None)], self.server.requests)
+        with gzip.open(output_file) as f:
+            self.assertEqual(contents(path), f.read())
+
+    def test_interrupted_download_retried_from_where_it_stopped(self):
+        self.server.fail_first = True
+
+        url = download_cpc.get_url(2010, 3, 1, self.root)
+        path = url[url.index('/cpc'):]
+        output_file = self.output_file(2010, 3, 1)
+        os.makedirs(os.path.dirname(output_file))
+
+        downloader = download_cpc.Downloader(backoff=0)
+        downloader.download(url, output_file)
+        downloader.close()
+
+        self.assertEqual(2, len(self.server.requests))
+        self.assertIsNone(self.server.requests[0][1])
+        self.assertEqual('bytes={}-'.format(len(contents(path)) // 2), self.server.requests[1][1])
+
+        with gzip.open(output_file) as f:
+            self.assertEqual(contents(path), f.read())
+
+    def test_ftp_connection_reused_and_partial_file_resumed(self):
+        FakeFTP.instances = []
+        FakeFTP.version = 0
+
+        output_files = [self.output_file(1990, 1, day) for day in (1, 2)]
+        os.makedirs(os.path.dirname(output_files[0]))
+
+        url = download_cpc.get_url(1990, 1, 1)
+        path = url[url.index('/precip'):]
+        with open(output_files[0] + '.part', 'wb') as f:
+            f.write(contents(path)[:500])
+        download_cpc.write_validator(output_files[0] + '.part.validator',
+                                     {'size': str(len(contents(path))), 'modified': '20100100000000'})
+
+        with unittest.mock.patch.object(download_cpc.ftplib, 'FTP', FakeFTP):
+            downloader = download_cpc.Downloader(backoff=0)
+            for day, output_file in zip((1, 2), output_files):
+                downloader.download(download_cpc.get_url(1990, 1, day), output_file)
+            downloader.close()
+
+        self.assertEqual(1, len(FakeFTP.instances))
+        retrieved = [cmd for cmd in FakeFTP.instances[0].commands if cmd[0] == 'retrbinary']
+        self.assertEqual([('retrbinary', 'RETR ' + path, 500),
+                          ('retrbinary', 'RETR ' + path.replace('0101', '0102'), None)], retrieved)
+
+        # Files already compressed are written as received
+        with open(output_files[0], 'rb') as f:
+            self.assertEqual(contents(path), f.read())
+        self.assertFalse(os.path.exists(output_files[0] + '.part.validator'))
+
+    def test_ftp_partial_file_of_changed_file_restarted(self):
+        FakeFTP.instances = []
+        FakeFTP.version = 1
+
+        output_file = self.output_file(1990, 1, 1)
+        os.makedirs(os.path.dirname(output_file))
+
+        url = download_cpc.get_url(1990, 1, 1)
+        path = url[url.index('/precip'):]
+        with open(output_file + '.part', 'wb') as f:
+            f.write(contents(path)[:500])
+        download_cpc.write_validator(output_file + '.part.validator',
+                                     {'size': str(len(contents(path))), 'modified': '20100100000000'})
+
+        with unittest.mock.patch.object(download_cpc.ftplib, 'FTP', FakeFTP):
+            downloader = download_cpc.Downloader(backoff=0)
+            downloader.download(url, output_file)
+            downloader.close()
+
+        retrieved = [cmd for cmd in FakeFTP.instances[0].commands if cmd[0] == 'retrbinary']
+        self.assertEqual([('retrbinary', 'RETR ' + path, None)], retrieved)
+
+        with open(output_file, 'rb') as f:
+            self.assertEqual(contents(path, 1), f.read())
+
+    def test_missing_files_not_retried(self):
+        output_file = self.output_file(2010, 3, 1)
+        os.makedirs(os.path.dirname(output_file))
+
+        downloader = download_cpc.Downloader(backoff=0)
+        with self.assertRaises(download_cpc.PermanentError):
+            downloader.download(self.root + '/RT/2010/missing.RT', output_file)
+        downloader.close()
+
+        self.assertEqual(1, len(self.server.requests))
+        self.assertFalse(os.path.exists(output_file))
+
+    def test_failures_reported_after_other_downloads(self):
+        self.assertEqual(1, self.run_main('--yearmon', '199901', '201001', '--workers', '4'))
+
+        self.assertTrue(os.path.exists(self.output_file(2010, 1, 31)))
+        self.assertFalse(os.path.exists(self.output_file(1999, 1, 1)))
+
+    def test_messages_from_workers_not_interleaved(self):
+        stdout = io.StringIO()
+        with contextlib.redirect_stdout(stdout):
+            self.assertEqual(0, self.run_main('--yearmon', '201002', '--workers', '8'))
+
+        lines = stdout.getvalue().splitlines()
+        self.assertEqual(28, len(lines))
+        for line in lines:
+            self.assertRegex(line, r'^Downloaded http://\S+RT$')
+
+    def test_existing_files_skipped(self):
+        self.assertEqual(0, self.run_main('--yearmon', '201002'))
+        self.assertEqual(0, self.run_main('--yearmon', '201002'))
+
+        self.assertEqual(28, len(self.server.requests))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+# Copyright (c) 2026 ISciences, LLC.
+# All rights reserved.
+#
+# WSIM is licensed under the Apache License, Version 2.0 (the "License").
+# You may not use this file except in compliance with the License. You may
+# obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import sys
+import unittest
+
+from wsim_workflow.graph import WorkflowGraph
+from wsim_workflow.step import Step
+
+
+class TestWorkflowGraph(unittest.TestCase):
+
+    def test_duplicates(self):
+        graph = WorkflowGraph([
+            Step(targets=['a', 'b'], commands=[['x']]),
+            Step(targets='b', commands=[['y']]),
+            Step(targets='c', commands=[['z']]),
+        ])
+
+        self.assertListEqual(['b'], graph.duplicates)
+
+    def test_long_chain(self):
+        # Emulate a serial chain of monthly states, longer than the recursion limit
+        n = 2 * sys.getrecursionlimit()
+
+        steps = [Step(targets='state_0', commands=[['init']])] + \
+                [Step(targets='state_{}'.format(i), dependencies='state_{}'.format(i-1), commands=[['lsm']])
+                 for i in range(1, n)]
+
+        graph = WorkflowGraph(reversed(steps))
+
+        self.assertEqual(n - 1, graph.max_depth())
+        self.assertListEqual([], graph.unbuildable())
+        self.assertListEqual(steps, graph.critical_path())
+
+        order = graph.topological_order()
+        self.assertEqual(n, len(order))
+        self.assertEqual(['state_0'], list(graph.steps[order[0]].targets))
+
+    def test_unbuildable(self):
+        buildable = Step(targets='a', commands=[['x']])
+        missing_source = Step(targets='b', dependencies='nowhere', commands=[['y']])
+        downstream = Step(targets='c', dependencies=['a', 'b'], commands=[['z']])
+
+        graph = WorkflowGraph([buildable, missing_source, downstream])
+
+        self.assertListEqual([missing_source, downstream], graph.unbuildable())
+        self.assertEqual({1: ['nowhere']}, graph.missing)
+
+    def test_cycles(self):
+        a = Step(targets='a', dependencies='c', commands=[['x']])
+        b = Step(targets='b', dependencies='a', commands=[['y']])
+        c = Step(targets='c', dependencies='b', commands=[['z']])
+        d = Step(targets='d', dependencies='c', commands=[['w']])
+        e = Step(targets='e', commands=[['v']])
+
+        graph = WorkflowGraph([a, b, c, d, e])
+
+        self.assertListEqual([a, b, c, d], graph.cyclic_steps())
+        self.assertListEqual([a, b, c, d], graph.unbuildable())
+        self.assertListEqual([e], graph.critical_path())
+
+    def test_self_dependency_ignored(self):
+        # Merged steps may list a file as both a target and a dependency
+        s = Step(targets='basin.nc', dependencies=['basin.nc', 'pixel.nc'], commands=[['flow']])
+        p = Step(targets='pixel.nc', commands=[['lsm']])
+
+        graph = WorkflowGraph([s, p])
+
+        self.assertListEqual([], graph.cyclic_steps())
+        self.assertEqual(1, graph.max_depth())
+
+    def test_required(self):
+        steps = [
+            Step(targets='forcing', commands=[['prep']]),
+            Step(targets='results', dependencies='forcing', commands=[['lsm']]),
+            Step(targets='composite', dependencies='results', commands=[['composite']]),
+            Step(targets='basin_results', dependencies='results', commands=[['extract']]),
+            Step.create_meta('all_composites', ['composite']),
+        ]
+
+        graph = WorkflowGraph(steps)
+
+        self.assertListEqual([steps[0], steps[1], steps[2], steps[4]], graph.required(['all_composites']))
+        self.assertListEqual([steps[0], steps[1], steps[3]], graph.required(['basin_results']))
+        self.assertListEqual(steps[:4], graph.required(['composite', 'basin_results']))
+
+        with self.assertRaises(ValueError):
+            graph.required(['nothing'])
@@ -0,0 +1,82 @@
+# Copyright (c) 2026 ISciences, LLC.
+# All rights reserved.
+#
+# WSIM is licensed under the Apache License, Version 2.0 (the "License").
+# You may not use this file except in compliance with the License. You may
+# obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+
+from wsim_workflow.actions import accumulate_ensemble_members, result_summary
+from wsim_workflow.commands import q
+from wsim_workflow.cores import wrapper_command
+
+from .test_stacked_members import TwoModelConfig
+
+
+class TestIncrementalSummaries(unittest.TestCase):
+
+    def setUp(self):
+        self.cfg = TwoModelConfig()
+        self.ws = self.cfg.workspace()
+        self.cfg.set_incremental_summaries(True)
+
+    def test_members_added_in_any_order(self):
+        steps = accumulate_ensemble_members(self.cfg, yearmon='201901', target='201903', window=3)
+        weighted = list(self.cfg.weighted_members('201901'))
+
+        # One step for each member and kind of output
+        self.assertEqual(4 * len(weighted), len(steps))
+
+        for thing in ('forcing', 'results', 'rp', 'anom'):
+            stacked = self.ws.ensemble_members(thing, yearmon='201901', window=3, target='201903')
+            lock_dir = self.ws.ensemble_lock_dir(thing, yearmon='201901', window=3, target='201903')
+
+            for model, member, _ in weighted:
+                tag = self.ws.ensemble_member_tag(thing, yearmon='201901', window=3, target='201903',
+                                                  model=model, member=member)
+                step, = [s for s in steps if s.targets == {tag}]
+
+                # Each member depends only on its own output, so that members
+                # can be added as soon as they finish
+                self.assertEqual(1, len(step.dependencies))
+                self.assertIn('fcst{}_{}'.format(model.lower(), member), next(iter(step.dependencies)))
+
+                # and writes only its own slice, holding a lock on the stacked file
+                cmd = step.commands[0]
+                self.assertEqual(wrapper_command(cmd[cmd.index('--') + 1:], lock_dir, 1, 1), cmd)
+                self.assertIn(q(stacked), cmd)
+                self.assertEqual('{}_{}'.format(model.lower(), member), cmd[cmd.index('--slices') + 1])
+
+        self.assertIn(self.ws.results(yearmon='201901', window=3, target='201903', model='CanCM4i', member='2'),
+                      set.union(*[s.dependencies for s in steps]))
+
+    def test_summary_waits_for_all_members(self):
+        summary = result_summary(self.cfg, yearmon='201901', target='201903', window=3)[0]
+
+        self.assertEqual({self.ws.ensemble_member_tag('results', yearmon='201901', window=3, target='201903',
+                                                      model=model, member=member)
+                          for model, member, _ in self.cfg.weighted_members('201901')},
+                         summary.dependencies)
+
+        cmd = summary.commands[0]
+        self.assertIn(q(self.ws.ensemble_members('results', yearmon='201901', window=3, target='201903')), cmd)
+        self.assertIn('--across', cmd)
+
+    def test_ignored_for_stacked_members(self):
+        self.cfg.set_stack_members(True)
+
+        summary = result_summary(self.cfg, yearmon='201901', target='201903', window=3)[0]
+
+        self.assertIn(self.ws.results(yearmon='201901', window=3, target='201903', model='CFSv2', member=None),
+                      summary.dependencies)
+
+
+if __name__ == '__main__':
+    unittest.main()
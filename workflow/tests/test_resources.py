@@ -0,0 +1,137 @@
+# Copyright (c) 2026 ISciences, LLC.
+# All rights reserved.
+#
+# WSIM is licensed under the Apache License, Version 2.0 (the "License").
+# You may not use this file except in compliance with the License. You may
+# obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+
+from wsim_workflow.commands import wsim_anom, wsim_batch, wsim_composite_pipeline, wsim_fit, wsim_integrate, wsim_lsm
+from wsim_workflow.cores import wrapper_command
+from wsim_workflow.grids import GLOBAL_HALF_DEGREE
+from wsim_workflow.resources import BASE_MEMORY, ANOM_GRIDS_PER_VAR, COMPOSITE_GRIDS_PER_VAR, LSM_GRIDS, \
+    command_memory, estimate_memory
+from wsim_workflow.step import Step
+
+GRID_BYTES = GLOBAL_HALF_DEGREE.nx * GLOBAL_HALF_DEGREE.ny * 8
+
+
+class TestResources(unittest.TestCase):
+
+    def test_lsm(self):
+        step = wsim_lsm(forcing='forcing.nc', state='state.nc', elevation='elev.nc', flowdir='flowdir.nc',
+                        wc='wc.nc', results='results.nc', next_state='next_state.nc')
+
+        self.assertEqual(BASE_MEMORY + LSM_GRIDS * GRID_BYTES, command_memory(step.commands[0], GLOBAL_HALF_DEGREE))
+
+    def test_fit_scales_with_observations(self):
+        short = wsim_fit(distribution='gev', inputs=['results_[195001:195912:12].nc::Ws'], output='fit.nc', window=1)
+        long = wsim_fit(distribution='gev', inputs=['results_[195001:197912:12].nc::Ws'], output='fit.nc', window=1)
+
+        self.assertEqual(BASE_MEMORY + 2 * 10 * GRID_BYTES, command_memory(short.commands[0], GLOBAL_HALF_DEGREE))
+        self.assertEqual(BASE_MEMORY + 2 * 30 * GRID_BYTES, command_memory(long.commands[0], GLOBAL_HALF_DEGREE))
+
+    def test_fit_of_several_outputs_uses_largest_input(self):
+        step = wsim_fit(distribution='gev',
+                        inputs=['results_[195001:195912:12].nc::Ws', 'results_[195002:196912:12].nc::Ws'],
+                        output=['fit_01.nc', 'fit_02.nc'],
+                        window=1)
+
+        self.assertEqual(BASE_MEMORY + 2 * 20 * GRID_BYTES, command_memory(step.commands[0], GLOBAL_HALF_DEGREE))
+
+    def test_integrate_holds_window(self):
+        step = wsim_integrate(stats=['sum'],
+                              inputs=['results_[194801:201712].nc::Ws,RO_mm'],
+                              windows=[3, 6, 12],
+                              output=['results_3mo.nc', 'results_6mo.nc', 'results_12mo.nc'])
+
+        self.assertEqual(BASE_MEMORY + 12 * 2 * GRID_BYTES, command_memory(step.commands[0], GLOBAL_HALF_DEGREE))
+
+    def test_integrate_across_stacked_members_holds_each_member(self):
+        members = ['cfsv2_{}'.format(i) for i in range(1, 29)]
+        weights = [1.0] * len(members)
+
+        unstacked = wsim_integrate(stats=['q25', 'q50', 'q75'],
+                                   inputs=['results_{}.nc::Ws,RO_mm'.format(m) for m in members],
+                                   weights=weights,
+                                   output='summary.nc')
+        stacked = wsim_integrate(stats=['q25', 'q50', 'q75'],
+                                 inputs=['results_cfsv2.nc::Ws,RO_mm'],
+                                 weights=weights,
+                                 across='member',
+                                 output='summary.nc')
+
+        self.assertEqual(BASE_MEMORY + 28 * 2 * GRID_BYTES, command_memory(unstacked.commands[0], GLOBAL_HALF_DEGREE))
+        self.assertEqual(command_memory(unstacked.commands[0], GLOBAL_HALF_DEGREE),
+                         command_memory(stacked.commands[0], GLOBAL_HALF_DEGREE))
+
+    def test_anom_of_stacked_members_reads_one_member_at_a_time(self):
+        unstacked = wsim_anom(fits='fit_Ws.nc', obs='results_cfsv2_1.nc::Ws', rp='rp.nc')
+        stacked = wsim_anom(fits='fit_Ws.nc', obs='results_cfsv2.nc::Ws', rp='rp.nc')
+
+        self.assertEqual(BASE_MEMORY + 2 * ANOM_GRIDS_PER_VAR * GRID_BYTES,
+                         command_memory(stacked.commands[0], GLOBAL_HALF_DEGREE))
+        self.assertEqual(command_memory(unstacked.commands[0], GLOBAL_HALF_DEGREE),
+                         command_memory(stacked.commands[0], GLOBAL_HALF_DEGREE))
+
+    def test_composite_pipeline_holds_all_inputs(self):
+        step = wsim_composite_pipeline(surplus=['rp.nc::RO_mm_rp,Bt_RO_rp'],
+                                       deficit=['rp.nc::Ws_rp'],
+                                       anom_surplus=['sa.nc::RO_mm_sa,Bt_RO_sa'],
+                                       anom_deficit=['sa.nc::Ws_sa'],
+                                       fits=['fit_surplus.nc', 'fit_deficit.nc'],
+                                       both_threshold=3,
+                                       anom_both_threshold=0.4307273,
+                                       composite='composite.nc',
+                                       composite_anom='composite_anom.nc',
+                                       composite_anom_rp='composite_anom_rp.nc',
+                                       adjusted='composite_adjusted.nc')
+
+        self.assertEqual(BASE_MEMORY + (COMPOSITE_GRIDS_PER_VAR * 6 + 2 * ANOM_GRIDS_PER_VAR) * GRID_BYTES,
+                         command_memory(step.commands[0], GLOBAL_HALF_DEGREE))
+
+    def test_command_waiting_for_cores(self):
+        step = wsim_lsm(forcing='forcing.nc', state='state.nc', elevation='elev.nc', flowdir='flowdir.nc',
+                        wc='wc.nc', results='results.nc', next_state='next_state.nc')
+
+        self.assertEqual(command_memory(step.commands[0], GLOBAL_HALF_DEGREE),
+                         command_memory(wrapper_command(step.commands[0], '/tmp/cores', 4, 2), GLOBAL_HALF_DEGREE))
+
+    def test_other_commands(self):
+        self.assertEqual(0, command_memory(('touch', 'a.txt'), GLOBAL_HALF_DEGREE))
+        self.assertEqual(0, command_memory(('{BINDIR}/utils/noaa_cpc_daily_precip/download.sh',), GLOBAL_HALF_DEGREE))
+
+    def test_batch_uses_largest_job(self):
+        fits = [wsim_fit(distribution='gev', inputs=['results_[195001:{}12:12].nc::Ws'.format(year)],
+                         output='fit_{}.nc'.format(year), window=1)
+                for year in (1959, 1979, 1969)]
+
+        batch = wsim_batch(fits)
+
+        self.assertEqual(command_memory(fits[1].commands[0], GLOBAL_HALF_DEGREE),
+                         command_memory(batch.commands[0], GLOBAL_HALF_DEGREE))
+
+    def test_estimate_memory(self):
+        step = Step(targets='results.nc',
+                    commands=[['touch', 'a.txt'],
+                              ['{BINDIR}/wsim_lsm.R', '--state', '"state.nc"']])
+
+        step = next(estimate_memory([step], GLOBAL_HALF_DEGREE))
+
+        self.assertEqual(BASE_MEMORY + LSM_GRIDS * GRID_BYTES, step.memory)
+
+    def test_combined_steps_use_most_memory_of_any_command(self):
+        steps = [Step(targets='a', memory=2), Step(targets='b', memory=5), Step(targets='c', memory=3)]
+
+        self.assertEqual(5, steps[0].merge(steps[1], steps[2]).memory)
+
+
+if __name__ == '__main__':
+    unittest.main()
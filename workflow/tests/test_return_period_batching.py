@@ -0,0 +1,68 @@
+# Copyright (c) 2026 ISciences, LLC.
+# All rights reserved.
+#
+# WSIM is licensed under the Apache License, Version 2.0 (the "License").
+# You may not use this file except in compliance with the License. You may
+# obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import unittest
+
+from wsim_workflow.monthly import forecast_return_periods
+
+from .test_stacked_members import TwoModelConfig
+
+
+def jobs(step):
+    return sum(1 for token in step.commands[0] if os.path.basename(token) == 'wsim_anom.R')
+
+
+class TestReturnPeriodBatching(unittest.TestCase):
+
+    def setUp(self):
+        self.cfg = TwoModelConfig()
+        self.members = self.cfg.forecast_ensemble_members('CFSv2', '201901')
+        self.windows = [1] + self.cfg.integration_windows()
+
+    def generate(self):
+        return forecast_return_periods(self.cfg, yearmon='201901', target='201903', model='CFSv2', members=self.members)
+
+    def test_unbatched(self):
+        steps = self.generate()
+
+        self.assertEqual(len(self.members) * len(self.windows), len(steps))
+        self.assertTrue(all(jobs(step) == 1 for step in steps))
+
+    def test_batched_by_members(self):
+        self.cfg.set_return_period_batching('members')
+        steps = self.generate()
+
+        self.assertEqual(len(self.windows), len(steps))
+        for step, window in zip(steps, self.windows):
+            self.assertEqual(len(self.members), jobs(step))
+            self.assertIn(self.cfg.workspace().return_period(yearmon='201901', target='201903', window=window,
+                                                             model='CFSv2', member=self.members[-1]),
+                          step.targets)
+
+            # All jobs use the same fits, so that they only need to be read once
+            cmd = step.commands[0]
+            fits = [cmd[i+1] for i, token in enumerate(cmd) if token == '--fits']
+            self.assertEqual(len(self.members), fits.count(fits[0]))
+
+    def test_batched_all(self):
+        self.cfg.set_return_period_batching('all')
+        steps = self.generate()
+
+        self.assertEqual(1, len(steps))
+        self.assertEqual(len(self.members) * len(self.windows), jobs(steps[0]))
+        self.assertEqual(2 * len(self.members) * len(self.windows), len(steps[0].targets))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -14,6 +14,7 @@
 import unittest
 
 from wsim_workflow.config_base import ConfigBase
+from wsim_workflow.actions import fit_var_all_months
 from wsim_workflow.spinup import *
 from wsim_workflow.dates import parse_yearmon
 from wsim_workflow.grids import GLOBAL_HALF_DEGREE
@@ -85,3 +86,74 @@ class TestSpinup(unittest.TestCase):
                          # wet day climate norms
                          1 + \
                          years_of_wetdays)
+
+    def test_unsegmented_lsm_run(self):
+        steps = run_lsm_from_final_norm_state(self.cfg)
+
+        self.assertEqual(2, len(steps))
+        self.assertEqual({self.cfg.workspace().tag('spinup_from_climate_norm_final_state')}, steps[1].targets)
+
+    def test_segmented_lsm_run(self):
+        cfg = BasicConfig()
+        cfg.set_spinup_segment_years(10)
+        ws = cfg.workspace()
+
+        segments = spinup_segments(cfg)
+        self.assertEqual(7, len(segments))
+        self.assertEqual(['194801', '195712'], [segments[0][0], segments[0][-1]])
+        self.assertEqual(['200801', '201712'], [segments[-1][0], segments[-1][-1]])
+
+        steps = run_lsm_from_mean_spinup_state(cfg)
+        runs = [step for step in steps if any('segment' in t for t in step.targets)]
+
+        self.assertEqual(7, len(runs))
+
+        # The first run starts from the initial state, and each subsequent run
+        # waits for the previous run to write its initial state
+        self.assertIn(ws.state(yearmon='194801'), runs[0].dependencies)
+        for previous, run, segment in zip(runs, runs[1:], segments[1:]):
+            self.assertIn(next(iter(previous.targets)), run.dependencies)
+            self.assertNotIn(ws.state(yearmon=segment[0]), run.dependencies)
+            self.assertIn(ws.forcing(yearmon=segment[-1], window=1), run.dependencies)
+            self.assertNotIn(ws.forcing(yearmon=segment[-1], window=1), previous.dependencies)
+
+        # The completion of all segments is recorded by the same tag as an unsegmented run
+        final = [step for step in steps if ws.tag('spinup_1mo_results') in step.targets]
+        self.assertEqual(1, len(final))
+        self.assertEqual({next(iter(runs[-1].targets))}, final[0].dependencies)
+
+    def test_lsm_run_with_monthly_norms(self):
+        cfg = BasicConfig()
+
+        cmd = run_lsm_with_monthly_norms(cfg, years=100)[0].commands[0]
+        self.assertIn('--loop', cmd)
+        self.assertNotIn('--tolerance', cmd)
+
+        cfg.set_spinup_tolerance(0.01)
+
+        cmd = run_lsm_with_monthly_norms(cfg, years=100)[0].commands[0]
+        self.assertEqual('100', cmd[cmd.index('--loop') + 1])
+        self.assertEqual('0.01', cmd[cmd.index('--tolerance') + 1])
+
+    def test_fits_for_all_months(self):
+        cfg = BasicConfig()
+        ws = cfg.workspace()
+
+        steps = fit_var_all_months(cfg, param='Bt_RO', stat='sum', window=6)
+        self.assertEqual(12, len(steps))
+
+        cfg.set_batch_fits(True)
+
+        steps = fit_var_all_months(cfg, param='Bt_RO', stat='sum', window=6)
+        self.assertEqual(1, len(steps))
+
+        fits = steps[0]
+        self.assertEqual({ws.fit_obs(var='Bt_RO', stat='sum', window=6, month=month) for month in range(1, 13)},
+                         fits.targets)
+
+        # Each month is fit to its own observations
+        cmd = fits.commands[0]
+        self.assertEqual(12, cmd.count('--input'))
+        self.assertEqual(12, cmd.count('--output'))
+        self.assertIn(ws.results(yearmon='195006', window=6), fits.dependencies)
+        self.assertIn(ws.results(yearmon='200912', window=6), fits.dependencies)
@@ -0,0 +1,96 @@
+# Copyright (c) 2026 ISciences, LLC.
+# All rights reserved.
+#
+# WSIM is licensed under the Apache License, Version 2.0 (the "License").
+# You may not use this file except in compliance with the License. You may
+# obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+
+from typing import List, Optional
+
+from wsim_workflow.actions import result_summary, stack_members, time_integrate
+
+from .test_monthly import BasicConfig
+
+
+def arg_values(step, arg):
+    cmd = step.commands[0]
+    return [cmd[i+1].strip('"') for i, a in enumerate(cmd) if a == arg]
+
+
+class TwoModelConfig(BasicConfig):
+
+    def models(self):
+        return ['CFSv2', 'CanCM4i']
+
+    def forecast_ensemble_members(self, model: str, yearmon: str, *, lag_hours: Optional[int] = None) -> List[str]:
+        if model == 'CFSv2':
+            return ['2018122100', '2018122106', '2018122112']
+        return ['1', '2']
+
+
+class TestStackedMembers(unittest.TestCase):
+
+    def setUp(self):
+        self.cfg = TwoModelConfig()
+        self.ws = self.cfg.workspace()
+
+    def test_stack_members(self):
+        members = self.cfg.forecast_ensemble_members('CFSv2', '201901')
+
+        steps = stack_members(self.ws, yearmon='201901', target='201903', model='CFSv2', members=members, state=True)
+
+        self.assertEqual(3, len(steps))
+
+        results = steps[1]
+        self.assertEqual([self.ws.results(yearmon='201901', window=1, target='201903', model='CFSv2', member=m)
+                          for m in members],
+                         arg_values(results, '--input'))
+        self.assertSetEqual({self.ws.results(yearmon='201901', window=1, target='201903', model='CFSv2', member=None)},
+                            results.targets)
+        self.assertEqual(['member'], arg_values(results, '--stack'))
+        self.assertEqual([','.join(members)], arg_values(results, '--labels'))
+
+        # State at the end of the target month is stacked for return periods
+        self.assertSetEqual({self.ws.state(yearmon='201901', target='201904', model='CFSv2', member=None)},
+                            steps[2].targets)
+
+    def test_integration_of_stacked_members(self):
+        step, = time_integrate(self.ws, {'sum': ['RO_mm']}, forcing=False, yearmon='201901', target='201903',
+                               model='CFSv2', member=None, window=3)
+
+        # Observed values are used with the stacked forecasts of each member
+        self.assertEqual([self.ws.results(yearmon='201901', window=1) + '::RO_mm'] +
+                         [self.ws.results(yearmon='201901', target=t, model='CFSv2', member=None, window=1) + '::RO_mm'
+                          for t in ('201902', '201903')],
+                         arg_values(step, '--input'))
+        self.assertSetEqual({self.ws.results(yearmon='201901', target='201903', model='CFSv2', member=None, window=3)},
+                            step.targets)
+
+    def test_summary_of_stacked_members(self):
+        step, = result_summary(self.cfg, yearmon='201901', target='201903', window=3)
+        self.assertEqual(5, len(arg_values(step, '--input')))
+        self.assertEqual([], arg_values(step, '--across'))
+
+        self.cfg.set_stack_members(True)
+
+        step, = result_summary(self.cfg, yearmon='201901', target='201903', window=3)
+        self.assertEqual([self.ws.results(yearmon='201901', target='201903', model=model, member=None, window=3)
+                          for model in self.cfg.models()],
+                         arg_values(step, '--input'))
+        self.assertEqual(['member'], arg_values(step, '--across'))
+
+        # Weights are provided for each member, in the order in which they are stacked
+        weights = [float(w) for w in arg_values(step, '--weights')[0].split(',')]
+        self.assertEqual([0.5/3]*3 + [0.5/2]*2, weights)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -77,11 +77,11 @@ class TestStep(unittest.TestCase):
         self.assertListEqual(
             combined.commands,
             [
-                ['make', 'frosting'],
-                ['bake', 'cake'],
-                ['apply', 'frosting'],
-                ['eat', 'cake'],
-                ['open', 'presents']
+                ('make', 'frosting'),
+                ('bake', 'cake'),
+                ('apply', 'frosting'),
+                ('eat', 'cake'),
+                ('open', 'presents')
             ])
 
     def test_merge_with_consumes(self):
@@ -122,8 +122,8 @@ class TestStep(unittest.TestCase):
         self.assertSetEqual(s.targets, { 'tag_dir/tagfile' })
         self.assertSetEqual(s.dependencies, set())
         self.assertListEqual(s.commands,
-                             [['process', 'a', 'b', 'c'],
-                              ['touch', 'tag_dir/tagfile']])
+                             [('process', 'a', 'b', 'c'),
+                              ('touch', 'tag_dir/tagfile')])
         self.assertTrue( 'tag_dir' in s.working_directories)
 
     def test_tagged_targets_with_directory(self):
@@ -133,11 +133,11 @@ class TestStep(unittest.TestCase):
                  ).replace_targets_with_tag_file('q/tagfile')
 
         self.assertListEqual(s.commands, [
-            ['process', 'a', 'b', 'c'],
-            ['touch', 'q/tagfile']])
+            ('process', 'a', 'b', 'c'),
+            ('touch', 'q/tagfile')])
 
         self.assertListEqual(s.get_mkdir_commands(), [
-            ['mkdir', '-p', 'd', 'e', 'q'],
+            ('mkdir', '-p', 'd', 'e', 'q'),
         ])
 
     def test_tagged_dependencies(self):
@@ -148,4 +148,20 @@ class TestStep(unittest.TestCase):
 
         self.assertSetEqual(s.targets, { 'cake' })
         self.assertSetEqual(s.dependencies, { 'cake_ingredients' })
-        self.assertListEqual(s.commands, [['make', 'cake']])
+        self.assertListEqual(s.commands, [('make', 'cake')])
+
+    def test_commands_stored_as_interned_tuples(self):
+        s1 = Step(targets='a' + 'b',
+                  commands=[['wsim_' + 'lsm.R', '--state', 'state.nc']])
+        s2 = Step(targets='ab',
+                  commands=[['wsim_lsm.R', '--state', 'state.nc']])
+
+        self.assertEqual(s1.commands, [('wsim_lsm.R', '--state', 'state.nc')])
+        self.assertIs(s1.commands[0][0], s2.commands[0][0])
+        self.assertIs(next(iter(s1.targets)), next(iter(s2.targets)))
+
+    def test_no_instance_dict(self):
+        s = Step(targets='a', commands=[['touch', 'a']])
+
+        with self.assertRaises(AttributeError):
+            s.depth = 3
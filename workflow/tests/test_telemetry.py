@@ -0,0 +1,98 @@
+# Copyright (c) 2026 ISciences, LLC.
+# All rights reserved.
+#
+# WSIM is licensed under the Apache License, Version 2.0 (the "License").
+# You may not use this file except in compliance with the License. You may
+# obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import sys
+import tempfile
+import unittest
+
+from wsim_workflow.step import Step
+from wsim_workflow.telemetry import categorize, instrument_steps, main, read_log, summarize, tool_name
+
+
+def record(tool, targets, wall, status=0):
+    return dict(tool=tool, targets=targets, wall=wall, user=wall, system=0, max_rss=2**20,
+                read_bytes=0, write_bytes=0, status=status)
+
+
+class TestTelemetry(unittest.TestCase):
+
+    def test_run_records_usage(self):
+        with tempfile.TemporaryDirectory() as d:
+            log = os.path.join(d, 'telemetry.jsonl')
+
+            status = main(['run', '--log', log, '--targets', '/ws/a.nc /ws/b.nc', '--',
+                           sys.executable, '-c', 'x = bytearray(50 * 2**20)'])
+            self.assertEqual(0, status)
+
+            status = main(['run', '--log', log, '--', sys.executable, '-c', 'import sys; sys.exit(3)'])
+            self.assertEqual(3, status)
+
+            records = list(read_log(log))
+
+        self.assertEqual(2, len(records))
+        self.assertEqual(['/ws/a.nc', '/ws/b.nc'], records[0]['targets'])
+        self.assertEqual(os.path.basename(sys.executable), records[0]['tool'])
+        self.assertGreater(records[0]['max_rss'], 50 * 2**20)
+        self.assertGreater(records[0]['wall'], 0)
+        self.assertEqual(3, records[1]['status'])
+
+    def test_tool_name(self):
+        self.assertEqual('wsim_lsm.R', tool_name(['/wsim/wsim_lsm.R', '--state', 'x.nc']))
+        self.assertEqual('download.py', tool_name(['python3', '-u', '/wsim/utils/download.py', 'x']))
+
+    def test_categorize(self):
+        r = record('wsim_integrate.R', ['/ws/results_integrated/results_6mo_201901_trgt201904_fcstcfsv2_2018122118.nc'], 1)
+
+        self.assertEqual('wsim_integrate.R', categorize(r, 'tool'))
+        self.assertEqual('6mo', categorize(r, 'window'))
+        self.assertEqual('cfsv2', categorize(r, 'model'))
+        self.assertEqual('forecast', categorize(r, 'phase'))
+
+        # Ensemble members stacked in a single file
+        r = record('wsim_anom.R', ['/ws/rp/rp_1mo_201901_trgt201904_fcstcfsv2.nc'], 1)
+        self.assertEqual('cfsv2', categorize(r, 'model'))
+
+        r = record('wsim_fit.R', ['/ws/spinup/fits/fit_Ws_month_01.nc'], 1)
+        self.assertEqual('1mo', categorize(r, 'window'))
+        self.assertEqual('observed', categorize(r, 'model'))
+        self.assertEqual('spinup', categorize(r, 'phase'))
+
+    def test_summarize(self):
+        records = [
+            record('wsim_lsm.R', ['/ws/state_201901.nc'], 10),
+            record('wsim_anom.R', ['/ws/rp_201901.nc'], 2),
+            record('wsim_lsm.R', ['/ws/state_201902.nc'], 20, status=1),
+        ]
+
+        summary = summarize(records, 'tool')
+
+        self.assertEqual(['wsim_lsm.R', 'wsim_anom.R'], [key for key, _ in summary])
+        self.assertEqual(2, summary[0][1]['count'])
+        self.assertEqual(1, summary[0][1]['failed'])
+        self.assertEqual(30, summary[0][1]['wall'])
+
+    def test_instrument_steps(self):
+        step = Step(targets=['b.nc', 'a.nc'], dependencies=[], commands=[['cdo', 'merge', 'x.nc', 'a.nc', 'b.nc']])
+
+        step, = instrument_steps([step], '/ws/telemetry.jsonl')
+
+        self.assertEqual(('python3', '{BINDIR}/workflow/wsim_telemetry.py', 'run',
+                          '--log', '/ws/telemetry.jsonl',
+                          '--targets', '"a.nc b.nc"',
+                          '--', 'cdo', 'merge', 'x.nc', 'a.nc', 'b.nc'),
+                         step.commands[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
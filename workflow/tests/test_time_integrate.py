@@ -0,0 +1,97 @@
+# Copyright (c) 2026 ISciences, LLC.
+# All rights reserved.
+#
+# WSIM is licensed under the Apache License, Version 2.0 (the "License").
+# You may not use this file except in compliance with the License. You may
+# obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+
+from wsim_workflow.actions import time_integrate, time_integrate_windows, window_decomposition
+from wsim_workflow.output.gnu_make import write_step
+from wsim_workflow.paths import DefaultWorkspace
+
+WINDOWS = [3, 6, 12, 24, 36, 60]
+
+
+def inputs(step):
+    cmd = step.commands[0]
+    return [cmd[i+1].strip('"') for i, arg in enumerate(cmd) if arg == '--input']
+
+
+def stats(step):
+    cmd = step.commands[0]
+    return [cmd[i+1] for i, arg in enumerate(cmd) if arg == '--stat']
+
+
+class TestTimeIntegrate(unittest.TestCase):
+
+    ws = DefaultWorkspace('/tmp', distribution_subdir=False)
+
+    def test_window_decomposition(self):
+        self.assertIsNone(window_decomposition(3, WINDOWS))
+        self.assertEqual(3, window_decomposition(6, WINDOWS))
+        self.assertEqual(6, window_decomposition(12, WINDOWS))
+        self.assertEqual(12, window_decomposition(24, WINDOWS))
+        self.assertEqual(12, window_decomposition(36, WINDOWS))
+        self.assertEqual(12, window_decomposition(60, WINDOWS))
+        self.assertIsNone(window_decomposition(60, [36]))
+
+    def test_monthly_inputs_by_default(self):
+        step, = time_integrate(self.ws, {'sum': ['RO_mm']}, forcing=False, yearmon='201906', window=12)
+
+        self.assertEqual(12, len(inputs(step)))
+        self.assertEqual(['sum::RO_mm'], stats(step))
+
+    def test_observed_derived(self):
+        step, = time_integrate(self.ws, {'sum': ['RO_mm'], 'ave': ['Ws']}, forcing=False, yearmon='201906', window=36,
+                               derive_from=WINDOWS)
+
+        self.assertEqual([self.ws.results(yearmon=m, window=12) + '::RO_mm_sum,Ws_ave'
+                          for m in ('201706', '201806', '201906')],
+                         inputs(step))
+        self.assertEqual(['sum::RO_mm_sum', 'ave::Ws_ave'], stats(step))
+        self.assertIn('--keepvarnames', step.commands[0])
+        self.assertSetEqual({self.ws.results(yearmon='201906', window=36)}, step.targets)
+
+    def test_forecast_derived(self):
+        step, = time_integrate(self.ws, {'sum': ['Pr']}, forcing=True, yearmon='201906', target='201909',
+                               model='CFSv2', member='1', window=6, derive_from=WINDOWS)
+
+        self.assertEqual([self.ws.forcing(yearmon='201906', window=3) + '::Pr_sum',
+                          self.ws.forcing(yearmon='201906', target='201909', model='CFSv2', member='1', window=3) + '::Pr_sum'],
+                         inputs(step))
+
+    def test_non_decomposable_stat_not_derived(self):
+        step, = time_integrate(self.ws, {'median': ['RO_mm']}, forcing=False, yearmon='201906', window=12,
+                               derive_from=WINDOWS)
+
+        self.assertEqual(12, len(inputs(step)))
+
+    def test_single_pass(self):
+        step = time_integrate_windows(self.ws, {'sum': ['Pr']}, forcing=True, yearmon='201906', target='201908',
+                                      model='CFSv2', member='1', windows=[3, 6])
+
+        self.assertEqual([self.ws.forcing(yearmon=m, window=1) + '::Pr' for m in ('201903', '201904', '201905', '201906')] +
+                         [self.ws.forcing(yearmon='201906', target=m, model='CFSv2', member='1', window=1) + '::Pr'
+                          for m in ('201907', '201908')],
+                         inputs(step))
+
+        cmd = step.commands[0]
+        self.assertEqual('3,6', cmd[cmd.index('--windows') + 1])
+        self.assertEqual([self.ws.forcing(yearmon='201906', target='201908', model='CFSv2', member='1', window=w)
+                          for w in (3, 6)],
+                         [cmd[i+1].strip('"') for i, arg in enumerate(cmd) if arg == '--output'])
+
+        # Window placeholder is passed through to wsim_integrate
+        self.assertIn('--attr "window={window}"', ' '.join(write_step(step, {'BINDIR': '/wsim'}).split()))
+
+
+if __name__ == '__main__':
+    unittest.main()
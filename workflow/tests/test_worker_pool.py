@@ -0,0 +1,124 @@
+# Copyright (c) 2026 ISciences, LLC.
+# All rights reserved.
+#
+# WSIM is licensed under the Apache License, Version 2.0 (the "License").
+# You may not use this file except in compliance with the License. You may
+# obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import gc
+import io
+import os
+import sys
+import tempfile
+import threading
+import unittest
+import unittest.mock
+import warnings
+
+from wsim_workflow.commands import wsim_anom
+from wsim_workflow.step import Step
+from wsim_workflow.worker_pool import Server, WorkerPool, submit, use_worker_pool, WORKER_DONE
+
+# Stands in for wsim_batch.R --worker: echoes the arguments of each job,
+# fails jobs whose first argument is "fail", and exits on "crash".
+FAKE_WORKER = '''
+import os, sys
+for line in sys.stdin:
+    fields = line.rstrip('\\n').split('\\t')
+    os.chdir(fields[0])
+    if fields[2] == 'crash':
+        sys.exit(1)
+    print('ran', ' '.join(fields[1:]), 'in', os.getcwd())
+    print('{} {}'.format('%s', 1 if fields[2] == 'fail' else 0), flush=True)
+''' % WORKER_DONE
+
+
+class TestWorkerPool(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.socket = os.path.join(self.dir.name, 'pool.sock')
+        self.pool = WorkerPool([sys.executable, '-c', FAKE_WORKER], 2)
+        self.server = Server(self.socket, self.pool)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.pool.stop()
+        self.dir.cleanup()
+
+    def submit(self, args):
+        with unittest.mock.patch('sys.stdout', new_callable=io.StringIO) as stdout:
+            status = submit(self.socket, args, cwd=self.dir.name)
+        return status, stdout.getvalue()
+
+    def test_output_and_status_returned(self):
+        status, output = self.submit(['/wsim/wsim_anom.R', '--fits', 'fit.nc'])
+
+        self.assertEqual(0, status)
+        self.assertEqual('ran /wsim/wsim_anom.R --fits fit.nc in {}\n'.format(os.path.realpath(self.dir.name)),
+                         output)
+
+        status, _ = self.submit(['/wsim/wsim_anom.R', 'fail'])
+        self.assertEqual(1, status)
+
+    def test_crashed_worker_replaced(self):
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always', ResourceWarning)
+
+            for _ in range(3):
+                status, _ = self.submit(['/wsim/wsim_anom.R', 'crash'])
+                self.assertEqual(1, status)
+            gc.collect()
+
+        # the pipes of the crashed workers have been closed
+        self.assertFalse([w for w in caught if issubclass(w.category, ResourceWarning)])
+
+        status, _ = self.submit(['/wsim/wsim_anom.R', 'ok'])
+        self.assertEqual(0, status)
+        self.assertEqual(2, len(self.pool.workers))
+
+    def test_worker_in_sync_after_client_disconnects(self):
+        pool = WorkerPool([sys.executable, '-c', FAKE_WORKER], 1)
+        self.addCleanup(pool.stop)
+
+        def disconnected(line):
+            raise BrokenPipeError()
+
+        self.assertEqual(1, pool.run(['/wsim/wsim_anom.R', 'fail'], self.dir.name, disconnected))
+
+        # the next job on the same worker sees only its own output and status
+        lines = []
+        self.assertEqual(0, pool.run(['/wsim/wsim_anom.R', 'ok'], self.dir.name, lines.append))
+        self.assertEqual(['ran /wsim/wsim_anom.R ok in {}\n'.format(os.path.realpath(self.dir.name))], lines)
+
+    def test_unavailable_pool(self):
+        self.assertIsNone(submit(os.path.join(self.dir.name, 'missing.sock'), ['/wsim/wsim_anom.R']))
+        self.assertIsNone(submit(self.socket, ['/wsim/wsim_anom.R', 'a\tb']))
+
+
+class TestUseWorkerPool(unittest.TestCase):
+
+    def test_r_tools_rewritten(self):
+        step = wsim_anom(fits='fit.nc', obs='results.nc', rp='rp.nc')
+        tool_command = step.commands[0]
+
+        other = Step(targets='x.nc', dependencies=[], commands=[['cdo', 'copy', 'a.nc', 'x.nc']])
+
+        rewritten = list(use_worker_pool([step, other], '/tmp/pool.sock'))
+
+        self.assertEqual(('python3', '{BINDIR}/workflow/wsim_worker.py', 'run', '--socket', '/tmp/pool.sock', '--')
+                         + tool_command,
+                         rewritten[0].commands[0])
+        self.assertEqual(('cdo', 'copy', 'a.nc', 'x.nc'), rewritten[1].commands[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+# Copyright (c) 2026 ISciences, LLC.
+# All rights reserved.
+#
+# WSIM is licensed under the Apache License, Version 2.0 (the "License").
+# You may not use this file except in compliance with the License. You may
+# obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import shutil
+import subprocess
+import tempfile
+import unittest
+
+from wsim_workflow.output import gnu_make, snakemake
+from wsim_workflow.step import Step
+from wsim_workflow.workflow import default_goal, get_meta_steps, track_duplicate_targets, write_makefile
+
+
+class TestWorkflow(unittest.TestCase):
+
+    def test_steps_written_from_generator(self):
+        def steps():
+            for name in ('a', 'b', 'c'):
+                yield Step(targets=name, commands=[['touch', name]])
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            makefile = os.path.join(tmpdir, 'Makefile')
+            n = write_makefile(gnu_make, makefile, steps(), '/wsim')
+
+            with open(makefile) as f:
+                contents = f.read()
+
+        self.assertEqual(3, n)
+        for name in ('a', 'b', 'c'):
+            self.assertIn('\n{} : | \n'.format(name), contents)
+
+    def workflow_steps(self):
+        # A global prep step comes first and meta-steps come last, as in iter_steps
+        meta_steps = get_meta_steps()
+
+        steps = [Step(targets='prep', commands=[['touch', 'prep']]),
+                 Step(targets='a', commands=[['touch', 'a']])]
+        meta_steps['population_summaries'].require(steps[1:])
+
+        return steps + list(meta_steps.values())
+
+    def test_default_goal_unchanged(self):
+        steps = self.workflow_steps()
+
+        # Steps used to be written in reverse order, making the last meta-step
+        # the first rule, and therefore the default goal
+        self.assertEqual({default_goal()}, steps[-1].targets)
+        self.assertEqual('population_summaries', default_goal())
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            makefile = os.path.join(tmpdir, 'Makefile')
+            write_makefile(gnu_make, makefile, steps, '/wsim', goal=default_goal())
+
+            with open(makefile) as f:
+                self.assertIn('\n.DEFAULT_GOAL := population_summaries\n', f.read())
+
+            if shutil.which('make'):
+                commands = subprocess.run(['make', '-n', '-f', makefile], cwd=tmpdir, check=True,
+                                          stdout=subprocess.PIPE, universal_newlines=True).stdout.split('\n')
+                commands = [c.strip() for c in commands]
+
+                self.assertIn('touch a', commands)
+                self.assertNotIn('touch prep', commands)
+
+    def test_snakemake_default_goal(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            snakefile = os.path.join(tmpdir, 'Snakefile')
+            write_makefile(snakemake, snakefile, self.workflow_steps(), '/wsim', goal=default_goal())
+
+            with open(snakefile) as f:
+                rules = f.read().split('rule')
+
+        # The first rule is the default target
+        self.assertEqual(' all:\n    input: ["population_summaries"]', rules[1].strip('\n'))
+
+    def test_duplicate_targets_tracked(self):
+        steps = [
+            Step(targets=['a', 'b'], commands=[['touch', 'a', 'b']]),
+            Step(targets='c', commands=[['touch', 'c']]),
+            Step(targets='b', commands=[['touch', 'b']]),
+        ]
+
+        duplicates = []
+        passed_through = list(track_duplicate_targets(iter(steps), duplicates))
+
+        self.assertEqual(steps, passed_through)
+        self.assertListEqual(['b'], duplicates)
@@ -78,6 +78,12 @@ class TestWorkspacePaths(unittest.TestCase):
             self.ws.results(yearmon='201612', window=1, target='201703', model='CFSv1', member='13')
         )
 
+        # Forecast data with members stacked in a single file
+        self.assertEqual(
+            join(self.root, 'results_integrated', 'results_6mo_201612_trgt201703_fcstcfsv1.nc'),
+            self.ws.results(yearmon='201612', window=6, target='201703', model='CFSv1')
+        )
+
         self.assertEqual(
             join(self.root, 'results_integrated', 'results_36mo_201612_trgt201703_fcstcfsv1_13.nc'),
             self.ws.results(yearmon='201612', target='201703', member='13', model='CFSv1', window=36)
@@ -11,9 +11,10 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import collections
 import itertools
 
-from typing import Dict, List, Optional, Union
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
 
 from . import attributes as attrs
 from .attributes import standard_attrs
@@ -22,7 +23,10 @@ from .paths import read_vars, Basis, Vardef, DefaultWorkspace, ObservedForcing,
 from .commands import \
     exact_extract, \
     wsim_anom, \
+    wsim_batch, \
     wsim_composite, \
+    wsim_composite_pipeline, \
+    wsim_coverage_extract, \
     wsim_correct, \
     wsim_fit, \
     wsim_flow, \
@@ -30,12 +34,21 @@ from .commands import \
     wsim_lsm, \
     wsim_merge
 from .config_base import ConfigBase
+from .cores import wrapper_command
 
 from . import dates
 
 from .dates import get_next_yearmon, get_lead_months, rolling_window, available_yearmon_range, parse_yearmon
+from .grids import Grid
+from .polygon_summaries import compute_population_summary
 from .step import Step
 
+# Name of the dimension along which forecast ensemble members are stacked
+MEMBER_DIMENSION = 'member'
+
+# Statistics with which forecast ensembles are summarized
+ENSEMBLE_SUMMARY_STATS = ['q25', 'q50', 'q75']
+
 
 def create_forcing_file(workspace: DefaultWorkspace,
                         data: Union[ObservedForcing, ForecastForcing],
@@ -89,12 +102,26 @@ def compute_basin_results(workspace: DefaultWorkspace,
                           yearmon: str,
                           target: Optional[str] = None,
                           model: Optional[str] = None,
-                          member: Optional[str] = None) -> List[Step]:
+                          member: Optional[str] = None,
+                          coverage_grid: Optional[Grid] = None) -> List[Step]:
+    """
+    Aggregate pixel-based runoff to basins and compute the resulting basin flows. If
+    coverage_grid is specified, basins are not intersected with the grid, but the
+    coverage precomputed for that grid is used.
+    """
     pixel_results = workspace.results(model=model, yearmon=yearmon, window=1, target=target, member=member)
     basin_results = workspace.results(model=model, yearmon=yearmon, window=1, target=target, member=member, basis=Basis.BASIN)
 
-    return [
-        exact_extract(
+    if coverage_grid:
+        aggregate = wsim_coverage_extract(
+            coverage=workspace.coverage(basis=Basis.BASIN, grid=coverage_grid),
+            input=read_vars(pixel_results, 'RO_m3'),
+            stats='sum',
+            keepvarnames=True,
+            output=basin_results
+        )
+    else:
+        aggregate = exact_extract(
             boundaries=static.basins().file,
             fid="HYBAS_ID",
             id_name="id",
@@ -107,10 +134,13 @@ def compute_basin_results(workspace: DefaultWorkspace,
                 'RO_m3=sum(RO_m3)',
             ],
             output=basin_results
-        ).merge(
+        )
+
+    return [
+        aggregate.merge(
             wsim_flow(
                 input=read_vars(basin_results, 'RO_m3'),
-                flowdir=static.basin_downstream(),
+                order=static.basin_flow_order(),
                 varname='Bt_RO',
                 output=basin_results
             )
@@ -153,6 +183,21 @@ def run_lsm(workspace: DefaultWorkspace, static: Static, *,
     ]
 
 
+# Statistics that can be computed for a window by combining the values of
+# the statistic for consecutive, equal-length shorter windows
+DECOMPOSABLE_STATS = ('ave', 'max', 'min', 'sum')
+
+
+def window_decomposition(window: int, windows: Iterable[int]) -> Optional[int]:
+    """
+    Return the longest of the given windows into which window can be evenly
+    divided, or None if there is no such window.
+    """
+    candidates = [w for w in windows if 1 < w < window and window % w == 0]
+
+    return max(candidates, default=None)
+
+
 def time_integrate(workspace: DefaultWorkspace,
                    integrated_stats: Dict[str, List[str]],
                    *,
@@ -162,7 +207,28 @@ def time_integrate(workspace: DefaultWorkspace,
                    target: Optional[str]=None,
                    window: Optional[int]=None,
                    member: Optional[str]=None,
-                   basis: Optional[Basis]=None):
+                   basis: Optional[Basis]=None,
+                   derive_from: Optional[Iterable[int]]=None):
+    """
+    Integrate monthly forcing or results over a window ending with yearmon
+    (or target, for forecasts).
+
+    If derive_from is provided and window is a multiple of one of the windows
+    it contains, the integrated values will instead be computed from the
+    previously integrated values for consecutive shorter windows, e.g., a
+    12-month sum is computed as the sum of two 6-month sums. Because the parts
+    are of equal length, the average of the part averages is equal to the
+    average over the window, provided that values are defined in every month.
+    """
+    path = workspace.forcing if forcing else workspace.results
+
+    if derive_from and all(stat in DECOMPOSABLE_STATS for stat in integrated_stats):
+        part_window = window_decomposition(window, derive_from)
+        if part_window:
+            return [derive_time_integrated(path, integrated_stats,
+                                           yearmon=yearmon, model=model, target=target, window=window,
+                                           part_window=part_window, member=member, basis=basis)]
+
     months = rolling_window(target if target else yearmon, window)
 
     lead_months = get_lead_months(yearmon, target) if target else 0
@@ -174,14 +240,9 @@ def time_integrate(workspace: DefaultWorkspace,
         window_observed = months
         window_forecast = []
 
-    if forcing:
-        prev = [workspace.forcing(yearmon=x, window=1, basis=basis) for x in window_observed] + \
-               [workspace.forcing(yearmon=yearmon, model=model, member=member, target=x, window=1, basis=basis) for x in window_forecast]
-        results = workspace.forcing(yearmon=yearmon, window=window, model=model, member=member, target=target, basis=basis)
-    else:
-        prev = [workspace.results(yearmon=x, window=1, basis=basis) for x in window_observed] + \
-               [workspace.results(yearmon=yearmon, model=model, member=member, target=x, window=1, basis=basis) for x in window_forecast]
-        results = workspace.results(yearmon=yearmon, window=window, target=target, model=model, member=member, temporary=False, basis=basis)
+    prev = [path(yearmon=x, window=1, basis=basis) for x in window_observed] + \
+           [path(yearmon=yearmon, model=model, member=member, target=x, window=1, basis=basis) for x in window_forecast]
+    results = path(yearmon=yearmon, window=window, model=model, member=member, target=target, basis=basis)
 
     return [
         wsim_integrate(
@@ -198,6 +259,90 @@ def time_integrate(workspace: DefaultWorkspace,
     ]
 
 
+def derive_time_integrated(path,
+                           integrated_stats: Dict[str, List[str]],
+                           *,
+                           yearmon: str,
+                           model: Optional[str],
+                           target: Optional[str],
+                           window: int,
+                           part_window: int,
+                           member: Optional[str],
+                           basis: Optional[Basis]) -> Step:
+    """
+    Compute time-integrated values for a window by combining the integrated
+    values for consecutive windows of length part_window.
+    """
+    end = target if target else yearmon
+
+    parts = []
+    for i in reversed(range(window // part_window)):
+        part_end = dates.add_months(end, -i * part_window)
+
+        if target and part_end > yearmon:
+            parts.append(path(yearmon=yearmon, model=model, member=member, target=part_end, window=part_window, basis=basis))
+        else:
+            parts.append(path(yearmon=part_end, window=part_window, basis=basis))
+
+    # Integrated variables are named by appending the stat to the
+    # variable name (e.g., RO_mm_sum), and the name is kept when the
+    # same stat is used to combine the parts.
+    stat_vars = {stat: [var + '_' + stat for var in varnames] for stat, varnames in integrated_stats.items()}
+
+    return wsim_integrate(
+        inputs=[read_vars(f, *itertools.chain(*stat_vars.values())) for f in parts],
+        stats=[stat + '::' + ','.join(varnames) for stat, varnames in stat_vars.items()],
+        keepvarnames=True,
+        attrs=standard_attrs(yearmon=yearmon,
+                             target=target,
+                             model=model,
+                             member=member,
+                             window=window) +
+                             [attrs.integration_window(var='*', months=window)],
+        output=path(yearmon=yearmon, window=window, model=model, member=member, target=target, basis=basis)
+    )
+
+
+def time_integrate_windows(workspace: DefaultWorkspace,
+                           integrated_stats: Dict[str, List[str]],
+                           *,
+                           forcing: bool,
+                           yearmon: str,
+                           windows: List[int],
+                           model: Optional[str] = None,
+                           target: Optional[str] = None,
+                           member: Optional[str] = None,
+                           basis: Optional[Basis] = None) -> Step:
+    """
+    Integrate monthly forcing or results over several windows ending with
+    yearmon (or target, for forecasts), reading each monthly file once.
+    Outputs are written to the same files as time_integrate.
+    """
+    path = workspace.forcing if forcing else workspace.results
+
+    months = rolling_window(target if target else yearmon, max(windows))
+    lead_months = get_lead_months(yearmon, target) if target else 0
+
+    prev = [path(yearmon=yearmon, model=model, member=member, target=x, window=1, basis=basis)
+            if lead_months > 0 and x > yearmon else path(yearmon=x, window=1, basis=basis)
+            for x in months]
+
+    return wsim_integrate(
+        inputs=[read_vars(f, *set(itertools.chain(*integrated_stats.values()))) for f in prev],
+        stats=[stat + '::' + ','.join(varname) for stat, varname in integrated_stats.items()],
+        windows=windows,
+        # wsim_integrate replaces {window} with the size of each window
+        attrs=standard_attrs(yearmon=yearmon,
+                             target=target,
+                             model=model,
+                             member=member,
+                             window='{{window}}') +
+                             [attrs.integration_window(var='*', months='{{window}}')],
+        output=[path(yearmon=yearmon, window=w, model=model, member=member, target=target, basis=basis)
+                for w in windows]
+    )
+
+
 def compute_return_periods(workspace: DefaultWorkspace, *,
                            forcing_vars: Optional[List[str]]=None,
                            result_vars: Optional[List[str]]=None,
@@ -246,6 +391,41 @@ def compute_return_periods(workspace: DefaultWorkspace, *,
     ]
 
 
+def stack_members(workspace: DefaultWorkspace,
+                  *,
+                  yearmon: str,
+                  target: str,
+                  model: str,
+                  members: List[str],
+                  state: bool) -> List[Step]:
+    """
+    Stack the monthly forcing and results of each forecast ensemble member
+    (and, optionally, the state at the end of the target month) along a
+    "member" dimension in a single file, so that time integration, return
+    periods and summaries can be computed for all members at once.
+    """
+    next_target = get_next_yearmon(target)
+
+    paths = [
+        lambda member: workspace.forcing(yearmon=yearmon, window=1, target=target, model=model, member=member),
+        lambda member: workspace.results(yearmon=yearmon, window=1, target=target, model=model, member=member),
+    ]
+
+    if state:
+        paths.append(lambda member: workspace.state(yearmon=yearmon, target=next_target, model=model, member=member))
+
+    return [
+        wsim_merge(
+            inputs=[path(member) for member in members],
+            output=path(None),
+            stack=MEMBER_DIMENSION,
+            labels=members,
+            comment='Stack {} ensemble members'.format(len(members))
+        )
+        for path in paths
+    ]
+
+
 def composite_vars(*, method: str, window: int, quantile: Optional[int]) -> Dict[str, Union[str, List[str]]]:
     quantile_text = '_q{}'.format(quantile) if quantile else ''
 
@@ -381,6 +561,71 @@ def composite_anomalies(workspace: DefaultWorkspace,
     ]
 
 
+def composite_pipeline(workspace: DefaultWorkspace,
+                       static: Static,
+                       *,
+                       yearmon: str,
+                       window: int,
+                       target: Optional[str] = None,
+                       quantile: Optional[int] = None,
+                       mask: Optional[Vardef] = None,
+                       compute_anomalies: bool = True,
+                       coverage_grid: Optional[Grid] = None) -> List[Step]:
+    """
+    Produce the outputs of composite_indicators, composite_anomalies (unless
+    compute_anomalies is False, in which case the composite anomalies must
+    already exist), composite_indicator_return_periods,
+    composite_indicator_adjusted and compute_population_summary in a single
+    step. Composites are computed in one process without reading back
+    intermediate results, and the population summaries are computed by the
+    same process.
+    """
+    assert (quantile is None) == (target is None)
+
+    rp_vars = composite_vars(method='return_period', window=window, quantile=quantile)
+    sa_vars = composite_vars(method='standard_anomaly', window=window, quantile=quantile)
+
+    if target:
+        rp_file = workspace.return_period_summary(yearmon=yearmon, target=target, window=window)
+        sa_file = workspace.standard_anomaly_summary(yearmon=yearmon, target=target, window=window)
+    else:
+        rp_file = workspace.return_period(yearmon=yearmon, window=window)
+        sa_file = workspace.standard_anomaly(yearmon=yearmon, window=window)
+
+    if compute_anomalies:
+        anom_surplus = [sa_file + '::' + var for var in sa_vars['surplus']]
+        anom_deficit = [sa_file + '::' + var for var in sa_vars['deficit']]
+    else:
+        anom_surplus = None
+        anom_deficit = None
+
+    composites = wsim_composite_pipeline(
+        surplus=[rp_file + '::' + var for var in rp_vars['surplus']],
+        deficit=[rp_file + '::' + var for var in rp_vars['deficit']],
+        anom_surplus=anom_surplus,
+        anom_deficit=anom_deficit,
+        fits=[
+            workspace.fit_composite_anomalies(window=window, indicator='surplus'),
+            workspace.fit_composite_anomalies(window=window, indicator='deficit')
+        ],
+        both_threshold=3,
+        anom_both_threshold=0.4307273,  # corresponds with rp of 3
+        mask=mask,
+        clamp=60,
+        composite=workspace.composite_summary(yearmon=yearmon, target=target, window=window),
+        composite_anom=workspace.composite_anomaly(yearmon=yearmon, target=target, window=window),
+        composite_anom_rp=workspace.composite_anomaly_return_period(yearmon=yearmon, window=window, target=target),
+        adjusted=workspace.composite_summary_adjusted(yearmon=yearmon, window=window, target=target),
+        attrs=standard_attrs(yearmon=yearmon, target=target, window=window, model=None, member=None)
+    )
+
+    return [
+        wsim_batch([composites] +
+                   compute_population_summary(workspace, static, yearmon=yearmon, window=window, target=target,
+                                              coverage_grid=coverage_grid))
+    ]
+
+
 def compute_observed_forcing_fit_for_hindcast_period(forecast: ForecastForcing, *,
                                                      varname: str,
                                                      min_fit_year: int,
@@ -435,15 +680,15 @@ def compute_wetday_ltmeans(forcing: ObservedForcing, start_year: int, stop_year:
     return steps
 
 
-def fit_var(config: ConfigBase,
-            *,
-            param: str,
-            month: int,
-            stat: Optional[str]=None,
-            window: int=1,
-            basis: Optional[Basis]=None) -> List[Step]:
+def fit_var_input(config: ConfigBase,
+                  *,
+                  param: str,
+                  month: int,
+                  stat: Optional[str]=None,
+                  window: int=1,
+                  basis: Optional[Basis]=None) -> str:
     """
-    Compute fits for param in given month over fitting period
+    Return the observations of param in given month over fitting period
     """
     input_range = available_yearmon_range(window=window,
                                           month=month,
@@ -467,63 +712,205 @@ def fit_var(config: ConfigBase,
     else:
         infile = config.workspace().results(yearmon=input_range, window=window, basis=basis)
 
+    return read_vars(infile, param_to_read)
+
+
+def fit_var(config: ConfigBase,
+            *,
+            param: str,
+            month: int,
+            stat: Optional[str]=None,
+            window: int=1,
+            basis: Optional[Basis]=None) -> List[Step]:
+    """
+    Compute fits for param in given month over fitting period
+    """
     # Step for fits
     return [
         wsim_fit(
             distribution=config.distribution,
-            inputs=read_vars(infile, param_to_read),
+            inputs=fit_var_input(config, param=param, month=month, stat=stat, window=window, basis=basis),
             output=config.workspace().fit_obs(var=param, stat=stat, month=month, window=window, basis=basis),
-            window=window
+            window=window,
+            cores=config.cores_per_step
         )
     ]
 
 
-def forcing_summary(config: ConfigBase, *, yearmon: str, target: str, window: int) -> List[Step]:
+def fit_var_all_months(config: ConfigBase,
+                       *,
+                       param: str,
+                       stat: Optional[str]=None,
+                       window: int=1,
+                       basis: Optional[Basis]=None) -> List[Step]:
+    """
+    Compute fits for param in each month over fitting period, using a
+    single process for all months if the configuration requests it
+    """
+    if not config.batch_fits:
+        return list(itertools.chain(*[fit_var(config, param=param, month=month, stat=stat, window=window, basis=basis)
+                                      for month in dates.all_months]))
+
+    return [
+        wsim_fit(
+            distribution=config.distribution,
+            inputs=[fit_var_input(config, param=param, month=month, stat=stat, window=window, basis=basis)
+                    for month in dates.all_months],
+            output=[config.workspace().fit_obs(var=param, stat=stat, month=month, window=window, basis=basis)
+                    for month in dates.all_months],
+            window=window,
+            cores=config.cores_per_step
+        )
+    ]
+
+
+def ensemble_inputs(config: ConfigBase,
+                    yearmon: str,
+                    path: Callable[..., str]) -> Tuple[List[str], List[float], Optional[str]]:
+    """
+    Return the files containing the members of the forecast ensemble, the
+    weight of each member, and the dimension along which members are stacked,
+    if the configuration stacks members in a single file for each model.
+
+    path is called with a model and member (None, for stacked files) and
+    should return the file for that model and member.
+    """
+    weighted = list(config.weighted_members(yearmon))
+    weights = [weight for _, _, weight in weighted]
+
+    if config.stack_members:
+        return [path(model=model, member=None) for model in config.models()], weights, MEMBER_DIMENSION
+
+    return [path(model=model, member=member) for model, member, _ in weighted], weights, None
+
+
+def ensemble_label(model: str, member: str) -> str:
+    """
+    Return the label identifying a forecast ensemble member in a file in
+    which the members of all models are accumulated
+    """
+    return '{}_{}'.format(model.lower(), member)
+
+
+def ensemble_summary_inputs(ws: DefaultWorkspace, *, yearmon: str, target: str, window: int) -> Dict[str, Callable[..., str]]:
+    """
+    Return the kinds of file summarized for each forecast ensemble, each with
+    a function returning the file for a given model and member
+    """
+    return collections.OrderedDict([
+        ('forcing', lambda model, member: ws.forcing(model=model, yearmon=yearmon, window=window, target=target, member=member)),
+        ('results', lambda model, member: ws.results(model=model, yearmon=yearmon, window=window, target=target, member=member)),
+        ('rp', lambda model, member: ws.return_period(model=model, yearmon=yearmon, window=window, target=target, member=member)),
+        ('anom', lambda model, member: ws.standard_anomaly(model=model, yearmon=yearmon, window=window, target=target, member=member)),
+    ])
+
+
+def accumulate_ensemble_members(config: ConfigBase, *, yearmon: str, target: str, window: int) -> List[Step]:
+    """
+    Write each forecast ensemble member to files in which the members of all
+    models are stacked along a "member" dimension, as soon as the member's
+    outputs are available.
+
+    Each member writes only its own slice of each file, in any order, holding
+    a lock on that file while it writes, and records its completion in a tag
+    file. A member whose outputs are regenerated overwrites its slice.
+    """
+    ws = config.workspace()
+
+    weighted = list(config.weighted_members(yearmon))
+    labels = [ensemble_label(model, member) for model, member, _ in weighted]
+
+    steps = []
 
+    for thing, path in ensemble_summary_inputs(ws, yearmon=yearmon, target=target, window=window).items():
+        lock_dir = ws.ensemble_lock_dir(thing, yearmon=yearmon, window=window, target=target)
+
+        for (model, member, _), label in zip(weighted, labels):
+            step = wsim_merge(
+                inputs=[path(model=model, member=member)],
+                output=ws.ensemble_members(thing, yearmon=yearmon, window=window, target=target),
+                stack=MEMBER_DIMENSION,
+                labels=labels,
+                slices=[label],
+                comment='Add {} member {} to ensemble {}'.format(model, member, thing)
+            )
+
+            # Members write to the same file, so only one may do so at a time
+            step.commands = [wrapper_command(command, lock_dir, 1, 1) for command in step.commands]
+
+            step.replace_targets_with_tag_file(
+                ws.ensemble_member_tag(thing, yearmon=yearmon, window=window, target=target, model=model, member=member))
+
+            steps.append(step)
+
+    return steps
+
+
+def ensemble_summary(config: ConfigBase,
+                     *,
+                     yearmon: str,
+                     target: str,
+                     window: int,
+                     thing: str,
+                     output: str,
+                     attrs: Optional[List[str]] = None) -> List[Step]:
+    """
+    Summarize the members of a forecast ensemble. If the configuration
+    requests incremental summaries, the members are read from the file
+    written by accumulate_ensemble_members.
+    """
     ws = config.workspace()
+    path = ensemble_summary_inputs(ws, yearmon=yearmon, target=target, window=window)[thing]
+
+    if config.incremental_summaries and not config.stack_members:
+        weighted = list(config.weighted_members(yearmon))
 
-    inputs = []
-    weights = []
+        step = wsim_integrate(
+            inputs=[ws.ensemble_members(thing, yearmon=yearmon, window=window, target=target)],
+            weights=[weight for _, _, weight in weighted],
+            across=MEMBER_DIMENSION,
+            stats=ENSEMBLE_SUMMARY_STATS,
+            output=output,
+            attrs=attrs
+        ).replace_dependencies(*[
+            ws.ensemble_member_tag(thing, yearmon=yearmon, window=window, target=target, model=model, member=member)
+            for model, member, _ in weighted
+        ])
 
-    for model, member, weight in config.weighted_members(yearmon):
-        inputs.append(ws.forcing(model=model, yearmon=yearmon, window=window, target=target, member=member))
-        weights.append(weight)
+        return [step]
+
+    inputs, weights, across = ensemble_inputs(config, yearmon, path)
 
     return [
         wsim_integrate(
             inputs=inputs,
             weights=weights,
-            stats=['q25', 'q50', 'q75'],
-            output=ws.forcing_summary(yearmon=yearmon, target=target, window=window),
-            attrs=standard_attrs(yearmon=yearmon, target=target, window=window, model=','.join(config.models()), member='All')
+            across=across,
+            stats=ENSEMBLE_SUMMARY_STATS,
+            output=output,
+            attrs=attrs
         )
     ]
 
 
+def forcing_summary(config: ConfigBase, *, yearmon: str, target: str, window: int) -> List[Step]:
+    ws = config.workspace()
+
+    return ensemble_summary(config, yearmon=yearmon, target=target, window=window, thing='forcing',
+                            output=ws.forcing_summary(yearmon=yearmon, target=target, window=window),
+                            attrs=standard_attrs(yearmon=yearmon, target=target, window=window, model=','.join(config.models()), member='All'))
+
+
 def result_summary(config: ConfigBase,
                    *,
                    yearmon: str,
                    target: str,
                    window: Optional[int] = None) -> List[Step]:
-
     ws = config.workspace()
 
-    inputs = []
-    weights = []
-
-    for model, member, weight in config.weighted_members(yearmon):
-        inputs.append(ws.results(model=model, yearmon=yearmon, window=window, target=target, member=member))
-        weights.append(weight)
-
-    return [
-        wsim_integrate(
-            inputs=inputs,
-            weights=weights,
-            stats=['q25', 'q50', 'q75'],
-            output=ws.results_summary(yearmon=yearmon, window=window, target=target),
-            attrs=standard_attrs(yearmon=yearmon, target=target, window=window, model=','.join(config.models()), member='All')
-    )
-    ]
+    return ensemble_summary(config, yearmon=yearmon, target=target, window=window, thing='results',
+                            output=ws.results_summary(yearmon=yearmon, window=window, target=target),
+                            attrs=standard_attrs(yearmon=yearmon, target=target, window=window, model=','.join(config.models()), member='All'))
 
 
 def return_period_summary(config: ConfigBase,
@@ -533,21 +920,8 @@ def return_period_summary(config: ConfigBase,
                           window: Optional[int] = None) -> List[Step]:
     ws = config.workspace()
 
-    inputs = []
-    weights = []
-
-    for model, member, weight in config.weighted_members(yearmon):
-        inputs.append(ws.return_period(model=model, yearmon=yearmon, window=window, target=target, member=member))
-        weights.append(weight)
-
-    return [
-        wsim_integrate(
-            inputs=inputs,
-            weights=weights,
-            stats=['q25', 'q50', 'q75'],
-            output=ws.return_period_summary(yearmon=yearmon, window=window, target=target)
-        )
-    ]
+    return ensemble_summary(config, yearmon=yearmon, target=target, window=window, thing='rp',
+                            output=ws.return_period_summary(yearmon=yearmon, window=window, target=target))
 
 
 def standard_anomaly_summary(config: ConfigBase,
@@ -556,21 +930,9 @@ def standard_anomaly_summary(config: ConfigBase,
                              target: str,
                              window: Optional[int] = None) -> List[Step]:
     ws = config.workspace()
-    inputs = []
-    weights = []
 
-    for model, member, weight in config.weighted_members(yearmon):
-        inputs.append(ws.standard_anomaly(model=model, yearmon=yearmon, window=window, target=target, member=member))
-        weights.append(weight)
-
-    return [
-        wsim_integrate(
-            inputs=inputs,
-            weights=weights,
-            stats=['q25', 'q50', 'q75'],
-            output=ws.standard_anomaly_summary(yearmon=yearmon, window=window, target=target)
-        )
-    ]
+    return ensemble_summary(config, yearmon=yearmon, target=target, window=window, thing='anom',
+                            output=ws.standard_anomaly_summary(yearmon=yearmon, window=window, target=target))
 
 
 def correct_forecast(data: ForecastForcing, *, yearmon: str, member: str, target: str, lead_months: int) -> List[Step]:
@@ -15,6 +15,7 @@ import os
 
 from typing import List, Mapping, Optional, Union
 
+from .actions import compute_return_periods
 from .config_base import ConfigBase
 from .dates import add_months, format_range
 from .paths import AgricultureStatic, DefaultWorkspace, Basis, Method, Sector
@@ -78,6 +79,21 @@ def monthly_forecast(config: ConfigBase, yearmon: str, meta_steps: Mapping[str,
     for model in config.models():
         print('Generating agriculture steps for', model)
         for member in config.forecast_ensemble_members(model, yearmon):
+            if config.stack_members:
+                # The yield model reads the monthly anomalies of each member
+                # separately, but they are otherwise only computed for all
+                # members at once.
+                for target in config.forecast_targets(yearmon):
+                    steps += compute_return_periods(config.workspace(),
+                                                    forcing_vars=config.forcing_rp_vars(),
+                                                    result_vars=config.lsm_rp_vars(),
+                                                    state_vars=config.state_rp_vars(),
+                                                    yearmon=yearmon,
+                                                    window=1,
+                                                    model=model,
+                                                    target=target,
+                                                    member=member)
+
             steps += compute_yield_anomalies(config.workspace(), config.static_data(),
                                              yearmon=yearmon, model=model, member=member, latest_target=latest_target)
 
@@ -0,0 +1,95 @@
+# Copyright (c) 2026 ISciences, LLC.
+# All rights reserved.
+#
+# WSIM is licensed under the Apache License, Version 2.0 (the "License").
+# You may not use this file except in compliance with the License. You may
+# obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import collections
+import os
+
+from typing import Dict, List, Optional, Tuple
+
+from .commands import wsim_batch
+from .graph import WorkflowGraph
+from .step import Step
+
+# Tools that can be run by wsim_batch.R
+BATCHABLE_TOOLS = (
+    'wsim_anom.R',
+    'wsim_composite.R',
+    'wsim_fit.R',
+    'wsim_integrate.R',
+)
+
+
+def batchable_tool(step: Step) -> Optional[str]:
+    """
+    Return the name of the WSIM R script run by a step, if the step
+    consists of a single invocation of a script that can be batched.
+    """
+    if len(step.commands) != 1 or step.consumes or step.lock:
+        return None
+
+    tool = os.path.basename(step.commands[0][0])
+
+    if tool in BATCHABLE_TOOLS and step.commands[0][0].startswith('{BINDIR}'):
+        return tool
+
+    return None
+
+
+def batch_steps(steps: List[Step], *, batch_size: int) -> List[Step]:
+    """
+    Combine independent steps that run the same WSIM R script into steps
+    that run up to batch_size jobs within a single R process. For example,
+    the wsim_anom steps computing return periods for each member of a
+    forecast ensemble can be run as a single process.
+
+    Steps are only combined with other steps at the same level of the
+    dependency graph (the length of the longest chain of steps within
+    the list on which the step depends), which guarantees that combining
+    them cannot introduce a dependency cycle. The targets of each
+    individual step are kept, so steps outside the list can continue to
+    depend on them.
+    """
+    if batch_size < 2:
+        return steps
+
+    graph = WorkflowGraph(steps)
+
+    level = [0] * len(steps)
+    for i in graph.topological_order():
+        level[i] = 1 + max((level[j] for j in graph.upstream[i]), default=-1)
+
+    in_order = set(graph.topological_order())
+
+    groups = collections.OrderedDict()  # type: Dict[Tuple[str, int], List[int]]
+    batched = [None] * len(steps)  # type: List[Optional[Step]]
+
+    for i, step in enumerate(steps):
+        tool = batchable_tool(step)
+        if tool is None or i not in in_order:
+            batched[i] = step
+        else:
+            groups.setdefault((tool, level[i]), []).append(i)
+
+    for (tool, _), members in groups.items():
+        for start in range(0, len(members), batch_size):
+            chunk = members[start:start+batch_size]
+            if len(chunk) == 1:
+                combined = steps[chunk[0]]
+            else:
+                combined = wsim_batch([steps[i] for i in chunk],
+                                      comment='Batch of {} {} jobs'.format(len(chunk), tool))
+
+            # Place the combined step at the position of its first member
+            batched[chunk[0]] = combined
+
+    return [step for step in batched if step is not None]
@@ -190,18 +190,87 @@ def wsim_extract(*,
     )
 
 
+def wsim_coverage(*,
+                  polygons: str,
+                  fid: str,
+                  grid: Grid,
+                  weights: Optional[Union[str, Vardef]] = None,
+                  output: str,
+                  comment: Optional[str] = None) -> Step:
+    cmd = [
+        os.path.join('{BINDIR}', 'wsim_coverage.R'),
+        '--polygons', q(polygons),
+        '--fid',      fid,
+        '--extent',   ','.join(str(x) for x in (grid.xmin, grid.xmax, grid.ymin, grid.ymax)),
+        '--size',     ','.join(str(n) for n in (grid.nx, grid.ny)),
+    ]
+
+    if weights:
+        cmd += ['--weights', q(weights)]
+
+    cmd += ['--output', q(output)]
+
+    return Step(
+        targets=output,
+        dependencies=[polygons, weights],
+        commands=[cmd],
+        comment=comment
+    )
+
+
+# noinspection PyShadowingBuiltins
+def wsim_coverage_extract(*,
+                          coverage: str,
+                          input: Union[str, Vardef],
+                          output: str,
+                          stats: Union[str, List[str]],
+                          keepvarnames: bool = False,
+                          comment: Optional[str] = None) -> Step:
+    if isinstance(stats, str):
+        stats = [stats]
+
+    cmd = [
+        os.path.join('{BINDIR}', 'wsim_coverage_extract.R'),
+        '--coverage', q(coverage),
+        '--input',    q(input),
+        '--output',   q(output)
+    ]
+
+    for stat in stats:
+        cmd += ['--stat', stat]
+
+    if keepvarnames:
+        cmd.append('--keepvarnames')
+
+    return Step(
+        targets=output,
+        dependencies=[coverage, input],
+        commands=[cmd],
+        comment=comment
+    )
+
+
 def wsim_fit(*,
              distribution: str,
              inputs: Union[str, Iterable[str]],
-             output: str,
+             output: Union[str, List[str]],
              window: int,
              attrs: Optional[Mapping[str, str]] = None,
+             cores: Optional[int] = None,
              comment: Union[str, None] = None) -> Step:
     dependencies = []
     targets = []
 
     if type(inputs) is str:
         inputs = [inputs]
+    else:
+        inputs = list(inputs)
+
+    if type(output) is str:
+        output = [output]
+    else:
+        # Each input is fit separately and written to the corresponding output
+        assert len(output) == len(inputs)
 
     cmd = [
         os.path.join('{BINDIR}', 'wsim_fit.R'),
@@ -219,35 +288,50 @@ def wsim_fit(*,
         for k, v in attrs.items():
             cmd += ['--attr', '{}={}'.format(k, v)]
 
-    cmd += ['--output', output]
-    targets.append(output)
+    if cores and cores > 1:
+        cmd += ['--cores', str(cores)]
+
+    for o in output:
+        cmd += ['--output', o]
+        targets.append(o)
 
     return Step(
         targets=targets,
         dependencies=dependencies,
         commands=[cmd],
-        comment=comment
+        comment=comment,
+        cores=cores or 1
     )
 
 
 # noinspection PyShadowingBuiltins
 def wsim_flow(*,
               input: Union[str, Vardef],
-              flowdir: Union[str, Vardef],
+              flowdir: Union[str, Vardef, None]=None,
+              order: Optional[str]=None,
               varname: str,
               output: str,
               comment: Optional[str]=None) -> Step:
+    assert (flowdir is None) != (order is None), 'Exactly one of flowdir and order must be specified'
+
     cmd = [
         os.path.join('{BINDIR}', 'wsim_flow.R'),
-        '--input',   q(input),
-        '--flowdir', q(flowdir),
+        '--input',   q(input)
+    ]
+
+    if flowdir:
+        cmd += ['--flowdir', q(flowdir)]
+    else:
+        cmd += ['--order', order]
+
+    cmd += [
         '--varname', varname,
         '--output',  output
     ]
 
     return Step(
         targets=output,
-        dependencies=[input, flowdir],
+        dependencies=[input, flowdir or order],
         commands=[cmd],
         comment=comment
     )
@@ -262,6 +346,7 @@ def wsim_lsm(*,
              results: Optional[str],
              next_state: Optional[str],
              loop: Optional[int] = None,
+             tolerance: Optional[float] = None,
              result_attrs: Optional[List[str]] = None,
              comment: Optional[str] = None) -> Step:
     cmd = [
@@ -290,6 +375,9 @@ def wsim_lsm(*,
     if loop:
         cmd += ['--loop', str(loop)]
 
+    if tolerance is not None:
+        cmd += ['--tolerance', str(tolerance)]
+
     return Step(
         targets=[results, next_state],
         dependencies=[wc, flowdir, elevation, state] + forcing,
@@ -302,6 +390,9 @@ def wsim_merge(*,
                inputs: Union[str, List[str]],
                output: str,
                attrs: Optional[List[str]]=None,
+               stack: Optional[str]=None,
+               labels: Optional[List[str]]=None,
+               slices: Optional[List[str]]=None,
                comment: Optional[str]=None) -> Step:
     cmd = [os.path.join('{BINDIR}', 'wsim_merge.R')]
 
@@ -313,6 +404,13 @@ def wsim_merge(*,
 
     cmd += ['--output', q(output)]
 
+    if stack:
+        assert labels is not None and len(slices or labels) == len(inputs)
+        cmd += ['--stack', stack, '--labels', ','.join(labels)]
+
+        if slices:
+            cmd += ['--slices', ','.join(slices)]
+
     if attrs:
         for attr in attrs:
             validate_attr(attr)
@@ -375,9 +473,11 @@ def wsim_integrate(*,
                    stats: Union[str, List[str]],
                    inputs: Union[str, List[str], Vardef, List[Vardef]],
                    weights: Optional[List[float]] = None,
-                   output: str,
+                   output: Union[str, List[str]],
                    window: Optional[int]=None,
+                   windows: Optional[List[int]]=None,
                    keepvarnames: bool=False,
+                   across: Optional[str]=None,
                    attrs: Optional[List[str]]=None,
                    comment: Optional[str]=None) -> Step:
     cmd = [os.path.join('{BINDIR}', 'wsim_integrate.R')]
@@ -403,12 +503,18 @@ def wsim_integrate(*,
     if window:
         cmd += ['--window', str(window)]
 
+    if windows:
+        cmd += ['--windows', ','.join(str(w) for w in windows)]
+
     if weights:
         cmd += ['--weights', ','.join(str(w) for w in weights)]
 
     if keepvarnames:
         cmd.append('--keepvarnames')
 
+    if across:
+        cmd += ['--across', across]
+
     if type(output) is str:
         output = [output]
 
@@ -498,6 +604,126 @@ def wsim_composite(*,
     )
 
 
+def wsim_composite_pipeline(*,
+                            surplus: List[str],
+                            deficit: List[str],
+                            anom_surplus: Optional[List[str]]=None,
+                            anom_deficit: Optional[List[str]]=None,
+                            fits: List[str],
+                            both_threshold: Union[int, float],
+                            anom_both_threshold: Union[int, float],
+                            mask: Optional[str]=None,
+                            clamp: Optional[int]=None,
+                            composite: str,
+                            composite_anom: str,
+                            composite_anom_rp: str,
+                            adjusted: str,
+                            attrs: Optional[List[str]] = None,
+                            comment: Optional[str] = None) -> Step:
+    """
+    Compute composite indicators, composite anomalies (if the standardized
+    anomalies from which they are computed are provided), the return periods
+    of composite anomalies, and adjusted composite indicators in one process.
+    """
+    assert (anom_surplus is None) == (anom_deficit is None)
+
+    cmd = [os.path.join('{BINDIR}', 'wsim_composite_pipeline.R')]
+
+    for var in surplus:
+        cmd += ['--surplus', q(var)]
+
+    for var in deficit:
+        cmd += ['--deficit', q(var)]
+
+    if anom_surplus:
+        for var in anom_surplus:
+            cmd += ['--anom_surplus', q(var)]
+
+        for var in anom_deficit:
+            cmd += ['--anom_deficit', q(var)]
+
+    for fit in fits:
+        cmd += ['--fits', q(fit)]
+
+    cmd += [
+        '--both_threshold', str(both_threshold),
+        '--anom_both_threshold', str(anom_both_threshold)
+    ]
+
+    if mask:
+        cmd += ['--mask', q(mask)]
+
+    if clamp:
+        cmd += ['--clamp', str(clamp)]
+
+    if attrs:
+        for attr in attrs:
+            cmd += ['--attr', q(attr)]
+
+    cmd += [
+        '--composite', q(composite),
+        '--composite_anom', q(composite_anom),
+        '--composite_anom_rp', q(composite_anom_rp),
+        '--adjusted', q(adjusted)
+    ]
+
+    targets = [composite, composite_anom_rp, adjusted]
+    dependencies = surplus + deficit + fits + [mask]
+
+    if anom_surplus:
+        targets.append(composite_anom)
+        dependencies += anom_surplus + anom_deficit
+    else:
+        dependencies.append(composite_anom)
+
+    return Step(
+        targets=targets,
+        dependencies=dependencies,
+        commands=[cmd],
+        comment=comment
+    )
+
+
+def wsim_batch(steps: List[Step], comment: Optional[str] = None) -> Step:
+    """
+    Combine several steps, each running a single WSIM R script, into a step
+    that runs all of them within one R process using wsim_batch.R. Steps are
+    run in the order provided, so a step may use the targets of the steps
+    before it. The combined step produces all targets of the individual steps.
+    """
+    cmd = [os.path.join('{BINDIR}', 'wsim_batch.R')]
+
+    targets = set()
+    dependencies = set()
+    working_directories = set()
+    cores = 1
+    memory = 0
+
+    for i, step in enumerate(steps):
+        assert len(step.commands) == 1
+        assert not step.consumes
+
+        if i > 0:
+            cmd.append('--next')
+        cmd += step.commands[0]
+
+        dependencies |= step.dependencies - targets
+        targets |= step.targets
+        working_directories |= step.working_directories
+        cores = max(cores, step.cores)
+        memory = max(memory, step.memory)
+
+    return Step(
+        targets=targets,
+        dependencies=dependencies,
+        working_directories=working_directories,
+        commands=[cmd],
+        comment=comment,
+        cores=cores,
+        memory=memory
+    )
+
+
 def move(from_path: str, to_path: str) -> Step:
     return Step(targets=to_path,
                 consumes=from_path,
@@ -19,11 +19,69 @@ from . import paths
 from .paths import Basis
 from .step import Step
 
+INTEGRATION_METHODS = ('monthly', 'derived', 'single_pass')
+RETURN_PERIOD_BATCHING = ('members', 'all')
+
 
 class ConfigBase(metaclass=abc.ABCMeta):
 
     distribution = "gev"
 
+    # Method used to compute time-integrated values:
+    # - monthly: each window is computed from the monthly values it contains
+    # - derived: longer windows are computed from shorter windows
+    # - single_pass: all windows are computed from a single pass over the
+    #   monthly values
+    integration_method = 'monthly'
+
+    # If True, the time-integrated values, return periods and standardized
+    # anomalies of each forecast ensemble member are stacked along a "member"
+    # dimension in a single file for each model, target and window.
+    stack_members = False
+
+    # If set, forecast return periods are computed in a single process for
+    # - members: all ensemble members using a given integration window
+    # - all: all ensemble members and integration windows
+    # of each model and target, reading the distribution fits once per window
+    return_period_batching = None  # type: Optional[str]
+
+    # If True, each forecast ensemble member is written to a file in which
+    # the members are stacked as soon as its outputs are available, and the
+    # ensemble summaries read that file. Not used when members are stacked.
+    incremental_summaries = False
+
+    # If set, the spinup LSM runs over the historical period are divided into
+    # segments of this many years, each run by a separate step, so that a
+    # failed run can resume from the end of the last completed segment.
+    spinup_segment_years = None  # type: Optional[int]
+
+    # If set, the spinup LSM run using monthly climate norms stops before
+    # completing its 100 years once no cell of the state changes by more than
+    # this amount (in mm) from one year to the next.
+    spinup_tolerance = None  # type: Optional[float]
+
+    # If True, the distributions of each variable for all twelve months are
+    # fit by a single process.
+    batch_fits = False
+
+    # Number of CPU cores used by each step that can use several (currently,
+    # distribution fitting), if greater than one.
+    cores_per_step = None  # type: Optional[int]
+
+    # If True, the fraction of each grid cell covered by each basin, country
+    # and province is computed once, and used to aggregate gridded values
+    # without repeating the intersection of polygons with the grid.
+    cached_coverage = False
+
+    # If True, the composite indicators, composite anomalies and their return
+    # periods, adjusted composite indicators and population summaries for
+    # each month and integration window are computed by a single process.
+    fused_composites = False
+
+    # If True, forecast and hindcast files are downloaded by a single step for
+    # each ensemble or set of hindcasts, instead of a step for each file.
+    batch_downloads = False
+
     def set_fit_years(self, start_year: Optional[int], end_year: Optional[int]):
         assert (start_year is None) == (end_year is None)
         if start_year:
@@ -37,6 +95,57 @@ class ConfigBase(metaclass=abc.ABCMeta):
         if distribution:
             self.distribution = distribution
 
+    def set_integration_method(self, method: Optional[str] = None):
+        if method:
+            assert method in INTEGRATION_METHODS
+            self.integration_method = method
+
+    def set_stack_members(self, stack: Optional[bool] = None):
+        if stack:
+            self.stack_members = True
+
+    def set_return_period_batching(self, batching: Optional[str] = None):
+        if batching:
+            assert batching in RETURN_PERIOD_BATCHING
+            self.return_period_batching = batching
+
+    def set_incremental_summaries(self, incremental: Optional[bool] = None):
+        if incremental:
+            self.incremental_summaries = True
+
+    def set_spinup_segment_years(self, years: Optional[int] = None):
+        if years:
+            assert years > 0
+            self.spinup_segment_years = years
+
+    def set_spinup_tolerance(self, tolerance: Optional[float] = None):
+        if tolerance:
+            assert tolerance > 0
+            self.spinup_tolerance = tolerance
+
+    def set_batch_fits(self, batch: Optional[bool] = None):
+        if batch:
+            self.batch_fits = True
+
+    def set_cores_per_step(self, cores: Optional[int] = None):
+        if cores:
+            assert cores > 0
+            self.cores_per_step = cores
+
+    def set_cached_coverage(self, cached: Optional[bool] = None):
+        if cached:
+            self.cached_coverage = True
+
+    def set_fused_composites(self, fused: Optional[bool] = None):
+        if fused:
+            self.fused_composites = True
+
+    def set_batch_downloads(self, batch: Optional[bool] = None):
+        if batch:
+            self.batch_downloads = True
+            for model in self.models():
+                self.forecast_data(model).batch_downloads = True
+
     def land_mask(self) -> Optional[paths.Vardef]:
         """
         An optional land mask for composite outputs
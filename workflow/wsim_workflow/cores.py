@@ -0,0 +1,240 @@
+# Copyright (c) 2026 ISciences, LLC.
+# All rights reserved.
+#
+# WSIM is licensed under the Apache License, Version 2.0 (the "License").
+# You may not use this file except in compliance with the License. You may
+# obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Sharing a fixed number of CPU cores among workflow steps that use several.
+
+GNU Make and Ninja count each running step as one job, regardless of how many
+cores it uses, so running steps that use several cores with ``make -j`` can
+start more processes than the machine has cores. Every step is therefore run
+by a wrapper that first reserves the cores it uses from a shared budget,
+represented by one lock file per core, waiting until enough cores are free.
+
+Steps waiting for cores take a numbered ticket and reserve cores in the order
+of their tickets, so that a step using many cores is not starved by smaller
+steps that could each start as soon as a single core is free.
+"""
+
+import argparse
+import fcntl
+import os
+import random
+import subprocess
+import sys
+import time
+
+from typing import IO, Iterable, List, Tuple
+
+from .commands import q
+from .step import Step
+
+WRAPPER_SCRIPT = '{BINDIR}/workflow/wsim_cores.py'
+
+# Seconds to wait before trying again to reserve cores
+RETRY_INTERVAL = 1.0
+
+
+def try_reserve(lock_dir: str, total: int, cores: int) -> List[IO]:
+    """
+    Attempt to lock the files representing the specified number of cores,
+    without waiting. Return the locked files, or an empty list if not enough
+    cores are free, in which case no files are left locked.
+    """
+    held = []  # type: List[IO]
+
+    for i in range(total):
+        f = open(os.path.join(lock_dir, 'core_{}'.format(i)), 'a')
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            f.close()
+            continue
+
+        held.append(f)
+        if len(held) == cores:
+            return held
+
+    release(held)
+    return []
+
+
+def release(held: Iterable[IO]) -> None:
+    for f in held:
+        fcntl.flock(f, fcntl.LOCK_UN)
+        f.close()
+
+
+def ticket_path(lock_dir: str, ticket: int) -> str:
+    return os.path.join(lock_dir, 'ticket_{}'.format(ticket))
+
+
+def take_ticket(lock_dir: str) -> Tuple[int, IO]:
+    """
+    Join the queue of steps waiting for cores. Return the number of the
+    ticket taken, and the ticket file, which is kept locked for as long as
+    the step waits so that tickets abandoned by steps that were killed can be
+    recognized.
+    """
+    with open(os.path.join(lock_dir, 'tickets'), 'a+') as counter:
+        fcntl.flock(counter, fcntl.LOCK_EX)
+
+        counter.seek(0)
+        last = counter.read().strip()
+        ticket = int(last) + 1 if last else 0
+
+        counter.seek(0)
+        counter.truncate()
+        counter.write(str(ticket))
+        counter.flush()
+
+        f = open(ticket_path(lock_dir, ticket), 'a')
+        fcntl.flock(f, fcntl.LOCK_EX)
+
+        return ticket, f
+
+
+def return_ticket(lock_dir: str, ticket: int, f: IO) -> None:
+    try:
+        os.remove(ticket_path(lock_dir, ticket))
+    except FileNotFoundError:
+        pass
+    release([f])
+
+
+def first_in_line(lock_dir: str, ticket: int) -> bool:
+    """
+    Return True if no step holding an earlier ticket is still waiting.
+    """
+    with open(os.path.join(lock_dir, 'tickets'), 'a+') as counter:
+        # Tickets are taken while the counter is locked, so none can be seen
+        # before it is locked by the step that took it
+        fcntl.flock(counter, fcntl.LOCK_EX)
+
+        for name in os.listdir(lock_dir):
+            if not name.startswith('ticket_') or int(name[len('ticket_'):]) >= ticket:
+                continue
+
+            try:
+                f = open(os.path.join(lock_dir, name), 'r')
+            except FileNotFoundError:
+                continue
+
+            with f:
+                try:
+                    fcntl.flock(f, fcntl.LOCK_SH | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    return False
+
+                # The step that took the ticket is gone
+                try:
+                    os.remove(os.path.join(lock_dir, name))
+                except FileNotFoundError:
+                    pass
+
+    return True
+
+
+def reserve(lock_dir: str, total: int, cores: int) -> List[IO]:
+    """
+    Lock the files representing the specified number of cores, waiting until
+    enough cores are free and every step that started waiting earlier has
+    reserved its cores. A step requesting more cores than the budget reserves
+    the entire budget.
+    """
+    os.makedirs(lock_dir, exist_ok=True)
+
+    cores = max(1, min(cores, total))
+
+    ticket, f = take_ticket(lock_dir)
+    try:
+        while True:
+            if first_in_line(lock_dir, ticket):
+                held = try_reserve(lock_dir, total, cores)
+                if held:
+                    return held
+            # Randomize the wait so that steps waiting for cores do not retry in lockstep
+            time.sleep(RETRY_INTERVAL * random.uniform(0.5, 1.5))
+    finally:
+        return_ticket(lock_dir, ticket, f)
+
+
+def run(command: List[str], lock_dir: str, total: int, cores: int) -> int:
+    held = reserve(lock_dir, total, cores)
+    try:
+        return subprocess.call(command)
+    finally:
+        release(held)
+
+
+def wrapper_command(command: Tuple[str, ...], lock_dir: str, total: int, cores: int) -> Tuple[str, ...]:
+    return ('python3', WRAPPER_SCRIPT, 'run',
+            '--lock-dir', q(lock_dir),
+            '--total', str(total),
+            '--cores', str(cores),
+            '--') + tuple(command)
+
+
+def limit_command_cores(command: Tuple[str, ...], lock_dir: str, total: int, cores: int) -> Tuple[str, ...]:
+    if len(command) > 1 and command[:2] == ('python3', WRAPPER_SCRIPT):
+        # Wait for the locks the command already takes (e.g., on a file shared
+        # with other steps) before reserving cores, so that no cores are held
+        # while waiting
+        start = command.index('--') + 1
+        return command[:start] + limit_command_cores(command[start:], lock_dir, total, cores)
+
+    return wrapper_command(command, lock_dir, total, cores)
+
+
+def limit_cores(steps: Iterable[Step], lock_dir: str, total: int) -> Iterable[Step]:
+    """
+    Rewrite the commands of each step so that the steps together use no more
+    than the specified number of cores. Every step is counted, including
+    those using a single core, so the budget holds however many jobs Make or
+    Ninja is allowed to run.
+    """
+    for step in steps:
+        if step.commands:
+            step.commands = [limit_command_cores(tuple(command), lock_dir, total, step.cores)
+                             for command in step.commands]
+        yield step
+
+
+def parse_args(args):
+    parser = argparse.ArgumentParser('Run a command once enough CPU cores are free')
+    subparsers = parser.add_subparsers(dest='action')
+    subparsers.required = True
+
+    run_parser = subparsers.add_parser('run', help='Reserve cores and run a command')
+    run_parser.add_argument('--lock-dir', required=True, help='Directory containing a lock file for each core')
+    run_parser.add_argument('--total', required=True, type=int, help='Number of cores shared by all commands')
+    run_parser.add_argument('--cores', required=True, type=int, help='Number of cores used by the command')
+    run_parser.add_argument('command', nargs=argparse.REMAINDER, help='Command and arguments')
+
+    parsed = parser.parse_args(args)
+
+    if parsed.command and parsed.command[0] == '--':
+        parsed.command = parsed.command[1:]
+    if not parsed.command:
+        parser.error('No command provided.')
+
+    return parsed
+
+
+def main(raw_args) -> int:
+    args = parse_args(raw_args)
+
+    return run(args.command, args.lock_dir, args.total, args.cores)
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
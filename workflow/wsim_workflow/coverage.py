@@ -0,0 +1,77 @@
+# Copyright (c) 2026 ISciences, LLC.
+# All rights reserved.
+#
+# WSIM is licensed under the Apache License, Version 2.0 (the "License").
+# You may not use this file except in compliance with the License. You may
+# obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Coverage of grid cells by the polygons used to aggregate gridded results.
+
+Basins, countries and provinces do not change from one month to the next,
+so the fraction of each grid cell covered by each polygon (and, for
+countries and provinces, the population within the covered part of each
+cell) can be computed once per polygon layer and grid. Aggregating a month
+of results then requires only a weighted sum over the covered cells.
+"""
+
+from typing import List, Optional
+
+from .commands import wsim_coverage
+from .config_base import ConfigBase
+from .grids import Grid
+from .paths import Basis
+from .step import Step
+
+POPULATION = 'population'
+
+
+def coverage_grid(config: ConfigBase) -> Optional[Grid]:
+    """
+    Return the grid for which polygon coverage is precomputed, or None if
+    polygons should be intersected with the grid each time they are used.
+    """
+    if config.cached_coverage:
+        return config.observed_data().grid()
+    return None
+
+
+def compute_coverage(config: ConfigBase, *, run_electric_power: bool) -> List[Step]:
+    ws = config.workspace()
+    static = config.static_data()
+    grid = config.observed_data().grid()
+
+    steps = [
+        wsim_coverage(
+            polygons=static.countries().file,
+            fid='GID_0',
+            grid=grid,
+            weights=static.population_density().read_as(POPULATION),
+            output=ws.coverage(basis=Basis.COUNTRY, grid=grid, weights=POPULATION)
+        ),
+        wsim_coverage(
+            polygons=static.provinces().file,
+            fid='GID_1',
+            grid=grid,
+            weights=static.population_density().read_as(POPULATION),
+            output=ws.coverage(basis=Basis.PROVINCE, grid=grid, weights=POPULATION)
+        )
+    ]
+
+    if run_electric_power:
+        steps.append(
+            wsim_coverage(
+                polygons=static.basins().file,
+                fid='HYBAS_ID',
+                grid=grid,
+                output=ws.coverage(basis=Basis.BASIN, grid=grid)
+            )
+        )
+
+    return steps
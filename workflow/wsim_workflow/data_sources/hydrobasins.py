@@ -113,3 +113,22 @@ def downstream_ids(source_dir: str, basins_file: str, ids_file: str) -> List[Ste
             ]
         )
     ]
+
+
+def flow_order(source_dir: str, ids_file: str, order_file: str) -> List[Step]:
+    ids_path = os.path.join(source_dir, subdir, ids_file)
+    order_path = os.path.join(source_dir, subdir, order_file)
+
+    return [
+        Step(
+            targets=order_path,
+            dependencies=ids_path,
+            commands=[
+                [
+                    '{BINDIR}/utils/hydrobasins/compute_flow_order.R',
+                    '--downstream', ids_path,
+                    '--output', order_path
+                ]
+            ]
+        )
+    ]
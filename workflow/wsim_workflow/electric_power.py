@@ -22,6 +22,7 @@ from .spinup import time_integrate_results
 from .step import Step
 from .paths import Basis, DefaultWorkspace, ElectricityStatic, Sector, Vardef
 from .config_base import ConfigBase
+from .coverage import coverage_grid
 
 AGGREGATION_POLYGONS = (Basis.BASIN, Basis.COUNTRY, Basis.PROVINCE)
 
@@ -35,7 +36,8 @@ def spinup(config: ConfigBase, meta_steps: Mapping[str, Step]) -> List[Step]:
     for yearmon in config.historical_yearmons():
         b2b_steps += actions.compute_basin_results(workspace=config.workspace(),
                                                    static=config.static_data(),
-                                                   yearmon=yearmon)
+                                                   yearmon=yearmon,
+                                                   coverage_grid=coverage_grid(config))
 
     steps += b2b_steps
 
@@ -52,9 +54,8 @@ def spinup(config: ConfigBase, meta_steps: Mapping[str, Step]) -> List[Step]:
     # Compute time-integrated fits
     for window in windows:
         for param in config.lsm_integrated_var_names(basis=Basis.BASIN):
-            for month in all_months:
-                steps += all_fits.require(
-                    actions.fit_var(config, param=param, window=window, month=month, basis=Basis.BASIN))
+            steps += all_fits.require(
+                actions.fit_var_all_months(config, param=param, window=window, basis=Basis.BASIN))
 
     # Compute upstream storage of each basin
     steps += compute_basin_integration_windows(config.workspace(), config.static_data())
@@ -65,6 +66,32 @@ def spinup(config: ConfigBase, meta_steps: Mapping[str, Step]) -> List[Step]:
     return steps
 
 
+def time_integrate_basin_results(config: ConfigBase,
+                                 windows: List[int],
+                                 *,
+                                 yearmon: str,
+                                 target: Optional[str] = None,
+                                 model: Optional[str] = None,
+                                 member: Optional[str] = None) -> List[Step]:
+    args = dict(yearmon=yearmon, target=target, model=model, member=member, forcing=False, basis=Basis.BASIN)
+
+    if config.integration_method == 'single_pass' and windows:
+        return [actions.time_integrate_windows(config.workspace(),
+                                               config.lsm_integrated_stats(basis=Basis.BASIN),
+                                               windows=windows,
+                                               **args)]
+
+    steps = []
+    for window in windows:
+        steps += actions.time_integrate(config.workspace(),
+                                        config.lsm_integrated_stats(basis=Basis.BASIN),
+                                        window=window,
+                                        derive_from=windows if config.integration_method == 'derived' else None,
+                                        **args)
+
+    return steps
+
+
 def monthly_observed(config: ConfigBase, yearmon: str, meta_steps: Mapping[str, Step]) -> List[Step]:
     print('Generating electric power steps for', yearmon, 'observed data')
 
@@ -76,16 +103,11 @@ def monthly_observed(config: ConfigBase, yearmon: str, meta_steps: Mapping[str,
         if config.should_run_lsm(yearmon):
             steps += actions.compute_basin_results(workspace=config.workspace(),
                                                    static=config.static_data(),
-                                                   yearmon=yearmon)
+                                                   yearmon=yearmon,
+                                                   coverage_grid=coverage_grid(config))
 
         # Do time integration
-        for window in windows:
-            steps += actions.time_integrate(config.workspace(),
-                                            config.lsm_integrated_stats(basis=Basis.BASIN),
-                                            yearmon=yearmon,
-                                            window=window,
-                                            forcing=False,
-                                            basis=Basis.BASIN)
+        steps += time_integrate_basin_results(config, windows, yearmon=yearmon)
 
     if yearmon not in config.result_fit_yearmons():
         for window in windows:
@@ -120,18 +142,10 @@ def monthly_forecast(config: ConfigBase, yearmon: str, meta_steps: Mapping[str,
                                                        yearmon=yearmon,
                                                        target=target,
                                                        model=model,
-                                                       member=member)
+                                                       member=member,
+                                                       coverage_grid=coverage_grid(config))
 
-                for window in windows:
-                    steps += actions.time_integrate(config.workspace(),
-                                                    config.lsm_integrated_stats(basis=Basis.BASIN),
-                                                    yearmon=yearmon,
-                                                    target=target,
-                                                    model=model,
-                                                    member=member,
-                                                    window=window,
-                                                    basis=Basis.BASIN,
-                                                    forcing=False)
+                steps += time_integrate_basin_results(config, windows, yearmon=yearmon, target=target, model=model, member=member)
 
                 steps += compute_basin_loss_factors(config.workspace(), yearmon=yearmon, target=target, model=model, member=member)
 
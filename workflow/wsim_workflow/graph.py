@@ -0,0 +1,178 @@
+# Copyright (c) 2026 ISciences, LLC.
+# All rights reserved.
+#
+# WSIM is licensed under the Apache License, Version 2.0 (the "License").
+# You may not use this file except in compliance with the License. You may
+# obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import collections
+
+from typing import Dict, Iterable, List, Optional, Set
+
+from .step import Step
+
+
+class WorkflowGraph:
+    """
+    Index of the dependency graph formed by a list of steps.
+
+    The index is built once, in time proportional to the total number of
+    targets and dependencies, and can then be used to check the workflow
+    for duplicate targets, unbuildable steps and cycles, and to compute the
+    depth of each step. All traversals are iterative, so long serial chains
+    (such as the monthly sequence of LSM states) do not exhaust the Python
+    recursion limit.
+    """
+
+    def __init__(self, steps: Iterable[Step]):
+        self.steps = list(steps)
+
+        self.producer = {}  # type: Dict[str, int]
+        duplicates = set()
+
+        for i, step in enumerate(self.steps):
+            for t in step.targets:
+                if t in self.producer:
+                    duplicates.add(t)
+                self.producer[t] = i
+
+        self.duplicates = sorted(duplicates)
+
+        # For each step, the steps that produce its dependencies, and the
+        # dependencies that no step produces.
+        self.upstream = [set() for _ in self.steps]  # type: List[Set[int]]
+        self.missing = {}  # type: Dict[int, List[str]]
+
+        # For each step, the steps that depend on it
+        self.downstream = [[] for _ in self.steps]  # type: List[List[int]]
+
+        for i, step in enumerate(self.steps):
+            for d in step.dependencies:
+                j = self.producer.get(d)
+                if j is None:
+                    self.missing.setdefault(i, []).append(d)
+                elif j != i:
+                    self.upstream[i].add(j)
+
+            for j in self.upstream[i]:
+                self.downstream[j].append(i)
+
+        self._order = None  # type: Optional[List[int]]
+        self._depth = None  # type: Optional[List[float]]
+
+    def __len__(self) -> int:
+        return len(self.steps)
+
+    def required(self, targets: Iterable[str]) -> List[Step]:
+        """
+        Return the steps needed to build the specified targets: the steps that
+        produce them, and (transitively) the steps that produce their
+        dependencies. Steps are returned in their original order.
+
+        A ValueError is raised if no step produces one of the targets.
+        """
+        stack = []
+        for t in targets:
+            if t not in self.producer:
+                raise ValueError('No step produces target {}'.format(t))
+            stack.append(self.producer[t])
+
+        selected = set()  # type: Set[int]
+        while stack:
+            i = stack.pop()
+            if i in selected:
+                continue
+            selected.add(i)
+            stack.extend(j for j in self.upstream[i] if j not in selected)
+
+        return [self.steps[i] for i in sorted(selected)]
+
+    def topological_order(self) -> List[int]:
+        """
+        Return the indices of all steps that are not part of (or downstream of)
+        a dependency cycle, ordered so that each step appears after the steps
+        that produce its dependencies.
+        """
+        if self._order is None:
+            remaining = [len(up) for up in self.upstream]
+            ready = collections.deque(i for i, n in enumerate(remaining) if n == 0)
+            order = []
+
+            while ready:
+                i = ready.popleft()
+                order.append(i)
+                for j in self.downstream[i]:
+                    remaining[j] -= 1
+                    if remaining[j] == 0:
+                        ready.append(j)
+
+            self._order = order
+
+        return self._order
+
+    def cyclic_steps(self) -> List[Step]:
+        """
+        Return steps that are part of, or depend on, a dependency cycle
+        """
+        ordered = set(self.topological_order())
+        return [step for i, step in enumerate(self.steps) if i not in ordered]
+
+    def depths(self) -> List[float]:
+        """
+        Return the depth of each step, defined as zero for a step with no
+        dependencies and otherwise one greater than the maximum depth of the
+        steps producing its dependencies. Steps that depend on a file that no
+        step produces, or that are part of a cycle, have infinite depth.
+        """
+        if self._depth is None:
+            depth = [float('inf')] * len(self.steps)
+
+            for i in self.topological_order():
+                if i in self.missing:
+                    continue
+                if not self.steps[i].dependencies:
+                    depth[i] = 0
+                else:
+                    depth[i] = 1 + max((depth[j] for j in self.upstream[i]), default=-1)
+
+            self._depth = depth
+
+        return self._depth
+
+    def max_depth(self) -> float:
+        return max(self.depths(), default=0)
+
+    def unbuildable(self) -> List[Step]:
+        """
+        Return steps that cannot be built, because they depend (directly or
+        indirectly) on a file that no step produces, or on a cycle.
+        """
+        return [step for step, d in zip(self.steps, self.depths()) if d == float('inf')]
+
+    def critical_path(self) -> List[Step]:
+        """
+        Return the longest chain of buildable steps, beginning with a step that
+        has no dependencies. Because every step in the chain must be run after
+        the previous one, the length of this chain is a lower bound on the
+        number of sequential rounds needed to complete the workflow.
+        """
+        depth = self.depths()
+        finite = [i for i, d in enumerate(depth) if d != float('inf')]
+
+        if not finite:
+            return []
+
+        i = max(finite, key=lambda k: depth[k])
+        path = [i]
+
+        while self.upstream[i]:
+            i = max(self.upstream[i], key=lambda k: depth[k])
+            path.append(i)
+
+        return [self.steps[k] for k in reversed(path)]
@@ -16,10 +16,12 @@ import datetime
 from typing import Dict, List, Optional
 
 from .actions import \
+    accumulate_ensemble_members, \
     composite_anomalies, \
     composite_indicator_adjusted, \
     composite_indicator_return_periods, \
     composite_indicators, \
+    composite_pipeline, \
     compute_return_periods, \
     correct_forecast, \
     create_forcing_file,\
@@ -27,14 +29,108 @@ from .actions import \
     result_summary, \
     return_period_summary, \
     run_lsm,\
+    stack_members, \
     standard_anomaly_summary, \
-    time_integrate
+    time_integrate, \
+    time_integrate_windows
+from .commands import wsim_batch
+from .coverage import coverage_grid
 from .polygon_summaries import compute_population_summary
 from .config_base import ConfigBase as Config
 from .dates import get_lead_months
 from .step import Step
 
 
+def time_integrate_all(config: Config,
+                       *,
+                       yearmon: str,
+                       model: Optional[str] = None,
+                       member: Optional[str] = None,
+                       target: Optional[str] = None) -> List[Step]:
+    """
+    Integrate LSM results and forcing over each integration window, using
+    the integration method specified by the configuration
+    """
+    windows = config.integration_windows()
+    args = dict(yearmon=yearmon, model=model, member=member, target=target)
+
+    if config.integration_method == 'single_pass' and windows:
+        return [
+            wsim_batch([
+                time_integrate_windows(config.workspace(), config.lsm_integrated_stats(), forcing=False, windows=windows, **args),
+                time_integrate_windows(config.workspace(), config.forcing_integrated_stats(), forcing=True, windows=windows, **args),
+            ], comment='Time-integrate results and forcing over {} month windows'.format(','.join(str(w) for w in windows)))
+        ]
+
+    derive_from = windows if config.integration_method == 'derived' else None
+
+    steps = []
+    for window in windows:
+        steps += time_integrate(config.workspace(), config.lsm_integrated_stats(), forcing=False, window=window, derive_from=derive_from, **args)
+        steps += time_integrate(config.workspace(), config.forcing_integrated_stats(), forcing=True, window=window, derive_from=derive_from, **args)
+
+    return steps
+
+
+def forecast_return_periods(config: Config,
+                            *,
+                            yearmon: str,
+                            target: str,
+                            model: str,
+                            members: List[Optional[str]]) -> List[Step]:
+    """
+    Compute return periods and standardized anomalies for each forecast
+    ensemble member and integration window. A member of None refers to the
+    results of all members, stacked in a single file.
+
+    Depending on the return period batching of the configuration, the
+    computations for all members using a given window (members), or for all
+    members and windows (all), are run in a single process, so that the
+    distribution fits for each window are only read once.
+    """
+    by_window = []
+
+    for window in [1] + config.integration_windows():
+        by_window.append([
+            step
+            for member in members
+            for step in compute_return_periods(config.workspace(),
+                forcing_vars=config.forcing_rp_vars() if window==1 else config.forcing_integrated_var_names(),
+                result_vars=config.lsm_rp_vars() if window==1 else config.lsm_integrated_var_names(),
+                state_vars=config.state_rp_vars() if window==1 else None,
+                yearmon=yearmon,
+                window=window,
+                model=model,
+                target=target,
+                member=member)
+        ])
+
+    if config.return_period_batching == 'members':
+        groups = by_window
+    elif config.return_period_batching == 'all':
+        groups = [[step for window_steps in by_window for step in window_steps]]
+    else:
+        return [step for window_steps in by_window for step in window_steps]
+
+    return [
+        wsim_batch(group, comment='Compute return periods for {} jobs'.format(len(group))) if len(group) > 1 else group[0]
+        for group in groups
+    ]
+
+
+def require_composites(meta_steps: Dict[str, Step], steps: List[Step], *, window: int) -> None:
+    """
+    Make the meta-steps for composites and population summaries depend on
+    steps that produce all of them.
+    """
+    for name in ('all_composites', 'all_adjusted_composites', 'population_summaries'):
+        meta_steps[name].require(steps)
+
+    if window == 1:
+        meta_steps['all_monthly_composites'].require(steps)
+        meta_steps['all_adjusted_monthly_composites'].require(steps)
+
+
 def monthly_observed(config: Config, yearmon: str, meta_steps: Dict[str, Step]) -> List[Step]:
     print('Generating steps for', yearmon, config.observed_data().name(), 'observed data')
 
@@ -55,9 +151,7 @@ def monthly_observed(config: Config, yearmon: str, meta_steps: Dict[str, Step])
         steps += config.result_postprocess_steps(yearmon=yearmon)
 
         # Do time integration
-        for window in config.integration_windows():
-            steps += time_integrate(config.workspace(), config.lsm_integrated_stats(), forcing = False, yearmon=yearmon, window=window)
-            steps += time_integrate(config.workspace(), config.forcing_integrated_stats(), forcing = True, yearmon=yearmon, window=window)
+        steps += time_integrate_all(config, yearmon=yearmon)
 
         # Compute return periods
         for window in [1] + config.integration_windows():
@@ -74,6 +168,17 @@ def monthly_observed(config: Config, yearmon: str, meta_steps: Dict[str, Step])
 
         # Don't write composite steps for a window that extends back too early.
         if yearmon >= config.historical_yearmons()[window-1]:
+            if config.fused_composites:
+                # Composite anomalies for the historical period are computed
+                # along with their fits, and only read here.
+                fused_steps = composite_pipeline(config.workspace(), config.static_data(), yearmon=yearmon, window=window,
+                                                 mask=config.land_mask(),
+                                                 compute_anomalies=yearmon not in config.historical_yearmons(),
+                                                 coverage_grid=coverage_grid(config))
+                steps += fused_steps
+                require_composites(meta_steps, fused_steps, window=window)
+                continue
+
             composite_indicator_steps = composite_indicators(config.workspace(), window=window, yearmon=yearmon, mask=config.land_mask())
             steps += composite_indicator_steps
 
@@ -97,7 +202,8 @@ def monthly_observed(config: Config, yearmon: str, meta_steps: Dict[str, Step])
             if window == 1:
                 meta_steps['all_adjusted_monthly_composites'].require(adjusted_indicator_steps)
 
-            pop_summary_steps = compute_population_summary(config.workspace(), config.static_data(), yearmon=yearmon, window=window)
+            pop_summary_steps = compute_population_summary(config.workspace(), config.static_data(), yearmon=yearmon, window=window,
+                                                           coverage_grid=coverage_grid(config))
             steps += pop_summary_steps
             meta_steps['population_summaries'].require(pop_summary_steps)
 
@@ -129,6 +235,15 @@ def monthly_forecast(config: Config,
                     total-available,
                     (datetime.datetime.utcnow() - datetime.timedelta(hours=forecast_lag_hours)).strftime('%Y%m%d%H')))
 
+        if config.batch_downloads and config.should_run_lsm(yearmon):
+            # Prepare the datasets for all targets and members at once, so that
+            # their files can be downloaded together
+            steps += meta_steps['prepare_forecasts'].require(
+                config.forecast_data(model).ensemble_prep_steps(
+                    yearmon=yearmon,
+                    targets=config.forecast_targets(yearmon),
+                    members=config.forecast_ensemble_members(model, yearmon, lag_hours=forecast_lag_hours)))
+
     for target in config.forecast_targets(yearmon):
         lead_months = get_lead_months(yearmon, target)
 
@@ -137,8 +252,9 @@ def monthly_forecast(config: Config,
             for member in config.forecast_ensemble_members(model, yearmon, lag_hours=forecast_lag_hours):
                 if config.should_run_lsm(yearmon):
                     # Prepare the dataset for use (convert from GRIB to netCDF, etc.)
-                    steps += meta_steps['prepare_forecasts'].require(
-                        config.forecast_data(model).prep_steps(yearmon=yearmon, target=target, member=member))
+                    if not config.batch_downloads:
+                        steps += meta_steps['prepare_forecasts'].require(
+                            config.forecast_data(model).prep_steps(yearmon=yearmon, target=target, member=member))
 
                     # Bias-correct the forecast
                     steps += meta_steps['prepare_forecasts'].require(
@@ -149,7 +265,9 @@ def monthly_forecast(config: Config,
                         create_forcing_file(config.workspace(), config.forecast_data(model),
                                             yearmon=yearmon, target=target, model=model, member=member))
 
-            for member in config.forecast_ensemble_members(model, yearmon):
+            members = config.forecast_ensemble_members(model, yearmon)
+
+            for member in members:
                 if config.should_run_lsm(yearmon):
                     # Run LSM with forecast data
                     steps += run_lsm(config.workspace(), config.static_data(),
@@ -157,23 +275,20 @@ def monthly_forecast(config: Config,
 
                 steps += config.result_postprocess_steps(yearmon=yearmon, target=target, model=model, member=member)
 
-                for window in config.integration_windows():
+                if not config.stack_members:
                     # Time integrate the results
-                    steps += time_integrate(config.workspace(), config.lsm_integrated_stats(), forcing=False, yearmon=yearmon, window=window, model=model, member=member, target=target)
-                    steps += time_integrate(config.workspace(), config.forcing_integrated_stats(), forcing=True, yearmon=yearmon, window=window, model=model, member=member, target=target)
-
-                # Compute return periods
-                for window in [1] + config.integration_windows():
-                    steps += meta_steps['return_periods'].require(
-                            compute_return_periods(config.workspace(),
-                                forcing_vars=config.forcing_rp_vars() if window==1 else config.forcing_integrated_var_names(),
-                                result_vars=config.lsm_rp_vars() if window==1 else config.lsm_integrated_var_names(),
-                                state_vars=config.state_rp_vars() if window==1 else None,
-                                yearmon=yearmon,
-                                window=window,
-                                model=model,
-                                target=target,
-                                member=member))
+                    steps += time_integrate_all(config, yearmon=yearmon, model=model, member=member, target=target)
+
+            if config.stack_members:
+                # Integrate and compute return periods for all members at once
+                steps += stack_members(config.workspace(), yearmon=yearmon, target=target, model=model, members=members,
+                                       state=bool(config.state_rp_vars()))
+                steps += time_integrate_all(config, yearmon=yearmon, model=model, target=target)
+
+            # Compute return periods
+            steps += meta_steps['return_periods'].require(
+                forecast_return_periods(config, yearmon=yearmon, target=target, model=model,
+                                        members=[None] if config.stack_members else members))
 
         del model
 
@@ -182,6 +297,10 @@ def monthly_forecast(config: Config,
 
             # TODO add individual model summaries
 
+            if config.incremental_summaries and not config.stack_members:
+                # Collect members as they finish, so that summaries need only wait for the last
+                steps += accumulate_ensemble_members(config, yearmon=yearmon, target=target, window=window)
+
             steps += meta_steps['results_summaries'].require(
                 result_summary(config, yearmon=yearmon, target=target, window=window))
             steps += meta_steps['forcing_summaries'].require(
@@ -191,6 +310,15 @@ def monthly_forecast(config: Config,
             steps += meta_steps['return_periods'].require(
                     standard_anomaly_summary(config, yearmon=yearmon, target=target, window=window))
 
+            if config.fused_composites:
+                fused_steps = composite_pipeline(config.workspace(), config.static_data(),
+                                                 yearmon=yearmon, window=window, target=target, quantile=50,
+                                                 mask=config.land_mask(),
+                                                 coverage_grid=coverage_grid(config))
+                steps += fused_steps
+                require_composites(meta_steps, fused_steps, window=window)
+                continue
+
             # Generate composite indicators from summarized ensemble data
             steps += composite_anomalies(config.workspace(),
                                          window=window, yearmon=yearmon, target=target, quantile=50,
@@ -215,7 +343,8 @@ def monthly_forecast(config: Config,
             if window == 1:
                 meta_steps['all_adjusted_monthly_composites'].require(adjusted_indicator_steps)
 
-            pop_summary_steps = compute_population_summary(config.workspace(), config.static_data(), yearmon=yearmon, window=window, target=target)
+            pop_summary_steps = compute_population_summary(config.workspace(), config.static_data(), yearmon=yearmon, window=window, target=target,
+                                                           coverage_grid=coverage_grid(config))
             steps += pop_summary_steps
             meta_steps['population_summaries'].require(pop_summary_steps)
 
@@ -0,0 +1,549 @@
+# Copyright (c) 2026 ISciences, LLC.
+# All rights reserved.
+#
+# WSIM is licensed under the Apache License, Version 2.0 (the "License").
+# You may not use this file except in compliance with the License. You may
+# obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Output module that writes the workflow as a JSON-lines step graph, together with
+a native executor that runs the graph directly using a pool of worker processes.
+
+Because the graph is stored with one JSON object per step, it can be loaded in a
+few seconds even for workflows with hundreds of thousands of steps, and steps with
+multiple targets do not require the pattern-rule workaround used by the GNU Make
+output module.
+
+The executor follows the conventions of the generated Makefiles:
+
+- a step is run if any of its targets is missing, or (unless order-only
+  semantics are requested) if any of its dependencies is newer than its oldest
+  target
+- steps without commands (meta-steps and tags) are considered complete once
+  their dependencies are complete
+- targets of a failed or interrupted step are deleted, as with .DELETE_ON_ERROR
+- a journal of started and completed steps is kept next to the workflow file,
+  so that targets of steps that were running when the executor was killed
+  are removed before the workflow is resumed
+
+Usage:
+
+    python3 -m wsim_workflow.output.executor --workflow workflow.jsonl -j 8 all_composites
+"""
+
+import argparse
+import collections
+import concurrent.futures
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+from typing import Dict, IO, Iterable, List, Mapping, Optional, Set
+
+from .output_modules import creation_string, substitute_tokens
+from ..step import Step
+
+DEFAULT_FILENAME = 'workflow.jsonl'
+JOURNAL_SUFFIX = '.journal'
+
+
+def header() -> str:
+    return json.dumps({'comment': creation_string()})
+
+
+def write_step(step: Step,
+               keys: Optional[Mapping[str, str]] = None) -> str:
+    """
+    Output this Step as a single line of JSON
+
+    :param step: step to be written
+    :param keys: optional dictionary of substitutions to make throughout
+                 the command (e.g., { 'BINDIR' : '/wsim' }
+    :return:
+    """
+    if keys is None:
+        keys = {}
+
+    commands = []
+    if step.commands:
+        commands = [' '.join(substitute_tokens(command, keys))
+                    for command in step.get_mkdir_commands() + step.commands]
+
+    record = {
+        'targets': sorted(t.format_map(keys) for t in step.targets),
+        'dependencies': sorted(d.format_map(keys) for d in step.dependencies),
+        'commands': commands
+    }
+
+    if step.comment:
+        record['comment'] = step.comment
+
+    if step.cores > 1:
+        record['cores'] = step.cores
+
+    if step.memory:
+        record['memory'] = step.memory
+
+    return json.dumps(record)
+
+
+class Job:
+    """
+    Lightweight representation of a step loaded from a workflow file
+    """
+    __slots__ = ('targets', 'dependencies', 'commands', 'comment', 'cores', 'memory')
+
+    def __init__(self, *,
+                 targets: Iterable[str],
+                 dependencies: Iterable[str],
+                 commands: Iterable[str],
+                 comment: Optional[str] = None,
+                 cores: int = 1,
+                 memory: int = 0):
+        self.targets = tuple(targets)
+        self.dependencies = tuple(dependencies)
+        self.commands = tuple(commands)
+        self.comment = comment
+        self.cores = cores
+        self.memory = memory
+
+    def key(self) -> str:
+        """
+        Return an identifier for the job that is stable across executions
+        """
+        return hashlib.sha1('\0'.join(self.targets).encode('utf-8')).hexdigest()
+
+    def __str__(self) -> str:
+        return ' '.join(self.targets)
+
+
+def read_workflow(filename: str) -> List[Job]:
+    """
+    Read the jobs from a workflow file written by this module
+    """
+    jobs = []
+
+    with open(filename, 'r') as workflow:
+        for line in workflow:
+            line = line.strip()
+            if not line:
+                continue
+
+            record = json.loads(line)
+            if 'targets' not in record:
+                continue  # header
+
+            jobs.append(Job(targets=record['targets'],
+                            dependencies=record['dependencies'],
+                            commands=record['commands'],
+                            comment=record.get('comment'),
+                            cores=record.get('cores', 1),
+                            memory=record.get('memory', 0)))
+
+    return jobs
+
+
+def mtime(filename: str) -> Optional[float]:
+    try:
+        return os.stat(filename).st_mtime
+    except OSError:
+        return None
+
+
+class Executor:
+    """
+    Run a list of jobs in dependency order using a fixed number of worker processes.
+
+    If a number of cores is specified, jobs are only started while the cores
+    used by the running jobs, including those that use several, fit within it.
+    Similarly, if a memory budget is specified, jobs are only started while the
+    estimated memory use of the running jobs (see wsim_workflow.resources) fits
+    within it. A job exceeding either budget by itself is run once no other jobs
+    are running.
+    """
+
+    def __init__(self,
+                 jobs: List[Job],
+                 *,
+                 n_jobs: int = 1,
+                 n_cores: Optional[int] = None,
+                 memory: Optional[int] = None,
+                 check_mtimes: bool = True,
+                 keep_going: bool = False,
+                 dry_run: bool = False,
+                 journal: Optional[str] = None,
+                 shell: str = '/bin/bash',
+                 log: IO = sys.stdout):
+        self.jobs = jobs
+        self.n_jobs = max(1, n_jobs)
+        self.n_cores = max(1, n_cores) if n_cores else None
+        self.memory = memory or None
+        self.check_mtimes = check_mtimes
+        self.keep_going = keep_going
+        self.dry_run = dry_run
+        self.journal = journal
+        self.shell = shell
+        self.log = log
+
+        self.producer = {}  # type: Dict[str, int]
+        for i, job in enumerate(jobs):
+            for t in job.targets:
+                self.producer[t] = i
+
+        self._lock = threading.Lock()
+        self._processes = {}  # type: Dict[int, subprocess.Popen]
+        self._journal_handle = None
+        self._interrupted = False
+
+    def required_jobs(self, targets: Optional[Iterable[str]] = None) -> List[int]:
+        """
+        Return the indices of jobs needed to build the specified targets, or all
+        jobs if no targets are specified.
+        """
+        if targets is None:
+            return list(range(len(self.jobs)))
+
+        selected = set()  # type: Set[int]
+        stack = []
+        for t in targets:
+            if t in self.producer:
+                stack.append(self.producer[t])
+            elif mtime(t) is None:
+                raise ValueError('No rule to make target {}'.format(t))
+
+        while stack:
+            i = stack.pop()
+            if i in selected:
+                continue
+            selected.add(i)
+            for d in self.jobs[i].dependencies:
+                j = self.producer.get(d)
+                if j is not None and j not in selected:
+                    stack.append(j)
+
+        return sorted(selected)
+
+    def cores_needed(self, job: Job) -> int:
+        """
+        Return the number of cores reserved for a job while it runs. A job
+        using more cores than are available reserves all of them.
+        """
+        if self.n_cores is None:
+            return 1
+        return min(job.cores, self.n_cores)
+
+    def can_start(self, job: Job, cores_used: int, memory_used: int) -> bool:
+        """
+        Return True if a job can be started alongside running jobs that are
+        using the specified number of cores and amount of memory.
+        """
+        if self.n_cores and cores_used + self.cores_needed(job) > self.n_cores:
+            return False
+        if self.memory and memory_used + job.memory > self.memory:
+            return False
+        return True
+
+    def is_outdated(self, job: Job) -> bool:
+        if not job.targets:
+            return True
+
+        target_times = [mtime(t) for t in job.targets]
+        if any(t is None for t in target_times):
+            return True
+
+        if not self.check_mtimes:
+            return False
+
+        oldest_target = min(target_times)
+        for d in job.dependencies:
+            dep_time = mtime(d)
+            if dep_time is not None and dep_time > oldest_target:
+                return True
+
+        return False
+
+    def recover(self) -> None:
+        """
+        Remove targets of any job that was started, but not completed, in
+        a previous execution that was not able to clean up after itself.
+        """
+        if not self.journal or not os.path.exists(self.journal):
+            return
+
+        started = set()
+        with open(self.journal, 'r') as journal:
+            for line in journal:
+                status, _, key = line.strip().partition(' ')
+                if status == 'start':
+                    started.add(key)
+                elif status == 'done':
+                    started.discard(key)
+
+        if started:
+            for job in self.jobs:
+                if job.key() in started:
+                    self._log('Removing targets of incomplete step: {}'.format(job))
+                    self.delete_targets(job, since=None)
+
+        os.remove(self.journal)
+
+    def delete_targets(self, job: Job, since: Optional[float]) -> None:
+        for t in job.targets:
+            t_mtime = mtime(t)
+            if t_mtime is not None and (since is None or t_mtime >= since) and not os.path.isdir(t):
+                self._log('Deleting file {}'.format(t))
+                os.remove(t)
+
+    def _log(self, message: str) -> None:
+        with self._lock:
+            self.log.write(message + '\n')
+            self.log.flush()
+
+    def _record(self, status: str, job: Job) -> None:
+        if self._journal_handle:
+            with self._lock:
+                self._journal_handle.write('{} {}\n'.format(status, job.key()))
+                self._journal_handle.flush()
+
+    def _execute(self, i: int) -> bool:
+        job = self.jobs[i]
+        start = time.time()
+
+        self._record('start', job)
+
+        for command in job.commands:
+            self._log(command)
+            if self.dry_run:
+                continue
+
+            with self._lock:
+                if self._interrupted:
+                    break
+                process = subprocess.Popen([self.shell, '-c', command])
+                self._processes[i] = process
+
+            return_code = process.wait()
+
+            with self._lock:
+                del self._processes[i]
+
+            if return_code != 0:
+                self._log('Step failed with exit status {}: {}'.format(return_code, job))
+                self.delete_targets(job, since=start)
+                self._record('done', job)
+                return False
+
+        if self._interrupted:
+            self.delete_targets(job, since=start)
+            self._record('done', job)
+            return False
+
+        self._record('done', job)
+        return True
+
+    def run(self, targets: Optional[Iterable[str]] = None) -> bool:
+        """
+        Build the specified targets (or all targets) and return True if all
+        required jobs completed successfully.
+        """
+        if not self.dry_run:
+            self.recover()
+
+        selected = self.required_jobs(targets)
+        selected_set = set(selected)
+
+        waiting_on = {}  # type: Dict[int, Set[int]]
+        dependents = collections.defaultdict(list)  # type: Dict[int, List[int]]
+        failed = set()  # type: Set[int]
+
+        for i in selected:
+            upstream = set()
+            for d in self.jobs[i].dependencies:
+                j = self.producer.get(d)
+                if j is None:
+                    if mtime(d) is None:
+                        self._log('No rule to make target {}, needed by {}'.format(d, self.jobs[i]))
+                        failed.add(i)
+                elif j != i and j in selected_set:
+                    upstream.add(j)
+            waiting_on[i] = upstream
+            for j in upstream:
+                dependents[j].append(i)
+
+        ready = collections.deque(i for i in selected if not waiting_on[i] and i not in failed)
+        blocked = collections.deque(failed)
+        n_done = 0
+        n_run = 0
+
+        if self.journal and not self.dry_run:
+            self._journal_handle = open(self.journal, 'a')
+
+        def finish(i: int, success: bool) -> None:
+            if not success:
+                failed.add(i)
+                blocked.append(i)
+                return
+            for k in dependents[i]:
+                waiting_on[k].discard(i)
+                if not waiting_on[k] and k not in failed:
+                    ready.append(k)
+
+        running = {}  # type: Dict[concurrent.futures.Future, int]
+        cores_used = 0
+        memory_used = 0
+        pool = concurrent.futures.ThreadPoolExecutor(max_workers=self.n_jobs)
+
+        try:
+            while ready or running or blocked:
+                # Propagate failures to downstream jobs
+                while blocked:
+                    for k in dependents[blocked.popleft()]:
+                        if k not in failed:
+                            failed.add(k)
+                            blocked.append(k)
+
+                if failed and not self.keep_going:
+                    ready.clear()
+
+                # Start as many jobs as we can, completing up-to-date jobs inline
+                while ready and len(running) < self.n_jobs:
+                    i = ready.popleft()
+                    if i in failed:
+                        continue
+                    job = self.jobs[i]
+                    if not job.commands or not self.is_outdated(job):
+                        n_done += 1
+                        finish(i, True)
+                    elif running and not self.can_start(job, cores_used, memory_used):
+                        # Wait for running jobs to free enough cores or memory
+                        ready.appendleft(i)
+                        break
+                    else:
+                        n_run += 1
+                        cores_used += self.cores_needed(job)
+                        memory_used += job.memory
+                        running[pool.submit(self._execute, i)] = i
+
+                if not running:
+                    continue
+
+                completed, _ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in completed:
+                    i = running.pop(future)
+                    cores_used -= self.cores_needed(self.jobs[i])
+                    memory_used -= self.jobs[i].memory
+                    n_done += 1
+                    finish(i, future.result())
+        except KeyboardInterrupt:
+            with self._lock:
+                self._interrupted = True
+                for process in self._processes.values():
+                    process.terminate()
+            self._log('Interrupted; waiting for running steps to terminate')
+            concurrent.futures.wait(running)
+            raise
+        finally:
+            pool.shutdown(wait=True)
+            if self._journal_handle:
+                self._journal_handle.close()
+                self._journal_handle = None
+                os.remove(self.journal)
+
+        if not failed and n_done < len(selected):
+            self._log('Circular dependency among {} steps'.format(len(selected) - n_done))
+            return False
+
+        if failed:
+            self._log('{} steps could not be completed'.format(len(failed)))
+        elif n_run == 0:
+            self._log('Nothing to be done')
+
+        return not failed
+
+
+def parse_memory(txt: str) -> int:
+    """
+    Parse an amount of memory such as 64G or 512M into a number of bytes
+    """
+    value = txt.strip().upper().rstrip('B')
+    units = 'KMGT'
+
+    try:
+        if value and value[-1] in units:
+            return int(float(value[:-1]) * 1024 ** (units.index(value[-1]) + 1))
+        return int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError('Invalid amount of memory: {}'.format(txt))
+
+
+def parse_args(args):
+    parser = argparse.ArgumentParser('Execute a WSIM workflow generated with the executor output module')
+
+    parser.add_argument('--workflow',
+                        help='Workflow file generated by makemake.py',
+                        default=DEFAULT_FILENAME)
+    parser.add_argument('-j', '--jobs',
+                        help='Number of steps to run in parallel',
+                        type=int,
+                        default=1)
+    parser.add_argument('--cores',
+                        help='Number of CPU cores shared by running steps, counting each step that uses several '
+                             'cores (see makemake.py --cores-per-step) as that many (default: no limit '
+                             'other than --jobs)',
+                        type=int)
+    parser.add_argument('--memory',
+                        help='Memory shared by running steps, in bytes or with a suffix of K, M, G or T '
+                             '(e.g., 64G), using the estimates from makemake.py --estimate-memory '
+                             '(default: no limit)',
+                        type=parse_memory)
+    parser.add_argument('-k', '--keep-going',
+                        help='Continue running independent steps after a step fails',
+                        action='store_true')
+    parser.add_argument('-n', '--dry-run',
+                        help='Print the commands that would be run, without running them',
+                        action='store_true')
+    parser.add_argument('--order-only',
+                        help='Do not rebuild targets whose dependencies are newer than the targets',
+                        action='store_true')
+    parser.add_argument('targets',
+                        help='Targets to build (default: all)',
+                        nargs='*')
+
+    return parser.parse_args(args)
+
+
+def main(raw_args):
+    args = parse_args(raw_args)
+
+    jobs = read_workflow(args.workflow)
+
+    executor = Executor(jobs,
+                        n_jobs=args.jobs,
+                        n_cores=args.cores,
+                        memory=args.memory,
+                        check_mtimes=not args.order_only,
+                        keep_going=args.keep_going,
+                        dry_run=args.dry_run,
+                        journal=args.workflow + JOURNAL_SUFFIX)
+
+    try:
+        success = executor.run(args.targets or None)
+    except ValueError as e:
+        sys.exit(str(e))
+
+    if not success:
+        sys.exit(2)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -84,6 +84,14 @@ def header() -> str:
     ]) + 2*'\n'
 
 
+def write_default_goal(target: str) -> str:
+    """
+    Make target the goal built when make is run without a target, instead
+    of the target of the first rule
+    """
+    return '.DEFAULT_GOAL := {}\n'.format(target)
+
+
 def write_step(step: Step,
                keys: Optional[Mapping[str, str]] = None,
                use_order_only_rules: Optional[bool] = True) -> str:
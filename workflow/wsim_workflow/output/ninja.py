@@ -0,0 +1,110 @@
+# Copyright (c) 2026 ISciences, LLC.
+# All rights reserved.
+#
+# WSIM is licensed under the Apache License, Version 2.0 (the "License").
+# You may not use this file except in compliance with the License. You may
+# obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import io
+
+from typing import List, Mapping, Optional
+
+from .output_modules import creation_string, substitute_tokens
+
+from ..step import Step
+
+DEFAULT_FILENAME = 'build.ninja'
+
+
+def escape_path(filename: str) -> str:
+    """
+    Escape characters that have a special meaning in the path lists of a Ninja build statement
+    """
+    return filename.replace('$', '$$').replace(' ', '$ ').replace(':', '$:')
+
+
+def escape_value(value: str) -> str:
+    """
+    Escape characters that have a special meaning in a Ninja variable value
+    """
+    return value.replace('$', '$$')
+
+
+def path_string(filenames: List[str], keys: Mapping[str, str]) -> str:
+    return ' '.join(escape_path(f.format_map(keys)) for f in sorted(filenames))
+
+
+def dependency_separator(use_order_only_rules: bool) -> str:
+    if use_order_only_rules:
+        return ' || '
+    else:
+        return ' '
+
+
+def header() -> str:
+    return '\n'.join([
+        '# ' + creation_string(),
+        '',
+        'ninja_required_version = 1.3',
+        '',
+        'rule run',
+        '  command = $cmd',
+        '  description = $desc',
+    ]) + 2*'\n'
+
+
+def write_step(step: Step,
+               keys: Optional[Mapping[str, str]] = None,
+               use_order_only_rules: Optional[bool] = True) -> str:
+    """
+    Output this Step as a Ninja build statement. Unlike GNU Make, Ninja
+    natively supports build statements with multiple outputs, so no
+    pattern-rule conversion is necessary.
+
+    :param step:                  step to be written
+    :param keys:                  optional dictionary of substitutions to make throughout
+                                  the command (e.g., { 'BINDIR' : '/wsim' }
+    :param use_order_only_rules:  if true, instructs ninja not to rebuild targets when the
+                                  timestamp of dependencies is newer than targets
+    :return:
+    """
+    if keys is None:
+        keys = {}
+
+    if not step.targets:
+        return ''
+
+    buff = io.StringIO()
+
+    if step.comment:
+        buff.write('# ' + step.comment + '\n')
+
+    buff.write('build ')
+    buff.write(path_string(step.targets, keys))
+
+    if step.commands:
+        buff.write(': run')
+        if step.dependencies:
+            buff.write(dependency_separator(use_order_only_rules))
+            buff.write(path_string(step.dependencies, keys))
+        buff.write('\n')
+
+        commands = [' '.join(substitute_tokens(command, keys))
+                    for command in step.get_mkdir_commands() + step.commands]
+
+        buff.write('  cmd = ' + escape_value(' && '.join(commands)) + '\n')
+        buff.write('  desc = ' + escape_value(step.comment or ' '.join(sorted(step.targets)).format_map(keys)) + '\n')
+    else:
+        # Steps without commands (meta-steps, tag files) are aliases for their dependencies
+        buff.write(': phony')
+        if step.dependencies:
+            buff.write(' ' + path_string(step.dependencies, keys))
+        buff.write('\n')
+
+    return buff.getvalue()
@@ -24,6 +24,14 @@ def header() -> str:
     return ""
 
 
+def write_default_goal(target: str) -> str:
+    """
+    Write a leading rule requiring target, so that it is built when
+    snakemake is run without a target
+    """
+    return 'rule all:\n    input: ["{}"]\n'.format(target)
+
+
 def write_step(step: Step, keys: Optional[Mapping[str, str]] = None) -> str:
 
     if keys is None:
@@ -37,6 +45,8 @@ def write_step(step: Step, keys: Optional[Mapping[str, str]] = None) -> str:
     buff.write('rule:\n')
     buff.write('    input: [' + ', '.join('"' + d.format_map(keys) + '"' for d in deps) + ']\n')
     buff.write('    output: [' + ','.join('"' + t.format_map(keys) + '"' for t in targets) + ']\n')
+    if step.cores > 1:
+        buff.write('    threads: {}\n'.format(step.cores))
     buff.write('    shell:\n')
     buff.write('        """\n')
 
@@ -155,6 +155,11 @@ class ObservedForcing(metaclass=ABCMeta):
 
 class ForecastForcing(metaclass=ABCMeta):
 
+    # If True, the files for many forecasts (such as all members of an
+    # ensemble, or a set of hindcasts) are downloaded by a single step,
+    # where the dataset supports it.
+    batch_downloads = False
+
     @abstractmethod
     def name(self) -> str:
         """
@@ -219,6 +224,14 @@ class ForecastForcing(metaclass=ABCMeta):
         """
         return []
 
+    def ensemble_prep_steps(self, *, yearmon: str, targets: List[str], members: List[str]) -> List[step.Step]:
+        """
+        Returns the Steps needed to prepare this dataset for use for all
+        target months and ensemble members of a given yearmon
+        """
+        return [s for target in targets for member in members
+                for s in self.prep_steps(yearmon=yearmon, target=target, member=member)]
+
     @staticmethod
     def requires_bias_correction() -> bool:
         return True
@@ -273,6 +286,9 @@ class ElectricityStatic(metaclass=ABCMeta):
     def basin_downstream(self) -> Vardef:
         pass
 
+    def basin_flow_order(self) -> str:
+        pass
+
     def water_stress(self) -> Vardef:
         pass
 
@@ -346,13 +362,15 @@ class DefaultWorkspace:
                   method: Optional[Method]=None) -> str:
 
         assert (year is None) != (yearmon is None)
-        assert (member is None) == (model is None)
+        # A model without a member refers to a file in which the outputs
+        # of all members are stacked along a "member" dimension
+        assert member is None or model is not None
 
         if target:
-            assert (summary and member is None) or (not summary and member is not None)
+            assert (summary and model is None) or (not summary and model is not None)
         elif sector != Sector.AGRICULTURE:
             assert not summary
-            assert member is None
+            assert model is None
 
         if temporary:
             root = self.tempdir
@@ -445,7 +463,7 @@ class DefaultWorkspace:
                       summary: bool=False) -> str:
         filename = DefaultWorkspace.make_stem(thing, basis=basis, method=method, summary=summary)
 
-        assert (model is None) == (member is None)
+        assert member is None or model is not None
 
         if window:
             filename += '_{window}mo'
@@ -457,6 +475,8 @@ class DefaultWorkspace:
 
         if member:
             filename += '_fcst{model}_{member}'
+        elif model:
+            filename += '_fcst{model}'
 
         filename += suffix
 
@@ -528,6 +548,30 @@ class DefaultWorkspace:
     def results_summary(self, *, yearmon: str, window: int, target: Optional[str]=None) -> str:
         return self.make_path('results', yearmon=yearmon, window=window, target=target, summary=True)
 
+    def ensemble_members(self, thing: str, *, yearmon: str, window: int, target: str) -> str:
+        """
+        File in which the members of a forecast ensemble are stacked along a
+        "member" dimension, each written as soon as it is available
+        """
+        return self.make_path(thing, yearmon=yearmon, window=window, target=target, summary=True, temporary=True)
+
+    def ensemble_lock_dir(self, thing: str, *, yearmon: str, window: int, target: str) -> str:
+        """
+        Directory of the lock held while a member is written to the file
+        returned by ensemble_members
+        """
+        return self.ensemble_members(thing, yearmon=yearmon, window=window, target=target)[:-len('.nc')] + '_lock'
+
+    def ensemble_member_tag(self, thing: str, *, yearmon: str, window: int, target: str, model: str, member: str) -> str:
+        """
+        Tag file indicating that a member has been written to the file
+        returned by ensemble_members
+        """
+        return os.path.join(self.tempdir,
+                            'ensemble_members',
+                            self.make_filename(thing, time=yearmon, window=window, target=target,
+                                               model=model, member=member, suffix='.tag'))
+
     # Individual model inputs, outputs, and derivatives
     def state(self, *,
               sector: Optional[Sector]=None,
@@ -646,6 +690,13 @@ class DefaultWorkspace:
     def tag(self, name):
         return os.path.join(self.outputs, 'tags', name)
 
+    def coverage(self, *, basis: Basis, grid: Grid, weights: Optional[str] = None) -> str:
+        return os.path.join(self.outputs,
+                            'coverage',
+                            'coverage_{basis}_{grid}{weights}.nc'.format(basis=basis.value,
+                                                                         grid=grid.name,
+                                                                         weights='_' + weights if weights else ''))
+
     # Electricity assessment misc
     def basin_loss_factors(self, *, yearmon: str, model: Optional[str], target: Optional[str], member: Optional[str]) -> str:
         return self.make_path('loss_factors', sector=Sector.ELECTRIC_POWER, yearmon=yearmon, window=12, target=target, model=model, member=member, basis=Basis.BASIN)
@@ -14,10 +14,12 @@
 import os
 
 from .step import Step
+from .grids import Grid
 from .paths import Vardef, DefaultWorkspace, Static, Basis
 from .commands import q
+from .coverage import POPULATION
 
-from typing import List, Optional, Union
+from typing import Dict, List, Optional, Union
 
 
 def compute_population_summary(workspace: DefaultWorkspace,
@@ -25,25 +27,36 @@ def compute_population_summary(workspace: DefaultWorkspace,
                                *,
                                yearmon: str,
                                window: int,
-                               target: Optional[str] = None) -> List[Step]:
+                               target: Optional[str] = None,
+                               coverage_grid: Optional[Grid] = None) -> List[Step]:
+    """
+    Summarize the population exposed to composite anomalies in each country and
+    province. If coverage_grid is specified, the population-weighted coverage
+    precomputed for that grid is used instead of the population density.
+    """
 
     composite_fname = workspace.composite_summary_adjusted(yearmon=yearmon, target=target, window=window)
 
+    def weighting(basis: Basis) -> Dict[str, str]:
+        if coverage_grid:
+            return dict(coverage=workspace.coverage(basis=basis, grid=coverage_grid, weights=POPULATION))
+        return dict(weights=static.population_density().read_as(POPULATION))
+
     return [
         wsim_polygon_summary(
             polygons=static.countries().file,
             values=[Vardef(composite_fname, 'surplus'),
                     Vardef(composite_fname, 'deficit@negate').read_as('deficit')],
-            weights=static.population_density().read_as('population'),
             append_cols=['GID_0->country_iso', 'NAME_0->country_name'],
-            output=workspace.composite_summary_population(basis=Basis.COUNTRY, yearmon=yearmon, target=target, window=window)),
+            output=workspace.composite_summary_population(basis=Basis.COUNTRY, yearmon=yearmon, target=target, window=window),
+            **weighting(Basis.COUNTRY)),
         wsim_polygon_summary(
             polygons=static.provinces().file,
             values=[Vardef(composite_fname, 'surplus'),
                     Vardef(composite_fname, 'deficit@negate').read_as('deficit')],
-            weights=static.population_density().read_as('population'),
             append_cols=['GID_0->country_iso', 'NAME_0->country_name', 'NAME_1->province_name'],
-            output=workspace.composite_summary_population(basis=Basis.PROVINCE, yearmon=yearmon, target=target, window=window))
+            output=workspace.composite_summary_population(basis=Basis.PROVINCE, yearmon=yearmon, target=target, window=window),
+            **weighting(Basis.PROVINCE))
     ]
 
 
@@ -51,8 +64,11 @@ def wsim_polygon_summary(*,
                          polygons: str,
                          append_cols: List[str],
                          values: List[Union[Vardef, str]],
-                         weights: Union[Vardef, str],
+                         weights: Optional[Union[Vardef, str]] = None,
+                         coverage: Optional[str] = None,
                          output: str) -> Step:
+    assert (weights is None) != (coverage is None)
+
     cmd = [
         os.path.join('{BINDIR}', 'wsim_polygon_summary.R')
     ]
@@ -60,8 +76,12 @@ def wsim_polygon_summary(*,
     for v in values:
         cmd += ['--values', q(str(v))]
 
+    if coverage:
+        cmd += ['--coverage', q(coverage)]
+    else:
+        cmd += ['--weights', q(str(weights))]
+
     cmd += [
-        '--weights', q(str(weights)),
         '--polygons', polygons,
         '--append-cols', q(','.join(append_cols)),
         '--breaks', q('3,5,10,20,40'),
@@ -69,10 +89,10 @@ def wsim_polygon_summary(*,
     ]
 
     values = [x if type(x) is str else x.file for x in values]
-    weights = weights if type(weights) is str else weights.file
+    weights = weights if type(weights) is str or weights is None else weights.file
 
     return Step(
         targets=output,
-        dependencies=[polygons, weights] + values,
+        dependencies=[polygons, weights, coverage] + values,
         commands=[cmd]
     )
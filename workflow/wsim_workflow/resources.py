@@ -0,0 +1,204 @@
+# Copyright (c) 2026 ISciences, LLC.
+# All rights reserved.
+#
+# WSIM is licensed under the Apache License, Version 2.0 (the "License").
+# You may not use this file except in compliance with the License. You may
+# obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Estimates of the memory used by workflow steps.
+
+The memory used by most WSIM tools is dominated by the number of grids they
+hold in memory at once, which depends on the tool, the number of inputs and
+variables it reads, and the size of the model grid. Estimates are rough, but
+are sufficient for a scheduler to avoid running several memory-intensive
+steps (e.g., global LSM runs, long time integrations, fits over many years)
+at the same time.
+"""
+
+import os
+import re
+
+from typing import Callable, Dict, Iterable, List, Sequence
+
+from .cores import WRAPPER_SCRIPT
+from .dates import expand_filename_dates
+from .grids import Grid
+from .step import Step
+
+# Memory used by an R process after loading the WSIM packages
+BASE_MEMORY = 300 * 2**20
+
+# Variables assumed to be read from an input for which none are specified
+DEFAULT_VARS_PER_INPUT = 8
+
+# Arrays of the size of the model grid held by wsim_lsm.R: static data,
+# state, forcing, results and intermediate values
+LSM_GRIDS = 64
+
+# Arrays held by wsim_anom.R for each variable: observed values, distribution
+# parameters, and computed anomalies
+ANOM_GRIDS_PER_VAR = 6
+
+# Arrays held by wsim_composite.R for each input variable: the input values,
+# and the running extreme values and their causes
+COMPOSITE_GRIDS_PER_VAR = 3
+
+RE_VARS = re.compile(r'::(.*)$')
+
+
+def unquote(token: str) -> str:
+    return token.strip('"\'')
+
+
+def option_values(command: Sequence[str], option: str) -> List[str]:
+    return [unquote(command[i + 1]) for i, token in enumerate(command[:-1]) if token == option]
+
+
+def variables_read(arg: str) -> int:
+    """
+    Return the number of variables read from an input argument such as
+    results_[194801:201712].nc::Ws,Bt_RO
+    """
+    match = RE_VARS.search(arg)
+    if not match:
+        return DEFAULT_VARS_PER_INPUT
+    return len([v for v in match.group(1).split(',') if v])
+
+
+def files_read(arg: str) -> int:
+    return len(expand_filename_dates(arg.split('::')[0]))
+
+
+def grids_lsm(command: Sequence[str]) -> int:
+    return LSM_GRIDS
+
+
+def grids_fit(command: Sequence[str]) -> int:
+    inputs = option_values(command, '--input')
+    outputs = option_values(command, '--output')
+
+    if len(outputs) > 1:
+        # Each input is fit separately
+        observations = max((files_read(i) for i in inputs), default=0)
+    else:
+        observations = sum(files_read(i) for i in inputs)
+
+    # Observations, plus a copy made while fitting each cell
+    return 2 * observations
+
+
+def grids_integrate(command: Sequence[str]) -> int:
+    inputs = option_values(command, '--input')
+    n_vars = max((variables_read(i) for i in inputs), default=0)
+
+    n_inputs = sum(files_read(i) for i in inputs)
+
+    weights = option_values(command, '--weights')
+    if option_values(command, '--across') and weights:
+        # Each value of the dimension (e.g., each member of a stacked
+        # ensemble) is a separate observation, with one weight for each
+        n_inputs = max(n_inputs, len(weights[0].split(',')))
+
+    windows = option_values(command, '--window') + \
+        [w for ws in option_values(command, '--windows') for w in ws.split(',')]
+
+    if windows:
+        # Only the inputs within the longest window are held at once
+        n_inputs = min(n_inputs, max(int(w) for w in windows))
+
+    return n_inputs * n_vars
+
+
+def grids_anom(command: Sequence[str]) -> int:
+    # Observations with an extra dimension (e.g., stacked ensemble members)
+    # are read and written one slice at a time, so they hold no more grids
+    # than observations without one
+    n_vars = len(option_values(command, '--fits')) + len(option_values(command, '--obs'))
+    return ANOM_GRIDS_PER_VAR * max(n_vars, 1)
+
+
+def grids_composite(command: Sequence[str]) -> int:
+    inputs = option_values(command, '--surplus') + option_values(command, '--deficit')
+    return COMPOSITE_GRIDS_PER_VAR * sum(variables_read(i) for i in inputs)
+
+
+def grids_composite_pipeline(command: Sequence[str]) -> int:
+    inputs = option_values(command, '--surplus') + option_values(command, '--deficit') + \
+        option_values(command, '--anom_surplus') + option_values(command, '--anom_deficit')
+
+    # Composites of the inputs, plus the anomalies of the composite surplus
+    # and deficit, held until the adjusted composite is written
+    return COMPOSITE_GRIDS_PER_VAR * sum(variables_read(i) for i in inputs) + 2 * ANOM_GRIDS_PER_VAR
+
+
+def grids_merge(command: Sequence[str]) -> int:
+    return sum(files_read(i) * variables_read(i) for i in option_values(command, '--input'))
+
+
+GRIDS_HELD = {
+    'wsim_anom.R': grids_anom,
+    'wsim_composite.R': grids_composite,
+    'wsim_composite_pipeline.R': grids_composite_pipeline,
+    'wsim_fit.R': grids_fit,
+    'wsim_integrate.R': grids_integrate,
+    'wsim_lsm.R': grids_lsm,
+    'wsim_merge.R': grids_merge,
+}  # type: Dict[str, Callable[[Sequence[str]], int]]
+
+
+def split_batch(command: Sequence[str]) -> List[Sequence[str]]:
+    """
+    Split a command running wsim_batch.R into the commands for each job
+    """
+    jobs = [[]]  # type: List[List[str]]
+    for token in command[1:]:
+        if token == '--next':
+            jobs.append([])
+        else:
+            jobs[-1].append(token)
+
+    return [job for job in jobs if job]
+
+
+def command_memory(command: Sequence[str], grid: Grid) -> int:
+    """
+    Return the estimated peak memory use of a command, in bytes, or zero
+    for commands other than WSIM R tools.
+    """
+    if not command:
+        return 0
+
+    if command[0] == 'python3' and len(command) > 1 and command[1] == WRAPPER_SCRIPT:
+        # A command run once the cores it uses are free
+        return command_memory(command[list(command).index('--') + 1:], grid)
+
+    tool = os.path.basename(command[0])
+
+    if tool == 'wsim_batch.R':
+        # Jobs are run one after another
+        return max((command_memory(job, grid) for job in split_batch(command)), default=0)
+
+    if not tool.startswith('wsim_') or not tool.endswith('.R'):
+        return 0
+
+    estimate = GRIDS_HELD.get(tool)
+    grids = estimate(command) if estimate else 0
+
+    return BASE_MEMORY + grids * grid.nx * grid.ny * 8
+
+
+def estimate_memory(steps: Iterable[Step], grid: Grid) -> Iterable[Step]:
+    """
+    Set the estimated memory use of each step, which is the largest estimate
+    of any of its commands, since the commands of a step are run in sequence.
+    """
+    for step in steps:
+        step.memory = max((command_memory(command, grid) for command in step.commands), default=0)
+        yield step
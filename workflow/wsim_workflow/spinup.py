@@ -20,7 +20,7 @@ from .commands import *
 from .dates import format_yearmon, all_months, get_next_yearmon
 from .paths import read_vars, date_range, Basis
 
-from .actions import create_forcing_file, compute_return_periods, composite_anomalies, fit_var
+from .actions import create_forcing_file, compute_return_periods, composite_anomalies, fit_var, fit_var_all_months
 
 
 def spinup(config, meta_steps):
@@ -71,16 +71,14 @@ def spinup(config, meta_steps):
 
     # Compute monthly fits (and then anomalies) over the fit period
     for param in config.lsm_rp_vars() + config.forcing_rp_vars() + config.state_rp_vars():
-        for month in all_months:
-            steps += all_fits.require(fit_var(config, param=param, month=month))
+        steps += all_fits.require(fit_var_all_months(config, param=param))
 
     # Compute fits for time-integrated parameters
     for param in {**config.lsm_integrated_vars(), **config.forcing_integrated_vars()}.keys():
         for stat in {**config.lsm_integrated_vars(), **config.forcing_integrated_vars()}[param]:
             for window in config.integration_windows():
                 assert window > 1
-                for month in all_months:
-                    steps += all_fits.require(fit_var(config, param=param, stat=stat, month=month, window=window))
+                steps += all_fits.require(fit_var_all_months(config, param=param, stat=stat, window=window))
 
     # Steps for anomalies and composite anomalies
     for window in [1] + config.integration_windows():
@@ -175,6 +173,10 @@ def run_lsm_with_monthly_norms(config: Config, *, years: int) -> List[Step]:
     Run the LSM from the garbage initial state using monthly norm forcing
     for 100 years, discarding the results generated in the process.
     Store only the final state.
+
+    If the configuration specifies a tolerance, the run stops as soon as the
+    state has converged, and the number of years run is recorded in the
+    "iterations" attribute of the final state.
     """
     return [
         wsim_lsm(
@@ -185,7 +187,8 @@ def run_lsm_with_monthly_norms(config: Config, *, years: int) -> List[Step]:
             wc=config.static_data().wc(),
             results=None,
             next_state=config.workspace().final_state_norms(),
-            loop=years
+            loop=years,
+            tolerance=config.spinup_tolerance
         )
     ]
 
@@ -216,19 +219,26 @@ def run_lsm_from_final_norm_state(config: Config) -> List[Step]:
     # Making each iteration an individual target is in some ways cleaner and would
     # allow restarting in case of failure. But the runtime becomes dominated by the
     # R startup and I/O, and takes about 5 seconds / iteration instead of 1 second /iteration.
-    run_lsm = wsim_lsm(
-        forcing=[config.workspace().forcing(yearmon=date_range(config.historical_yearmons()), window=1)],
-        state=config.workspace().spinup_state(yearmon=initial_yearmon),
-        elevation=config.static_data().elevation(),
-        flowdir=config.static_data().flowdir(),
-        wc=config.static_data().wc(),
-        results=None,
-        next_state=config.workspace().spinup_state_pattern()
-    ).replace_targets_with_tag_file(config.workspace().tag('spinup_from_climate_norm_final_state'))
+    # Segments of several years (if configured) allow restarting without this cost.
+    segments = spinup_segments(config)
+
+    run_lsm = [
+        wsim_lsm(
+            forcing=[config.workspace().forcing(yearmon=date_range(segment), window=1)],
+            state=config.workspace().spinup_state(yearmon=segment[0]),
+            elevation=config.static_data().elevation(),
+            flowdir=config.static_data().flowdir(),
+            wc=config.static_data().wc(),
+            results=None,
+            next_state=config.workspace().spinup_state_pattern()
+        ) for segment in segments
+    ]
 
     return [
         make_initial_state,
-        run_lsm
+        *chain_segments(config, run_lsm,
+                        states=[config.workspace().spinup_state(yearmon=segment[0]) for segment in segments],
+                        tag='spinup_from_climate_norm_final_state')
     ]
 
 
@@ -254,8 +264,6 @@ def run_lsm_from_mean_spinup_state(config: Config) -> List[Step]:
     """
     first_timestep = config.historical_yearmons()[0]
     first_month = int(first_timestep[4:])
-    postprocess_steps = list(itertools.chain(*[config.result_postprocess_steps(yearmon=yearmon)
-                                               for yearmon in config.historical_yearmons()]))
     make_initial_state = Step(
         comment="Create initial state file",
         targets=config.workspace().state(yearmon=first_timestep),
@@ -271,31 +279,88 @@ def run_lsm_from_mean_spinup_state(config: Config) -> List[Step]:
         ]
     )
 
-    run_lsm = wsim_lsm(
-        comment="LSM run from mean spinup state",
-        forcing=[config.workspace().forcing(yearmon=date_range(config.historical_yearmons()), window=1)],
-        state=config.workspace().state(yearmon=first_timestep),
-        elevation=config.static_data().elevation(),
-        flowdir=config.static_data().flowdir(),
-        wc=config.static_data().wc(),
-        results=config.workspace().results(window=1, yearmon='%T'),
-        next_state=config.workspace().state(yearmon='%T')
-    ).merge(*itertools.chain(*postprocess_steps))
+    segments = spinup_segments(config)
+
+    run_lsm = [
+        wsim_lsm(
+            comment="LSM run from mean spinup state" + (
+                " ({} to {})".format(segment[0], segment[-1]) if len(segments) > 1 else ""),
+            forcing=[config.workspace().forcing(yearmon=date_range(segment), window=1)],
+            state=config.workspace().state(yearmon=segment[0]),
+            elevation=config.static_data().elevation(),
+            flowdir=config.static_data().flowdir(),
+            wc=config.static_data().wc(),
+            results=config.workspace().results(window=1, yearmon='%T'),
+            next_state=config.workspace().state(yearmon='%T')
+        ).merge(*itertools.chain(*[config.result_postprocess_steps(yearmon=yearmon) for yearmon in segment]))
+        for segment in segments
+    ]
 
     tag_steps = create_tag(name=config.workspace().tag('spinup_1mo_results'),
                            dependencies=[config.workspace().results(window=1, yearmon=y)
                                          for y in config.historical_yearmons()] +
                                         [config.workspace().state(yearmon=get_next_yearmon(y))
                                          for y in config.historical_yearmons()])
-    run_lsm.replace_targets_with_tag_file(config.workspace().tag('spinup_1mo_results'))
 
     return [
         make_initial_state,
-        run_lsm,
+        *chain_segments(config, run_lsm,
+                        states=[config.workspace().state(yearmon=segment[0]) for segment in segments],
+                        tag='spinup_1mo_results'),
         *tag_steps
     ]
 
 
+def spinup_segments(config: Config) -> List[List[str]]:
+    """
+    Divide the historical period into the segments run by separate spinup
+    LSM steps. Unless the configuration specifies a segment length, the
+    entire period is run in a single step.
+    """
+    yearmons = config.historical_yearmons()
+
+    if not config.spinup_segment_years:
+        return [yearmons]
+
+    months = 12 * config.spinup_segment_years
+
+    return [yearmons[i:i + months] for i in range(0, len(yearmons), months)]
+
+
+def chain_segments(config: Config, run_lsm: List[Step], *, states: List[str], tag: str) -> List[Step]:
+    """
+    Replace the targets of the LSM run for each segment of the historical
+    period with a tag file, and make each run after the first depend on the
+    tag file of the previous run rather than on its initial state, which is
+    written by that run. The completion of all runs is recorded by the tag
+    file with the provided name.
+    """
+    if len(run_lsm) == 1:
+        return [run_lsm[0].replace_targets_with_tag_file(config.workspace().tag(tag))]
+
+    steps = []
+    previous = None
+
+    for i, (step, state) in enumerate(zip(run_lsm, states)):
+        segment_tag = config.workspace().tag('{}_segment_{}'.format(tag, i + 1))
+        step.replace_targets_with_tag_file(segment_tag)
+
+        if previous:
+            step.dependencies.discard(state)
+            step.dependencies.add(previous)
+
+        steps.append(step)
+        previous = segment_tag
+
+    steps.append(Step(
+        targets=config.workspace().tag(tag),
+        dependencies=previous,
+        commands=[['touch', config.workspace().tag(tag)]]
+    ))
+
+    return steps
+
+
 def time_integrate_forcing(config:Config, window: int, *, basis: Optional[Basis]=None) -> List[Step]:
     """
     Integrate forcing variables over the given time window
@@ -373,7 +438,8 @@ def fit_composite_anomalies(config: Config, *, window: int) -> List[Step]:
                           indicator)
             ],
             output=config.workspace().fit_composite_anomalies(indicator=indicator, window=window),
-            window=window
+            window=window,
+            cores=config.cores_per_step
         )
         for indicator in ('surplus', 'deficit')
     ]
@@ -14,9 +14,10 @@
 from . import dates
 
 import os
+import sys
 import warnings
 
-from typing import Union, Optional, List, Iterable, Set
+from typing import Union, Optional, List, Iterable, Set, Sequence, Tuple
 
 
 def process_filename(txt: str) -> List[str]:
@@ -25,7 +26,19 @@ def process_filename(txt: str) -> List[str]:
     date ranges present in the filename
     """
     filename = str(txt).split('::')[0]
-    return dates.expand_filename_dates(filename)
+    return [sys.intern(f) for f in dates.expand_filename_dates(filename)]
+
+
+def intern_command(command: Sequence[str]) -> Tuple[str, ...]:
+    """
+    Convert a command into a tuple of interned tokens, so that tokens repeated
+    across many steps (executable names, argument names, static data paths)
+    are stored only once.
+    """
+    if type(command) is not list and type(command) is not tuple:
+        raise TypeError("Non-list command: ", command)
+
+    return tuple(sys.intern(token) if type(token) is str else token for token in command)
 
 
 def coerce_to_list(thing) -> List:
@@ -41,6 +54,8 @@ ZeroOrMoreStrings = Union[str, List[str], Set[str], None]
 
 class Step:
 
+    __slots__ = ('targets', 'dependencies', 'commands', 'consumes', 'working_directories', 'comment', 'lock', 'cores', 'memory')
+
     def __eq__(self, other):
         if not isinstance(other, Step):
             raise Exception("Cannot compare Step to non-Step")
@@ -67,7 +82,9 @@ class Step:
                  comment: Optional[str]=None,
                  consumes: ZeroOrMoreStrings=None,
                  working_directories: ZeroOrMoreStrings=None,
-                 lock: Optional[str] = None):
+                 lock: Optional[str] = None,
+                 cores: int = 1,
+                 memory: int = 0):
         """
         Initialize a workflow step
 
@@ -79,8 +96,13 @@ class Step:
                              created, if not already present, before this step executes. Any directory
                              included in a target is implied and does not need to be specified.
 
-        :param commands:     a list of commands, where each command is represented as a list of tokens
+        :param commands:     a list of commands, where each command is represented as a list or tuple of
+                             tokens. Commands are stored as tuples of interned strings.
         :param comment:      an optional text comment to be associated with the step
+        :param cores:        the number of CPU cores used by the step's commands, so that output
+                             modules can avoid running more steps at once than the machine can support
+        :param memory:       the estimated peak memory use of the step's commands, in bytes, or zero
+                             if unknown
         """
 
         targets = coerce_to_list(targets)
@@ -89,15 +111,16 @@ class Step:
         commands = coerce_to_list(commands)
         working_directories = coerce_to_list(working_directories)
 
-        self.commands = [c for c in commands if c is not None]
-        self.consumes = {t for t in consumes if t is not None}
+        self.commands = [intern_command(c) for c in commands if c is not None]
+        self.consumes = {sys.intern(t) for t in consumes if t is not None}
 
         self.targets = set()
         for t in targets:
             if t is not None and t != '/dev/null':
                 self.targets |= set(process_filename(t))
 
-        self.working_directories = set(working_directories) | {os.path.dirname(target) for target in self.targets}
+        self.working_directories = {sys.intern(d) for d in working_directories} | \
+                                   {sys.intern(os.path.dirname(target)) for target in self.targets}
 
         self.dependencies = set()
         for d in dependencies:
@@ -106,6 +129,8 @@ class Step:
 
         self.comment = comment
         self.lock = lock
+        self.cores = cores
+        self.memory = memory
 
         self.validate()
 
@@ -137,6 +162,8 @@ class Step:
         combined_commands = list(self.commands)
         combined_consumes = set(self.consumes)
         combined_working_directories = set(self.working_directories)
+        combined_cores = self.cores
+        combined_memory = self.memory
 
         for other in others:
             assert not other.lock  # Not implemented yet
@@ -153,6 +180,11 @@ class Step:
 
             combined_commands += other.commands
 
+            # Commands are run sequentially, so the combined step needs
+            # only as many cores as its most demanding command
+            combined_cores = max(combined_cores, other.cores)
+            combined_memory = max(combined_memory, other.memory)
+
             for t in other.consumes:
                 combined_targets.remove(t)
                 combined_consumes.add(t)
@@ -162,7 +194,9 @@ class Step:
             dependencies=combined_dependencies,
             commands=combined_commands,
             consumes=combined_consumes,
-            working_directories=combined_working_directories
+            working_directories=combined_working_directories,
+            cores=combined_cores,
+            memory=combined_memory
         )
 
     def require(self, *others) -> Iterable["Step"]:
@@ -192,9 +226,9 @@ class Step:
 
         Returns the step object, to enable use in chaining.
         """
-        self.commands.append(['touch', tag_file_name])
-        self.targets = {tag_file_name}
-        self.working_directories.add(os.path.dirname(tag_file_name))
+        self.commands.append(intern_command(['touch', tag_file_name]))
+        self.targets = {sys.intern(tag_file_name)}
+        self.working_directories.add(sys.intern(os.path.dirname(tag_file_name)))
 
         return self
 
@@ -205,18 +239,18 @@ class Step:
 
         Returns the step object, to enable use in chaining.
         """
-        self.dependencies = set(deps)
+        self.dependencies = {sys.intern(d) for d in deps}
 
         return self
 
-    def get_mkdir_commands(self) -> List[List[str]]:
+    def get_mkdir_commands(self) -> List[Tuple[str, ...]]:
         """
         Get commands necessary to create directories for all targets
         """
-        directories_to_create = [d for d in sorted(self.working_directories) if d != '']
+        directories_to_create = tuple(d for d in sorted(self.working_directories) if d != '')
 
         if directories_to_create:
-            return [['mkdir', '-p'] + directories_to_create]
+            return [('mkdir', '-p') + directories_to_create]
         else:
             return []
 
@@ -228,8 +262,6 @@ class Step:
             if type(d) is not str:
                 raise TypeError("Non-string dependency: ", d)
         for c in self.commands:
-            if type(c) is not list:
-                raise TypeError("Non-list command: ", c)
             for token in c:
                 if type(token) is not str:
                     print(c)
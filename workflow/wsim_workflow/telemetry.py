@@ -0,0 +1,292 @@
+# Copyright (c) 2026 ISciences, LLC.
+# All rights reserved.
+#
+# WSIM is licensed under the Apache License, Version 2.0 (the "License").
+# You may not use this file except in compliance with the License. You may
+# obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Recording and reporting of the resources used by each workflow command.
+
+When a workflow is generated with telemetry enabled, each command is run
+by a wrapper that records its wall time, CPU time, peak memory use, bytes
+read and written, and exit status to a log file with one JSON record per
+line. The log can then be summarized by tool, integration window, forecast
+model, or phase of the workflow.
+"""
+
+import argparse
+import collections
+import datetime
+import fcntl
+import json
+import os
+import re
+import signal
+import subprocess
+import sys
+import time
+
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from .commands import q
+from .step import Step
+
+DEFAULT_LOG = 'telemetry.jsonl'
+
+WRAPPER_SCRIPT = '{BINDIR}/workflow/wsim_telemetry.py'
+
+# Programs that run the tool named by their first argument
+INTERPRETERS = ('Rscript', 'bash', 'python', 'python3', 'sh')
+
+GROUPINGS = ('tool', 'window', 'model', 'phase')
+
+RE_WINDOW = re.compile(r'_(\d+)mo_')
+RE_MODEL = re.compile(r'_fcst([^_./]+)[_.]')
+
+
+def tool_name(command: List[str]) -> str:
+    """
+    Return the name of the program run by a command (e.g., wsim_lsm.R)
+    """
+    tool = os.path.basename(command[0])
+
+    if tool in INTERPRETERS:
+        for token in command[1:]:
+            if token in ('-c', '-e'):
+                # Inline code rather than a script
+                break
+            if not token.startswith('-'):
+                return os.path.basename(token)
+
+    return tool
+
+
+def exit_status(wait_status: int) -> int:
+    """
+    Convert a status returned by os.wait4 into an exit status, using
+    the shell convention for processes terminated by a signal
+    """
+    if os.WIFSIGNALED(wait_status):
+        return 128 + os.WTERMSIG(wait_status)
+    return os.WEXITSTATUS(wait_status)
+
+
+def run(command: List[str], targets: List[str]) -> Dict[str, Any]:
+    """
+    Run a command and return a record of the resources it used.
+
+    Resource usage is obtained from the operating system when the command
+    exits, and includes any subprocesses that the command waited for.
+    Bytes read and written are those that required access to a storage
+    device; reads satisfied from the page cache are not counted.
+    """
+    started = datetime.datetime.now()
+    start = time.monotonic()
+
+    try:
+        process = subprocess.Popen(command)
+    except OSError as e:
+        print(e, file=sys.stderr)
+        status = 127
+        usage = None
+    else:
+        # Let the command handle interrupts, and record its status afterwards
+        handler = signal.signal(signal.SIGINT, signal.SIG_IGN)
+        try:
+            _, wait_status, usage = os.wait4(process.pid, 0)
+        finally:
+            signal.signal(signal.SIGINT, handler)
+        status = exit_status(wait_status)
+        process.returncode = status
+
+    record = collections.OrderedDict([
+        ('tool', tool_name(command)),
+        ('targets', targets),
+        ('start', started.isoformat(timespec='seconds')),
+        ('wall', round(time.monotonic() - start, 3)),
+        ('user', round(usage.ru_utime, 3) if usage else 0),
+        ('system', round(usage.ru_stime, 3) if usage else 0),
+        # ru_maxrss is reported in kilobytes on Linux
+        ('max_rss', usage.ru_maxrss * 1024 if usage else 0),
+        # ru_inblock and ru_oublock are counted in 512-byte blocks
+        ('read_bytes', usage.ru_inblock * 512 if usage else 0),
+        ('write_bytes', usage.ru_oublock * 512 if usage else 0),
+        ('status', status),
+    ])
+
+    return record
+
+
+def append_record(log: str, record: Mapping[str, Any]) -> None:
+    """
+    Append a record to a log, locking the log so that records written by
+    commands running in parallel are not interleaved
+    """
+    with open(log, 'a') as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            f.write(json.dumps(record) + '\n')
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def read_log(log: str) -> Iterable[Dict[str, Any]]:
+    with open(log, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def categorize(record: Mapping[str, Any], grouping: str) -> str:
+    """
+    Return the category of a record for the specified grouping. Integration
+    windows, forecast models and workflow phases are inferred from the
+    filenames of the step's targets.
+    """
+    if grouping == 'tool':
+        return record['tool']
+
+    targets = record['targets']
+
+    if grouping == 'window':
+        for t in targets:
+            m = RE_WINDOW.search(os.path.basename(t))
+            if m:
+                return '{}mo'.format(m.group(1))
+        return '1mo'
+
+    if grouping == 'model':
+        for t in targets:
+            m = RE_MODEL.search(os.path.basename(t))
+            if m:
+                return m.group(1)
+        return 'observed'
+
+    if grouping == 'phase':
+        if any('/spinup/' in t for t in targets):
+            return 'spinup'
+        if any('_trgt' in os.path.basename(t) for t in targets):
+            return 'forecast'
+        return 'observed'
+
+    raise ValueError('Unknown grouping: ' + grouping)
+
+
+def summarize(records: Iterable[Mapping[str, Any]], grouping: str) -> List[Tuple[str, Dict[str, float]]]:
+    """
+    Aggregate records by category, returning categories in descending
+    order of total wall time
+    """
+    summary = collections.OrderedDict()  # type: Dict[str, Dict[str, float]]
+
+    for record in records:
+        key = categorize(record, grouping)
+        if key not in summary:
+            summary[key] = dict(count=0, failed=0, wall=0.0, cpu=0.0, max_rss=0, read_bytes=0, write_bytes=0)
+
+        s = summary[key]
+        s['count'] += 1
+        s['failed'] += int(record['status'] != 0)
+        s['wall'] += record['wall']
+        s['cpu'] += record['user'] + record['system']
+        s['max_rss'] = max(s['max_rss'], record['max_rss'])
+        s['read_bytes'] += record['read_bytes']
+        s['write_bytes'] += record['write_bytes']
+
+    return sorted(summary.items(), key=lambda item: -item[1]['wall'])
+
+
+def format_report(summary: List[Tuple[str, Dict[str, float]]], grouping: str) -> str:
+    total_wall = sum(s['wall'] for _, s in summary) or 1
+
+    lines = ['{:<40} {:>8} {:>6} {:>12} {:>6} {:>12} {:>10} {:>10} {:>10}'.format(
+        grouping, 'count', 'failed', 'wall (s)', 'wall %', 'cpu (s)', 'rss (MB)', 'read (MB)', 'write (MB)')]
+
+    for key, s in summary:
+        lines.append('{:<40} {:>8d} {:>6d} {:>12.1f} {:>6.1f} {:>12.1f} {:>10.0f} {:>10.0f} {:>10.0f}'.format(
+            key, s['count'], s['failed'], s['wall'], 100 * s['wall'] / total_wall, s['cpu'],
+            s['max_rss'] / 2**20, s['read_bytes'] / 2**20, s['write_bytes'] / 2**20))
+
+    return '\n'.join(lines)
+
+
+def wrapper_command(command: Tuple[str, ...], log: str, targets: Iterable[str]) -> Tuple[str, ...]:
+    return ('python3', WRAPPER_SCRIPT, 'run',
+            '--log', log,
+            '--targets', q(' '.join(sorted(targets))),
+            '--') + tuple(command)
+
+
+def instrument_steps(steps: Iterable[Step], log: str) -> Iterable[Step]:
+    """
+    Rewrite the commands of each step so that their resource usage is
+    recorded in the specified log
+    """
+    for step in steps:
+        step.commands = [wrapper_command(command, log, step.targets) for command in step.commands]
+        yield step
+
+
+def parse_args(args):
+    parser = argparse.ArgumentParser('Record and report the resources used by workflow commands')
+    subparsers = parser.add_subparsers(dest='action')
+    subparsers.required = True
+
+    run_parser = subparsers.add_parser('run', help='Run a command and record its resource usage')
+    run_parser.add_argument('--log', required=True, help='Log file to which a record should be appended')
+    run_parser.add_argument('--targets', default='', help='Space-separated list of targets built by the command')
+    run_parser.add_argument('command', nargs=argparse.REMAINDER, help='Command and arguments')
+
+    report_parser = subparsers.add_parser('report', help='Summarize a log')
+    report_parser.add_argument('--log', default=DEFAULT_LOG, help='Log file to summarize')
+    report_parser.add_argument('--by', default=','.join(GROUPINGS),
+                               help='Comma-separated list of groupings ({})'.format(', '.join(GROUPINGS)))
+
+    parsed = parser.parse_args(args)
+
+    if parsed.action == 'run':
+        if parsed.command and parsed.command[0] == '--':
+            parsed.command = parsed.command[1:]
+        if not parsed.command:
+            parser.error('No command provided.')
+
+    if parsed.action == 'report':
+        parsed.by = [g for g in parsed.by.split(',') if g]
+        for g in parsed.by:
+            if g not in GROUPINGS:
+                parser.error('Unknown grouping: {}'.format(g))
+
+    return parsed
+
+
+def main(raw_args) -> Optional[int]:
+    args = parse_args(raw_args)
+
+    if args.action == 'run':
+        record = run(args.command, args.targets.split())
+        try:
+            append_record(args.log, record)
+        except OSError as e:
+            # Failure to record telemetry should not cause the step to fail
+            print('Failed to write telemetry to {}: {}'.format(args.log, e), file=sys.stderr)
+        return record['status']
+
+    records = list(read_log(args.log))
+    for i, grouping in enumerate(args.by):
+        if i > 0:
+            print()
+        print(format_report(summarize(records, grouping), grouping))
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
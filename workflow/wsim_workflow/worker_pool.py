@@ -0,0 +1,310 @@
+# Copyright (c) 2026 ISciences, LLC.
+# All rights reserved.
+#
+# WSIM is licensed under the Apache License, Version 2.0 (the "License").
+# You may not use this file except in compliance with the License. You may
+# obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+A pool of persistent R processes that run WSIM command-line tools.
+
+Most WSIM steps perform only a few seconds of work, so the time needed to
+start R and load the wsim.io, wsim.distributions and wsim.lsm packages can
+exceed the time spent doing useful work. The pool keeps a fixed number of
+R processes (``wsim_batch.R --worker``) running with these packages loaded,
+and accepts jobs from clients over a Unix socket.
+
+The client is a drop-in replacement for running the tool directly: it
+forwards the output of the tool and exits with the tool's exit status. If
+the pool is not running, the client runs the tool itself.
+"""
+
+import argparse
+import json
+import os
+import queue
+import socket
+import socketserver
+import subprocess
+import sys
+import threading
+
+from typing import Iterable, List, Optional, Tuple
+
+from .step import Step
+
+# Marker written by wsim_batch.R --worker after each job, followed by the exit status
+WORKER_DONE = '__WSIM_WORKER_DONE__'
+
+CLIENT_SCRIPT = '{BINDIR}/workflow/wsim_worker.py'
+
+
+class Worker:
+    """
+    A single R process running wsim_batch.R in worker mode
+    """
+
+    def __init__(self, command: List[str]):
+        self.process = subprocess.Popen(command,
+                                        stdin=subprocess.PIPE,
+                                        stdout=subprocess.PIPE,
+                                        stderr=subprocess.STDOUT,
+                                        universal_newlines=True,
+                                        bufsize=1)
+
+    def alive(self) -> bool:
+        return self.process.poll() is None
+
+    def run(self, args: List[str], cwd: str, output) -> int:
+        """
+        Run a job, passing each line of its output to the output function,
+        and return the exit status of the job. If the worker exits before
+        completing the job (for example, because the tool called quit()),
+        the job is considered to have failed.
+
+        If the output function raises an OSError (for example, because the
+        client that submitted the job has disconnected), the remaining output
+        of the job is discarded, so that the worker is ready for its next job
+        once this function returns.
+        """
+        try:
+            self.process.stdin.write('\t'.join([cwd] + list(args)) + '\n')
+            self.process.stdin.flush()
+        except OSError:
+            self.process.wait()
+            return 1
+
+        for line in self.process.stdout:
+            if line.startswith(WORKER_DONE):
+                return int(line[len(WORKER_DONE):].strip() or 1)
+
+            if output:
+                try:
+                    output(line)
+                except OSError:
+                    output = None
+
+        # Worker exited without completing the job
+        self.process.wait()
+        return 1
+
+    def stop(self) -> None:
+        if self.alive():
+            self.process.stdin.close()
+            try:
+                self.process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+        self.close()
+
+    def close(self) -> None:
+        """
+        Close the pipes to a worker that has exited
+        """
+        for pipe in (self.process.stdin, self.process.stdout):
+            try:
+                pipe.close()
+            except OSError:
+                pass
+        self.process.wait()
+
+
+class WorkerPool:
+    """
+    A fixed number of workers. Workers that exit are replaced when they
+    are returned to the pool, so a job that crashes R does not reduce the
+    capacity of the pool.
+    """
+
+    def __init__(self, command: List[str], n_workers: int):
+        self.command = command
+        self.idle = queue.Queue()  # type: queue.Queue
+        self.workers = []  # type: List[Worker]
+        self.lock = threading.Lock()
+
+        for _ in range(n_workers):
+            self.idle.put(self._spawn())
+
+    def _spawn(self) -> Worker:
+        worker = Worker(self.command)
+        with self.lock:
+            self.workers.append(worker)
+        return worker
+
+    def run(self, args: List[str], cwd: str, output) -> int:
+        worker = self.idle.get()
+        try:
+            return worker.run(args, cwd, output)
+        finally:
+            if not worker.alive():
+                with self.lock:
+                    self.workers.remove(worker)
+                worker.close()
+                worker = self._spawn()
+            self.idle.put(worker)
+
+    def stop(self) -> None:
+        with self.lock:
+            workers = list(self.workers)
+        for worker in workers:
+            worker.stop()
+
+
+class RequestHandler(socketserver.StreamRequestHandler):
+
+    def handle(self):
+        request = json.loads(self.rfile.readline().decode('utf-8'))
+
+        def output(line: str) -> None:
+            self.wfile.write(line.encode('utf-8'))
+
+        # If the client disconnects, the pool discards the rest of the job's
+        # output, and there is no one left to receive its exit status.
+        status = self.server.pool.run(request['args'], request['cwd'], output)
+
+        try:
+            self.wfile.write('{} {}\n'.format(WORKER_DONE, status).encode('utf-8'))
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+class Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path: str, pool: WorkerPool):
+        super().__init__(path, RequestHandler)
+        self.pool = pool
+
+
+def serve(socket_path: str, command: List[str], n_workers: int) -> None:
+    if os.path.exists(socket_path):
+        os.remove(socket_path)
+
+    pool = WorkerPool(command, n_workers)
+    server = Server(socket_path, pool)
+
+    print('Serving {} workers on {}'.format(n_workers, socket_path), file=sys.stderr)
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        pool.stop()
+        os.remove(socket_path)
+
+
+def submit(socket_path: str, args: List[str], cwd: Optional[str] = None) -> Optional[int]:
+    """
+    Run a job using the pool listening on socket_path, copying its output
+    to stdout. Return the exit status of the job, or None if the job could
+    not be submitted to the pool.
+    """
+    if cwd is None:
+        cwd = os.getcwd()
+
+    # Tabs and newlines cannot be represented in the line-based protocol
+    # used to communicate with workers.
+    if any('\t' in arg or '\n' in arg for arg in [cwd] + list(args)):
+        return None
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(socket_path)
+    except OSError:
+        sock.close()
+        return None
+
+    with sock, sock.makefile('rwb') as stream:
+        stream.write((json.dumps({'args': list(args), 'cwd': cwd}) + '\n').encode('utf-8'))
+        stream.flush()
+
+        for line in stream:
+            line = line.decode('utf-8')
+            if line.startswith(WORKER_DONE):
+                return int(line[len(WORKER_DONE):].strip())
+            sys.stdout.write(line)
+            sys.stdout.flush()
+
+    # Connection closed before the job was completed
+    return 1
+
+
+def client_command(command: Tuple[str, ...], socket_path: str) -> Tuple[str, ...]:
+    return ('python3', CLIENT_SCRIPT, 'run', '--socket', socket_path, '--') + tuple(command)
+
+
+def is_pool_command(command: Tuple[str, ...]) -> bool:
+    """
+    Return True if a command is an invocation of a WSIM R tool that can be
+    run by a worker
+    """
+    if not command:
+        return False
+
+    tool = command[0]
+    name = os.path.basename(tool)
+
+    return tool.startswith('{BINDIR}') and name.startswith('wsim_') and name.endswith('.R')
+
+
+def use_worker_pool(steps: Iterable[Step], socket_path: str) -> Iterable[Step]:
+    """
+    Rewrite the commands of each step so that WSIM R tools are run by the
+    worker pool listening on socket_path.
+    """
+    for step in steps:
+        step.commands = [client_command(command, socket_path) if is_pool_command(command) else command
+                         for command in step.commands]
+        yield step
+
+
+def parse_args(args):
+    parser = argparse.ArgumentParser('Run WSIM R tools using a pool of persistent R processes')
+    subparsers = parser.add_subparsers(dest='action')
+    subparsers.required = True
+
+    serve_parser = subparsers.add_parser('serve', help='Start a pool of workers')
+    serve_parser.add_argument('--socket', required=True, help='Path of Unix socket on which to accept jobs')
+    serve_parser.add_argument('--workers', type=int, default=os.cpu_count(), help='Number of R processes to run')
+    serve_parser.add_argument('--bindir', default='/wsim', help='Directory containing wsim_batch.R')
+
+    run_parser = subparsers.add_parser('run', help='Run a WSIM R tool using a pool of workers')
+    run_parser.add_argument('--socket', required=True, help='Path of Unix socket used by the pool')
+    run_parser.add_argument('command', nargs=argparse.REMAINDER, help='Tool and arguments')
+
+    parsed = parser.parse_args(args)
+
+    if parsed.action == 'run':
+        if parsed.command and parsed.command[0] == '--':
+            parsed.command = parsed.command[1:]
+        if not parsed.command:
+            parser.error('No command provided.')
+
+    return parsed
+
+
+def main(raw_args):
+    args = parse_args(raw_args)
+
+    if args.action == 'serve':
+        serve(args.socket, [os.path.join(args.bindir, 'wsim_batch.R'), '--worker'], args.workers)
+        return 0
+
+    status = submit(args.socket, args.command)
+    if status is None:
+        # Pool is unavailable; run the tool directly
+        os.execvp(args.command[0], args.command)
+
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
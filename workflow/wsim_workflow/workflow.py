@@ -18,29 +18,23 @@ import sys
 import types
 import importlib.util
 
-from typing import List, Optional
+from typing import Iterable, Iterator, List, Optional
 
 from . import agriculture
+from . import batching
+from . import coverage
 from . import dates
 from . import electric_power
 from . import monthly
 from . import spinup
 
 from .config_base import ConfigBase
+from .graph import WorkflowGraph
 from .step import Step
 
 
-def find_duplicate_targets(steps: List[Step]) -> List[Step]:
-    targets = set()
-    duplicates = set()
-
-    for step in steps:
-        for target in step.targets:
-            if target in targets:
-                duplicates.add(target)
-            targets.add(target)
-
-    return sorted(list(duplicates))
+def find_duplicate_targets(steps: List[Step]) -> List[str]:
+    return WorkflowGraph(steps).duplicates
 
 
 def get_meta_steps():
@@ -60,65 +54,144 @@ def get_meta_steps():
     )}
 
 
-def generate_steps(config: ConfigBase, *,
-                   start: str,
-                   stop: str,
-                   step: Optional[int] = 1,
-                   no_spinup: bool,
-                   forecasts: str,
-                   forecast_lag_hours: Optional[int] = None,
-                   run_electric_power: bool,
-                   run_agriculture: bool) -> List[Step]:
-    steps = []
+def default_goal() -> str:
+    """
+    Return the target built when none is specified (e.g., by a plain ``make``).
+    This is the last meta-step generated, which was the first rule written when
+    steps were written in reverse order of generation.
+    """
+    return list(get_meta_steps())[-1]
+
+
+def iter_steps(config: ConfigBase, *,
+               start: str,
+               stop: str,
+               step: Optional[int] = 1,
+               no_spinup: bool,
+               forecasts: str,
+               forecast_lag_hours: Optional[int] = None,
+               run_electric_power: bool,
+               run_agriculture: bool,
+               batch_size: Optional[int] = None) -> Iterator[Step]:
+    """
+    Generate the steps of a workflow one phase at a time, so that they can be
+    written out without holding the entire workflow in memory. Meta-steps
+    accumulate the targets of other steps as they are generated, and are
+    yielded last.
+
+    If batch_size is specified, independent steps within each phase that run
+    the same WSIM R script are combined into batches of up to batch_size
+    jobs, each run within a single R process.
+    """
+    def phase(steps: List[Step]) -> List[Step]:
+        if batch_size:
+            return batching.batch_steps(steps, batch_size=batch_size)
+        return steps
+
+    yield from config.global_prep()
 
-    steps += config.global_prep()
+    if config.cached_coverage:
+        yield from coverage.compute_coverage(config, run_electric_power=run_electric_power)
 
     meta_steps = get_meta_steps()
 
     if config.should_run_spinup() and not no_spinup:
-        steps += spinup.spinup(config, meta_steps)
+        yield from phase(spinup.spinup(config, meta_steps))
         if run_electric_power:
-            steps += electric_power.spinup(config, meta_steps)
+            yield from phase(electric_power.spinup(config, meta_steps))
         if run_agriculture:
-            steps += agriculture.spinup(config, meta_steps)
-
+            yield from phase(agriculture.spinup(config, meta_steps))
 
     for i, yearmon in enumerate(reversed(list(dates.get_yearmons(start, stop))[::step])):
-        steps += monthly.monthly_observed(config, yearmon, meta_steps)
+        yield from phase(monthly.monthly_observed(config, yearmon, meta_steps))
 
         if run_electric_power:
-            steps += electric_power.monthly_observed(config, yearmon, meta_steps)
+            yield from phase(electric_power.monthly_observed(config, yearmon, meta_steps))
         if run_agriculture:
-            steps += agriculture.monthly_observed(config, yearmon, meta_steps)
+            yield from phase(agriculture.monthly_observed(config, yearmon, meta_steps))
 
         if forecasts == 'all' or (forecasts == 'latest' and i == 0):
-            steps += monthly.monthly_forecast(config, yearmon, meta_steps, forecast_lag_hours=forecast_lag_hours)
+            yield from phase(monthly.monthly_forecast(config, yearmon, meta_steps, forecast_lag_hours=forecast_lag_hours))
 
             if run_electric_power:
-                steps += electric_power.monthly_forecast(config, yearmon, meta_steps)
+                yield from phase(electric_power.monthly_forecast(config, yearmon, meta_steps))
             if run_agriculture:
-                steps += agriculture.monthly_forecast(config, yearmon, meta_steps)
+                yield from phase(agriculture.monthly_forecast(config, yearmon, meta_steps))
+
+    yield from meta_steps.values()
+
+
+def generate_steps(config: ConfigBase, *,
+                   start: str,
+                   stop: str,
+                   step: Optional[int] = 1,
+                   no_spinup: bool,
+                   forecasts: str,
+                   forecast_lag_hours: Optional[int] = None,
+                   run_electric_power: bool,
+                   run_agriculture: bool,
+                   batch_size: Optional[int] = None) -> List[Step]:
+    return list(iter_steps(config,
+                           start=start,
+                           stop=stop,
+                           step=step,
+                           no_spinup=no_spinup,
+                           forecasts=forecasts,
+                           forecast_lag_hours=forecast_lag_hours,
+                           run_electric_power=run_electric_power,
+                           run_agriculture=run_agriculture,
+                           batch_size=batch_size))
+
+
+def track_duplicate_targets(steps: Iterable[Step], duplicates: List[str]) -> Iterator[Step]:
+    """
+    Pass through a sequence of steps, appending to duplicates any target
+    that is produced by more than one step. Only the target names are
+    retained, so this can be used to check a workflow as it is streamed
+    to an output module.
+    """
+    targets = set()
 
-    steps += meta_steps.values()
+    for step in steps:
+        for target in step.targets:
+            if target in targets:
+                duplicates.append(target)
+            targets.add(target)
+        yield step
 
-    return steps
 
+def write_makefile(module, filename: str, steps: Iterable[Step], bindir: str,
+                   goal: Optional[str] = None) -> int:
+    """
+    Write steps to filename using the specified output module, and return
+    the number of steps written. Steps are written as they are produced,
+    so steps may be provided by a generator such as iter_steps.
 
-def write_makefile(module, filename: str, steps: List[Step], bindir: str) -> None:
+    If goal is specified, and the output module supports it, the target
+    goal is built when no target is requested. Otherwise, the target of the
+    first step written is built.
+    """
     os.makedirs(os.path.dirname(filename), exist_ok=True)
 
+    n = 0
+
     with open(filename, 'w') as outfile:
         outfile.write(module.header())
         outfile.write(2*'\n')
 
-        # Reverse the steps so that spinup stuff is at the end. This is just to improve readability
-        # if the user wants to manually inspect the Makefile
-        for step in reversed(steps):
+        if goal and hasattr(module, 'write_default_goal'):
+            outfile.write(module.write_default_goal(goal))
+            outfile.write('\n')
+
+        for step in steps:
             outfile.write(module.write_step(step, {'BINDIR': bindir}))
             outfile.write('\n')
+            n += 1
 
         print("Done")
 
+    return n
+
 
 def unbuildable_targets(steps) -> List[Step]:
     """
@@ -128,38 +201,11 @@ def unbuildable_targets(steps) -> List[Step]:
 
     Return a list of steps that cannot be built.
     """
+    graph = WorkflowGraph(steps)
 
-    builder_of = {}
-
-    for step in steps:
-        step.depth = None
-        for t in step.targets:
-            builder_of[t] = step
-
-    def step_depth(step):
-        if step.depth is not None:
-            return step.depth
-
-        if not step.dependencies:
-            return 0
-
-        else:
-            return 1 + max(step_depth(builder_of[d]) if d in builder_of else float('inf') for d in step.dependencies)
-
-    for step in steps:
-        step.depth = step_depth(step)
-
-    max_depth = max(step_depth(step) for step in steps)
-
-    print('Maximum dependency tree depth:', max_depth)
-
-    unbuildable = [step for step in steps if step.depth == float('inf')]
-
-    if unbuildable:
-        pass  # Convenient breakpoint
-        print('xox')
+    print('Maximum dependency tree depth:', graph.max_depth())
 
-    return unbuildable
+    return graph.unbuildable()
 
 
 def load_config(path: str, source: str, derived: str, config_options: dict) -> ConfigBase:
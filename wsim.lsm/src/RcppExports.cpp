@@ -90,6 +90,44 @@ BEGIN_RCPP
     return rcpp_result_gen;
 END_RCPP
 }
+// basin_flow_order
+List basin_flow_order(const IntegerVector& basin_ids, const IntegerVector& downstream_ids);
+RcppExport SEXP _wsim_lsm_basin_flow_order(SEXP basin_idsSEXP, SEXP downstream_idsSEXP) {
+BEGIN_RCPP
+    Rcpp::RObject rcpp_result_gen;
+    Rcpp::RNGScope rcpp_rngScope_gen;
+    Rcpp::traits::input_parameter< const IntegerVector& >::type basin_ids(basin_idsSEXP);
+    Rcpp::traits::input_parameter< const IntegerVector& >::type downstream_ids(downstream_idsSEXP);
+    rcpp_result_gen = Rcpp::wrap(basin_flow_order(basin_ids, downstream_ids));
+    return rcpp_result_gen;
+END_RCPP
+}
+// accumulate_ordered
+NumericMatrix accumulate_ordered(const IntegerVector& order, const IntegerVector& downstream_index, const NumericMatrix& flows);
+RcppExport SEXP _wsim_lsm_accumulate_ordered(SEXP orderSEXP, SEXP downstream_indexSEXP, SEXP flowsSEXP) {
+BEGIN_RCPP
+    Rcpp::RObject rcpp_result_gen;
+    Rcpp::RNGScope rcpp_rngScope_gen;
+    Rcpp::traits::input_parameter< const IntegerVector& >::type order(orderSEXP);
+    Rcpp::traits::input_parameter< const IntegerVector& >::type downstream_index(downstream_indexSEXP);
+    Rcpp::traits::input_parameter< const NumericMatrix& >::type flows(flowsSEXP);
+    rcpp_result_gen = Rcpp::wrap(accumulate_ordered(order, downstream_index, flows));
+    return rcpp_result_gen;
+END_RCPP
+}
+// downstream_flow_ordered
+NumericMatrix downstream_flow_ordered(const IntegerVector& order, const IntegerVector& downstream_index, const NumericMatrix& flows);
+RcppExport SEXP _wsim_lsm_downstream_flow_ordered(SEXP orderSEXP, SEXP downstream_indexSEXP, SEXP flowsSEXP) {
+BEGIN_RCPP
+    Rcpp::RObject rcpp_result_gen;
+    Rcpp::RNGScope rcpp_rngScope_gen;
+    Rcpp::traits::input_parameter< const IntegerVector& >::type order(orderSEXP);
+    Rcpp::traits::input_parameter< const IntegerVector& >::type downstream_index(downstream_indexSEXP);
+    Rcpp::traits::input_parameter< const NumericMatrix& >::type flows(flowsSEXP);
+    rcpp_result_gen = Rcpp::wrap(downstream_flow_ordered(order, downstream_index, flows));
+    return rcpp_result_gen;
+END_RCPP
+}
 // coalesce
 NumericVector coalesce(const NumericVector& v, const NumericVector& replacement_value);
 RcppExport SEXP _wsim_lsm_coalesce(SEXP vSEXP, SEXP replacement_valueSEXP) {
@@ -307,6 +345,9 @@ static const R_CallMethodDef CallEntries[] = {
     {"_wsim_lsm_accumulate_flow", (DL_FUNC) &_wsim_lsm_accumulate_flow, 4},
     {"_wsim_lsm_accumulate", (DL_FUNC) &_wsim_lsm_accumulate, 3},
     {"_wsim_lsm_downstream_flow", (DL_FUNC) &_wsim_lsm_downstream_flow, 3},
+    {"_wsim_lsm_basin_flow_order", (DL_FUNC) &_wsim_lsm_basin_flow_order, 2},
+    {"_wsim_lsm_accumulate_ordered", (DL_FUNC) &_wsim_lsm_accumulate_ordered, 3},
+    {"_wsim_lsm_downstream_flow_ordered", (DL_FUNC) &_wsim_lsm_downstream_flow_ordered, 3},
     {"_wsim_lsm_coalesce", (DL_FUNC) &_wsim_lsm_coalesce, 2},
     {"_wsim_lsm_is_leap_year", (DL_FUNC) &_wsim_lsm_is_leap_year, 1},
     {"_wsim_lsm_day_hours", (DL_FUNC) &_wsim_lsm_day_hours, 2},
@@ -14,6 +14,7 @@
 // [[Rcpp::plugins(cpp11)]]
 #include <Rcpp.h>
 #include <stack>
+#include <unordered_map>
 using namespace Rcpp;
 
 #define DEBUG false
@@ -192,3 +193,151 @@ NumericVector accumulate(const IntegerVector & basin_ids, const IntegerVector &
 NumericVector downstream_flow(const IntegerVector & basin_ids, const IntegerVector & downstream_ids, const NumericVector & flows) {
   return accumulate_impl(basin_ids, downstream_ids, flows, AccumulationType::FLOW_DOWNSTREAM);
 }
+
+//' Compute an order in which basins can be processed so that each basin
+//' comes before the basin downstream of it
+//'
+//' The order depends only on the basin network, so it can be computed once
+//' and used for any number of accumulations with \code{\link{accumulate_ordered}}
+//' and \code{\link{downstream_flow_ordered}}.
+//'
+//' @param basin_ids       a vector of basin ids
+//' @param downstream_ids  a vector of downstream basin ids,
+//'                        aligned with the entries in \code{basin_ids}
+//' @return a list with elements \code{order}, a vector of positions in
+//'         \code{basin_ids} with each basin appearing before its downstream
+//'         basin, and \code{downstream_index}, the position in \code{basin_ids}
+//'         of the downstream basin of each basin, or zero if the basin has
+//'         no downstream basin
+//' @export
+// [[Rcpp::export]]
+List basin_flow_order(const IntegerVector & basin_ids, const IntegerVector & downstream_ids) {
+  auto n = basin_ids.size();
+
+  if (downstream_ids.size() != n) {
+    stop("Expected %d downstream IDs but got %d", n, downstream_ids.size());
+  }
+
+  std::unordered_map<basin_id, int> index;
+  index.reserve(n);
+  for (auto i = 0; i < n; i++) {
+    index[basin_ids[i]] = i;
+  }
+
+  IntegerVector downstream_index(n);
+  std::vector<int> n_upstream(n);
+
+  for (auto i = 0; i < n; i++) {
+    if (downstream_ids[i] > 0) {
+      auto downstream_kv = index.find(downstream_ids[i]);
+      if (downstream_kv == index.end()) {
+        stop("Basin %d references downstream basin %d, but it does not exist.",
+             basin_ids[i], downstream_ids[i]);
+      }
+
+      downstream_index[i] = downstream_kv->second + 1;
+      n_upstream[downstream_kv->second]++;
+    }
+  }
+
+  // Start with the headwater basins, and add each downstream basin
+  // once all of the basins flowing into it have been added
+  IntegerVector order(n);
+  std::stack<int> ready;
+  for (auto i = 0; i < n; i++) {
+    if (n_upstream[i] == 0) {
+      ready.push(i);
+    }
+  }
+
+  auto n_ordered = 0;
+  while (!ready.empty()) {
+    auto i = ready.top();
+    ready.pop();
+
+    order[n_ordered++] = i + 1;
+
+    auto d = downstream_index[i] - 1;
+    if (d >= 0 && --n_upstream[d] == 0) {
+      ready.push(d);
+    }
+  }
+
+  if (n_ordered != n) {
+    stop("Basin network contains a cycle.");
+  }
+
+  return List::create(Named("order")=order, Named("downstream_index")=downstream_index);
+}
+
+static void check_ordered_inputs(const IntegerVector & order, const IntegerVector & downstream_index, const NumericMatrix & flows) {
+  auto n = order.size();
+
+  if (downstream_index.size() != n) {
+    stop("Expected %d downstream indices but got %d", n, downstream_index.size());
+  }
+
+  if (flows.nrow() != n) {
+    stop("Expected %d flows but got %d", n, flows.nrow());
+  }
+}
+
+//' Perform a basin-to-basin flow accumulation in a single pass, using an
+//' order computed by \code{\link{basin_flow_order}}
+//'
+//' @param order            order in which basins are processed
+//' @param downstream_index position of the downstream basin of each basin
+//' @param flows            a matrix of flows generated in each basin, with
+//'                         a row for each basin and a column for each set of
+//'                         flows to accumulate (e.g., different months)
+//' @return a matrix of outlet flows for each basin (including flow generated
+//'         within the basin)
+//' @export
+// [[Rcpp::export]]
+NumericMatrix accumulate_ordered(const IntegerVector & order, const IntegerVector & downstream_index, const NumericMatrix & flows) {
+  check_ordered_inputs(order, downstream_index, flows);
+
+  NumericMatrix results = clone(flows);
+
+  for (auto k = 0; k < order.size(); k++) {
+    auto i = order[k] - 1;
+    auto d = downstream_index[i] - 1;
+
+    if (d >= 0) {
+      for (auto j = 0; j < results.ncol(); j++) {
+        results(d, j) += results(i, j);
+      }
+    }
+  }
+
+  return results;
+}
+
+//' Compute the sum of flow originating in downstream basins in a single pass,
+//' using an order computed by \code{\link{basin_flow_order}}
+//'
+//' @inheritParams accumulate_ordered
+//' @return a matrix of downstream flows for each basin (excluding flow generated
+//'         within the basin)
+//' @export
+// [[Rcpp::export]]
+NumericMatrix downstream_flow_ordered(const IntegerVector & order, const IntegerVector & downstream_index, const NumericMatrix & flows) {
+  check_ordered_inputs(order, downstream_index, flows);
+
+  NumericMatrix results(flows.nrow(), flows.ncol());
+
+  // Process the order in reverse, so that each basin is processed
+  // after the basin downstream of it
+  for (auto k = order.size() - 1; k >= 0; k--) {
+    auto i = order[k] - 1;
+    auto d = downstream_index[i] - 1;
+
+    if (d >= 0) {
+      for (auto j = 0; j < results.ncol(); j++) {
+        results(i, j) = results(d, j) + flows(d, j);
+      }
+    }
+  }
+
+  return results;
+}